@@ -7,9 +7,13 @@ import os
 import asyncio
 import logging
 import uuid
-import shutil
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+import json
+import time
+import hashlib
+from collections import deque
+from typing import Optional
+from fastapi import FastAPI, File, Form, Header, UploadFile, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pathlib import Path
 import sys
 from dotenv import load_dotenv
@@ -23,7 +27,12 @@ project_root = parent_dir.parent
 os.chdir(project_root)
 
 # Import the shared client
-from backend.clients.shared_llama_client import SharedLlamaClient
+from backend.clients.shared_llama_client import SUMMARY_ENGINES, SharedLlamaClient, add_call_stats
+from backend.utils.worker_pool import WorkerPool, WorkerSupervisor, JobQueueFull
+from backend.utils.job_store import create_job_store, SQLiteJobStore
+from backend.utils.job_events import FINAL_EVENTS, JobEventHub, format_sse
+from backend.utils.webhooks import WebhookDispatcher
+from backend.utils.pdf_text import extract_page_range, extract_small_pdf, iter_pdf_pages, page_ranges
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -39,6 +48,40 @@ server_name = os.getenv("MCP_SERVER_NAME", "pdf-chunking-server")
 upload_dir = os.getenv("PDF_UPLOAD_DIR", "./data/uploads")
 output_dir = os.getenv("PDF_OUTPUT_DIR", "./data/outputs")
 
+# PDF processing parameters applied to every job
+chunk_size = int(os.getenv("DEFAULT_CHUNK_SIZE", "1000"))
+chunk_overlap = int(os.getenv("DEFAULT_CHUNK_OVERLAP", "200"))
+summary_max_length = int(os.getenv("SUMMARY_MAX_LENGTH", "500"))
+
+# Streaming pipeline: pages buffered between extraction and chunking, pages per worker-process batch
+pipeline_queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+pipeline_page_batch = int(os.getenv("PIPELINE_PAGE_BATCH", "8"))
+
+# Job event streams: push generated tokens as well as chunk summaries to subscribed clients, seconds between keepalives
+stream_summary_tokens = os.getenv("SUMMARY_STREAM_TOKENS", "true").lower() == "true"
+sse_heartbeat_seconds = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Longest a status request with `wait` is held open for the job to change
+status_max_wait = float(os.getenv("STATUS_MAX_WAIT_SECONDS", "30"))
+
+# Block size used when persisting uploads, and the bytes every PDF starts with
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+PDF_MAGIC = b"%PDF"
+
+# Largest accepted upload in bytes (0 = unlimited)
+max_upload_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+
+# Allowance for the multipart framing and form fields around an uploaded file
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+# Multi-worker deployment: API processes and dedicated processing worker processes
+api_workers = int(os.getenv("MCP_API_WORKERS", "1"))
+processing_workers = int(os.getenv("MCP_PROCESSING_WORKERS", "0"))
+job_poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+
+# Job statuses between being claimed by a worker and finishing
+ACTIVE_JOB_STATUSES = ("processing", "text_chunked", "summarized")
+
 # Ensure directories exist
 os.makedirs(upload_dir, exist_ok=True)
 os.makedirs(output_dir, exist_ok=True)
@@ -46,8 +89,21 @@ os.makedirs(output_dir, exist_ok=True)
 # Initialize shared client for PDF processing
 llama_client = SharedLlamaClient()
 
-# Dictionary to store processing job information
-processing_jobs = {}
+# Store for processing job information, indexed by id, status and content key
+job_store = create_job_store()
+
+# Executor subsystem: blocking stages run here, never on the event loop
+worker_pool = WorkerPool.from_env()
+
+# Events of jobs running in this process, streamed to clients over SSE
+job_events = JobEventHub.from_env()
+
+# Long-poll status requests waiting on jobs of this process, woken by update_job (not by SSE events)
+job_waiters: dict = {}
+
+# Completion webhooks of jobs uploaded with a callback URL, and their deliveries in progress
+webhooks = WebhookDispatcher.from_env()
+webhook_tasks: set = set()
 
 # Create FastAPI app directly - no more FastMCP wrapper
 app = FastAPI(
@@ -88,8 +144,9 @@ async def root_endpoint():
         "version": "1.0.0",
         "endpoints": {
             "/api/llama-docs": "Query llama-index documentation",
-            "/pdf/upload": "Upload a PDF file for processing",
+            "/pdf/upload": "Upload a PDF file for processing, optionally with a completion callback_url",
             "/pdf/status/{job_id}": "Check the status of a processing job",
+            "/pdf/events/{job_id}": "Stream a job's status, summaries and result (Server-Sent Events)",
             "/pdf/download/{job_id}": "Download a processed PDF",
             "/status": "Get the system status",
             "/test": "Test if the server is running properly"
@@ -102,13 +159,141 @@ async def test_endpoint():
     """Simple test endpoint to verify the server is running."""
     return {"status": "API Server is running properly", "server": server_name}
 
-# PDF processing background task - unchanged
+def processing_params(engine: Optional[str] = None) -> dict:
+    """Return the processing parameters that determine a job's output."""
+    params = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "max_length": summary_max_length,
+        "strip_boilerplate": llama_client.strip_boilerplate,
+        "summary_mode": llama_client.summary_mode,
+        "summary_batching": llama_client.summary_batching,
+        "summary_engine": engine or llama_client.summary_engine
+    }
+    if llama_client.summary_mode == "tree":
+        params.update(
+            reduce_fan_in=llama_client.reduce_fan_in,
+            summary_target_length=llama_client.summary_target_length
+        )
+    if llama_client.chunking_mode == "tokens":
+        # Token budgets depend on the model, so the model is part of the output's identity
+        params.update(
+            chunk_tokens=llama_client.chunk_token_budget(summary_max_length),
+            chunk_overlap_tokens=llama_client.chunk_overlap_tokens,
+            model=llama_client.model_name
+        )
+    return params
+
+def content_key(content_hash: str, params: dict) -> str:
+    """Identify a job's output by its input bytes and processing parameters."""
+    params_digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{content_hash}:{params_digest[:16]}"
+
+def find_completed_job(key: str):
+    """Return a finished job with the given content key whose output still exists."""
+    job = job_store.find_by_content_key(key)
+    if not job or not os.path.exists(job.get("output_pdf") or ""):
+        return None
+    return job
+
+async def stream_pdf_pages(file_path: str):
+    """
+    Yield page texts as they are extracted by the worker pool.
+    
+    In process mode PDFs of at least PDF_PARALLEL_EXTRACT_MIN_PAGES pages have
+    page ranges extracted in parallel, with up to one batch per worker process in
+    flight, and yielded in page order; smaller ones are extracted by the same
+    worker call that counts their pages. Otherwise a worker thread streams pages
+    through a bounded queue.
+    """
+    if worker_pool.stage_modes.get("extract") != "process":
+        async for page in worker_pool.stream("extract", iter_pdf_pages, file_path, maxsize=pipeline_queue_size):
+            yield page
+        return
+    
+    total_pages, small_pdf_pages = await worker_pool.run(
+        "extract", extract_small_pdf, file_path, llama_client.parallel_extract_min_pages
+    )
+    if small_pdf_pages is not None:
+        for page in small_pdf_pages:
+            yield page
+        return
+    
+    batches = iter(page_ranges(total_pages, pipeline_page_batch))
+    pending = deque()
+    
+    def schedule_batches():
+        while len(pending) < worker_pool.max_processes:
+            batch = next(batches, None)
+            if batch is None:
+                return
+            pending.append(asyncio.ensure_future(worker_pool.run("extract", extract_page_range, file_path, *batch)))
+    
+    try:
+        schedule_batches()
+        while pending:
+            pages = await pending.popleft()
+            # Keep later batches extracting while this one is chunked and summarized
+            schedule_batches()
+            for page in pages:
+                yield page
+    finally:
+        for future in pending:
+            future.cancel()
+
+def jobs_run_elsewhere() -> bool:
+    """Whether jobs may run in another process, whose events are not published here."""
+    return processing_workers > 0 or api_workers > 1
+
+def job_status(job: dict) -> dict:
+    """Build the data of a job's "status" event."""
+    return {"job_id": job["job_id"], "status": job["status"], "progress": job.get("progress")}
+
+async def deliver_webhook(job: dict):
+    """POST a finished job's record to its callback URL, recording the delivery on the job."""
+    job_store.update(job["job_id"], webhook={"url": job["callback_url"], "status": "pending", "attempts": 0})
+    delivery = await webhooks.deliver(job["callback_url"], job)
+    # Webhook bookkeeping is not a job state change, so it bypasses update_job
+    job_store.update(job["job_id"], webhook=delivery)
+
+def schedule_webhook(job: dict):
+    """Start delivering a finished job's webhook in the background, if it has a callback URL."""
+    if not job.get("callback_url"):
+        return
+    task = asyncio.create_task(deliver_webhook(job))
+    webhook_tasks.add(task)
+    task.add_done_callback(webhook_tasks.discard)
+
+def update_job(job_id: str, **fields) -> Optional[dict]:
+    """
+    Update a job record and push the change to the job's event streams.
+    
+    Finished jobs publish their whole record as a "complete" or "error" event,
+    which ends their streams, and are delivered to their callback URL; other
+    updates publish a "status" event.
+    """
+    job = job_store.update(job_id, **fields)
+    if job is None:
+        return None
+    for waiter in job_waiters.get(job_id, ()):
+        waiter.set()
+    if job["status"] in FINAL_EVENTS:
+        job_events.publish(job_id, job["status"], job)
+        job_events.close(job_id)
+        schedule_webhook(job)
+    else:
+        # Only the latest status matters, so status events are not replayed
+        job_events.publish(job_id, "status", job_status(job), replay=False)
+    return job
+
+# PDF processing job - blocking stages are dispatched to the worker pool
 async def process_pdf_task(job_id: str, file_path: str):
-    """Background task to process a PDF file."""
+    """Process a queued PDF job, keeping the event loop free for requests."""
     try:
         logger.info(f"Starting PDF processing job {job_id} for file: {file_path}")
         # Update job status to processing
-        processing_jobs[job_id]["status"] = "processing"
+        job = update_job(job_id, status="processing")
+        params = job.get("params") or processing_params()
         
         # Check if file exists
         if not os.path.exists(file_path):
@@ -124,48 +309,102 @@ async def process_pdf_task(job_id: str, file_path: str):
         
         # Process the PDF with more detailed error handling
         try:
-            # Extract text
-            extracted_text = llama_client.extract_text_from_pdf(file_path)
-            processing_jobs[job_id]["status"] = "text_extracted"
+            # Extract, chunk and summarize as a pipeline: chunks are summarized while
+            # later pages are still being extracted
+            started_at = time.monotonic()
+            first_summary_seconds = None
+            
+            def report_progress(completed: int, total: Optional[int]):
+                nonlocal first_summary_seconds
+                if first_summary_seconds is None:
+                    first_summary_seconds = round(time.monotonic() - started_at, 3)
+                update_job(job_id, progress=f"Summarized chunk {completed}/{total if total is not None else '?'}")
             
-            # Chunk the text
-            chunks = llama_client.chunk_text(extracted_text)
-            processing_jobs[job_id]["status"] = "text_chunked"
+            def report_chunked(text_length: int, num_chunks: int):
+                update_job(job_id, status="text_chunked")
             
-            # Summarize each chunk
-            summaries = []
-            for i, chunk in enumerate(chunks):
-                try:
-                    summary = llama_client.summarize_text(chunk)
-                    summaries.append(summary)
-                    processing_jobs[job_id]["progress"] = f"Summarized chunk {i+1}/{len(chunks)}"
-                except Exception as sum_error:
-                    logger.warning(f"Error summarizing chunk {i+1}: {str(sum_error)}")
-                    # Use a fallback for failed summaries
-                    summaries.append(chunk[:500] + "...(truncated)")
+            def publish_summary(index: int, summary: str):
+                job_events.publish(job_id, "summary", {"chunk": index, "summary": summary})
             
-            # Create a combined summary
-            combined_summary = "\n\n".join(summaries)
-            processing_jobs[job_id]["status"] = "summarized"
+            def publish_token(index: int, text: Optional[str]):
+                # Token deltas are not replayed; the chunk's summary event carries the full text
+                data = {"chunk": index, "text": text} if text is not None else {"chunk": index, "reset": True}
+                job_events.publish(job_id, "token", data, replay=False)
             
-            # Generate summary PDF
-            summary_pdf_path = os.path.join(output_dir, f"{job_id}_summary.pdf")
-            llama_client.generate_pdf(combined_summary, summary_pdf_path)
+            pipeline = await llama_client.asummarize_pdf(
+                file_path,
+                pages=stream_pdf_pages(file_path),
+                chunk_size=params["chunk_size"],
+                overlap=params["chunk_overlap"],
+                max_length=params["max_length"],
+                on_progress=report_progress,
+                on_chunked=report_chunked,
+                chunk_tokens=params.get("chunk_tokens"),
+                overlap_tokens=params.get("chunk_overlap_tokens", 0),
+                strip_boilerplate=params.get("strip_boilerplate", False),
+                batch=params.get("summary_batching", False),
+                engine=params.get("summary_engine", "llm"),
+                on_summary=publish_summary,
+                on_token=publish_token if stream_summary_tokens else None,
+                # Streamed requests are not hedged, so only stream while someone is listening
+                stream_tokens=lambda: job_events.has_subscribers(job_id)
+            )
+            
+            # Create a combined summary, reduced to a bounded length in tree mode
+            reduce_levels = 0
+            if params.get("summary_mode") == "tree":
+                def report_level(level: int, groups: int):
+                    update_job(job_id, progress=f"Reducing summaries: level {level}, {groups} groups")
+                
+                reduce_stats = {}
+                combined_summary, reduce_levels = await llama_client.areduce_summaries(
+                    pipeline["summaries"],
+                    max_length=params["max_length"],
+                    fan_in=params["reduce_fan_in"],
+                    target_length=params["summary_target_length"],
+                    on_level=report_level,
+                    stats=reduce_stats,
+                    engine=params.get("summary_engine", "llm")
+                )
+                add_call_stats(pipeline, reduce_stats)
+            else:
+                combined_summary = "\n\n".join(pipeline["summaries"])
+            update_job(job_id, status="summarized")
+            
+            # Generate summary PDF, unless there is no text to summarize
+            summary_pdf_path = None
+            if pipeline["fast_path"] != "empty_text":
+                summary_pdf_path = os.path.join(output_dir, f"{job_id}_summary.pdf")
+                await worker_pool.run("render", llama_client.generate_pdf, combined_summary, summary_pdf_path)
             
             # Update job status to complete
             result = {
                 "input_pdf": file_path,
-                "extracted_text_length": len(extracted_text),
-                "num_chunks": len(chunks),
+                "summary_engine": params.get("summary_engine", "llm"),
+                "extracted_text_length": pipeline["extracted_text_length"],
+                "num_chunks": pipeline["num_chunks"],
+                "deduplicated_chunks": pipeline["deduplicated_chunks"],
+                "reduce_levels": reduce_levels,
+                "failed_chunks": pipeline["failed_chunks"],
+                "llm_calls": pipeline["llm_calls"],
                 "summary_length": len(combined_summary),
-                "output_pdf": summary_pdf_path
+                "fast_path": pipeline["fast_path"],
+                "output_pdf": summary_pdf_path,
+                "first_summary_seconds": first_summary_seconds,
+                "processing_seconds": round(time.monotonic() - started_at, 3)
             }
+            if "batched_chunks" in pipeline:
+                result["batched_chunks"] = pipeline["batched_chunks"]
+            if "boilerplate" in pipeline:
+                result["boilerplate"] = pipeline["boilerplate"]
             
-            processing_jobs[job_id].update({
-                "status": "complete",
-                "result": result,
-                "output_pdf": summary_pdf_path
-            })
+            # Completed jobs are found by content key for byte-identical uploads
+            update_job(
+                job_id,
+                status="complete",
+                result=result,
+                output_pdf=summary_pdf_path
+            )
             
             logger.info(f"Completed PDF processing job {job_id}")
             
@@ -175,19 +414,100 @@ async def process_pdf_task(job_id: str, file_path: str):
     except Exception as e:
         error_msg = f"Error processing PDF: {str(e)}"
         logger.error(error_msg)
-        processing_jobs[job_id].update({
-            "status": "error",
-            "error": error_msg
-        })
+        update_job(
+            job_id,
+            status="error",
+            error=error_msg
+        )
+
+class UploadSizeLimit:
+    """
+    ASGI middleware refusing uploads whose declared size is over the limit before their body is read.
+    
+    Written against raw ASGI rather than as an HTTP middleware, so every other
+    request, including event streams and long-polls, passes through untouched.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (max_upload_bytes and scope["type"] == "http" and scope["method"] == "POST"
+                and scope["path"] == "/pdf/upload"):
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > max_upload_bytes + UPLOAD_FORM_OVERHEAD:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"Upload exceeds the maximum size of {max_upload_bytes} bytes"}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+app.add_middleware(UploadSizeLimit)
+
+async def save_upload(file: UploadFile, file_path: str) -> str:
+    """
+    Stream an upload to disk in fixed-size blocks without blocking the event loop.
+    
+    The content is hashed and its %PDF magic bytes checked as it streams; the
+    copy is abandoned as soon as it proves not to be a PDF or grows past
+    MAX_UPLOAD_BYTES, and the partial file removed.
+    
+    Args:
+        file: Uploaded file
+        file_path: Path to write the upload to
+        
+    Returns:
+        SHA-256 hex digest of the content
+        
+    Raises:
+        HTTPException: 400 if the content is not a PDF, 413 if it is too large
+    """
+    digest = hashlib.sha256()
+    head = b""
+    size = 0
+    buffer = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        while block := await file.read(UPLOAD_BLOCK_SIZE):
+            if len(head) < len(PDF_MAGIC):
+                head = (head + block)[:len(PDF_MAGIC)]
+                if len(head) == len(PDF_MAGIC) and head != PDF_MAGIC:
+                    raise HTTPException(status_code=400, detail="File content is not a PDF")
+            size += len(block)
+            if max_upload_bytes and size > max_upload_bytes:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds the maximum size of {max_upload_bytes} bytes")
+            digest.update(block)
+            await asyncio.to_thread(buffer.write, block)
+        if head != PDF_MAGIC:
+            raise HTTPException(status_code=400, detail="File content is not a PDF")
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        await asyncio.to_thread(os.remove, file_path)
+        raise
+    await asyncio.to_thread(buffer.close)
+    return digest.hexdigest()
 
-# Add PDF upload endpoint - unchanged
+# Add PDF upload endpoint
 @app.post("/pdf/upload")
-async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    """Upload a PDF file for processing."""
+async def upload_pdf(file: UploadFile = File(...), engine: Optional[str] = Form(None),
+                     callback_url: Optional[str] = Form(None)):
+    """
+    Upload a PDF file for processing, optionally choosing the summarization engine.
+    
+    With `callback_url`, the final job record is POSTed to that URL once the job
+    completes or fails; the delivery is recorded under the job's "webhook" field.
+    """
     try:
         # Validate file is a PDF
         if not file.filename.lower().endswith(".pdf"):
             raise HTTPException(status_code=400, detail="File must be a PDF")
+        if engine is not None and engine not in SUMMARY_ENGINES:
+            raise HTTPException(status_code=400, detail=f"Unknown summarization engine '{engine}', expected one of {', '.join(SUMMARY_ENGINES)}")
+        if callback_url:
+            url_error = await asyncio.to_thread(webhooks.validate_url, callback_url)
+            if url_error:
+                raise HTTPException(status_code=400, detail=url_error)
         
         # Generate a unique job ID
         job_id = str(uuid.uuid4())
@@ -195,20 +515,65 @@ async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(
         # Create file path in upload directory
         file_path = os.path.join(upload_dir, f"{job_id}_{file.filename}")
         
-        # Save the uploaded file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save the uploaded file, hashing and checking it as it streams to disk
+        content_hash = await save_upload(file, file_path)
+        
+        params = processing_params(engine)
+        key = content_key(content_hash, params)
+        
+        # Reuse the output of a finished job for the same bytes and parameters
+        existing_job = find_completed_job(key)
+        if existing_job:
+            os.remove(file_path)
+            # The match may itself be a copy; point at the job that processed the file
+            original_job_id = existing_job.get("deduplicated_from") or existing_job["job_id"]
+            job = job_store.create({
+                "job_id": job_id,
+                "status": "complete",
+                "file_path": existing_job["file_path"],
+                "original_filename": file.filename,
+                "content_hash": content_hash,
+                "content_key": key,
+                "params": params,
+                "result": existing_job["result"],
+                "output_pdf": existing_job["output_pdf"],
+                "deduplicated_from": original_job_id,
+                "callback_url": callback_url
+            })
+            schedule_webhook(job)
+            logger.info(f"Upload {job_id} matches completed job {original_job_id}, reusing its output")
+            return {
+                "job_id": job_id,
+                "status": "complete",
+                "deduplicated_from": original_job_id,
+                "message": "PDF matches a previously processed upload, reusing its output"
+            }
+        
+        # With processing workers, "uploaded" jobs in the shared store are the job queue
+        if processing_workers > 0 and job_store.counts().get("uploaded", 0) >= worker_pool.queue_size:
+            os.remove(file_path)
+            raise HTTPException(status_code=503, detail=f"Job queue is full ({worker_pool.queue_size} jobs waiting)")
         
         # Store job information
-        processing_jobs[job_id] = {
+        job_store.create({
             "job_id": job_id,
             "status": "uploaded",
             "file_path": file_path,
-            "original_filename": file.filename
-        }
+            "original_filename": file.filename,
+            "content_hash": content_hash,
+            "content_key": key,
+            "params": params,
+            "callback_url": callback_url
+        })
         
-        # Start processing in background
-        background_tasks.add_task(process_pdf_task, job_id, file_path)
+        # Without processing workers, the local worker pool runs the job
+        if processing_workers == 0:
+            try:
+                worker_pool.submit(job_id, file_path)
+            except JobQueueFull as e:
+                job_store.delete(job_id)
+                os.remove(file_path)
+                raise HTTPException(status_code=503, detail=str(e))
         
         return {
             "job_id": job_id,
@@ -222,17 +587,77 @@ async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
-# Add PDF processing status endpoint - unchanged 
+def job_etag(version: int) -> str:
+    """Build the ETag of a job record from its version."""
+    return f'"v{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an If-None-Match header matches an ETag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+async def wait_for_job_change(job_id: str, version: int, timeout: float) -> Optional[tuple]:
+    """
+    Wait until a job's version moves past `version`, it finishes, or `timeout` passes.
+    
+    Updates of jobs running in this process wake the wait at once through
+    update_job; jobs run by processing workers are checked every JOB_POLL_INTERVAL.
+    Waiters are kept apart from the job's event subscribers, so they neither count
+    as SSE clients nor wake for token deltas.
+    
+    Returns:
+        The job's (version, status), or None if it no longer exists
+    """
+    deadline = time.monotonic() + timeout
+    waiter = asyncio.Event()
+    job_waiters.setdefault(job_id, set()).add(waiter)
+    try:
+        while True:
+            current = job_store.get_version(job_id)
+            if current is None or current[0] != version or current[1] in FINAL_EVENTS:
+                return current
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return current
+            waiter.clear()
+            try:
+                await asyncio.wait_for(waiter.wait(), min(remaining, job_poll_interval))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        waiters = job_waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(waiter)
+            if not waiters:
+                del job_waiters[job_id]
+
+# Add PDF processing status endpoint
 @app.get("/pdf/status/{job_id}")
-async def get_pdf_status(job_id: str):
-    """Get the status of a PDF processing job."""
+async def get_pdf_status(job_id: str, wait: float = 0, if_none_match: Optional[str] = Header(None)):
+    """
+    Get the status of a PDF processing job.
+    
+    Responses carry the job's version as an ETag. A request whose If-None-Match
+    still matches gets 304 Not Modified; with `wait`, it is first held for up to
+    that many seconds (capped at STATUS_MAX_WAIT_SECONDS) until the job changes.
+    """
     try:
-        # Check if job exists
-        if job_id not in processing_jobs:
+        # Check if job exists, without loading the record
+        current = job_store.get_version(job_id)
+        if current is not None and etag_matches(if_none_match, job_etag(current[0])):
+            if wait > 0 and current[1] not in FINAL_EVENTS:
+                current = await wait_for_job_change(job_id, current[0], min(wait, status_max_wait))
+            if current is not None and etag_matches(if_none_match, job_etag(current[0])):
+                return Response(status_code=304, headers={"ETag": job_etag(current[0])})
+        
+        job = job_store.get(job_id) if current is not None else None
+        if job is None:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Return job status
-        return processing_jobs[job_id]
+        return JSONResponse(content=job, headers={"ETag": job_etag(job.get("version", 0))})
     except HTTPException:
         raise
     except Exception as e:
@@ -240,22 +665,91 @@ async def get_pdf_status(job_id: str):
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.get("/pdf/events/{job_id}")
+async def stream_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Stream a job's events as Server-Sent Events until it finishes.
+    
+    Events are "status" (the job's status and progress, sent on connect and on
+    every change), "summary" (a chunk summary is ready), "token" (text generated
+    for a chunk so far; "reset" when a retried request starts over), and a final
+    "complete" or "error" carrying the job record, as returned by /pdf/status.
+    Jobs running in another process publish no events here; in multi-worker
+    deployments their record is checked every JOB_POLL_INTERVAL instead, and
+    keepalives are sent every SSE_HEARTBEAT_SECONDS.
+    """
+    if job_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        resume_after = int(last_event_id or 0)
+    except ValueError:
+        resume_after = 0
+    # Subscribe before reading the job, so its final event cannot slip in between
+    subscription = job_events.subscribe(job_id, resume_after)
+    
+    # Jobs of other processes only change in the store, so it is polled rather than waited on
+    check_interval = min(sse_heartbeat_seconds, job_poll_interval) if jobs_run_elsewhere() else sse_heartbeat_seconds
+    
+    async def events():
+        try:
+            job = job_store.get(job_id)
+            sent = None
+            last_write = 0.0
+            while job is not None:
+                if job["status"] in FINAL_EVENTS:
+                    yield format_sse(job["status"], job)
+                    return
+                if job_status(job) != sent:
+                    sent = job_status(job)
+                    yield format_sse("status", sent)
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write >= sse_heartbeat_seconds:
+                    yield ": keepalive\n\n"
+                    last_write = time.monotonic()
+                
+                while (item := await subscription.get(timeout=check_interval)) is not None:
+                    event_id, event, data = item
+                    yield format_sse(event, data, event_id)
+                    last_write = time.monotonic()
+                    if event in FINAL_EVENTS:
+                        return
+                    if event == "status":
+                        sent = data
+                if subscription.overflowed:
+                    yield format_sse("overflow", {"job_id": job_id, "detail": "Client fell behind, reconnect to resume"})
+                    return
+                # On a timeout, or after the job finished, its record is the source of truth;
+                # it is only reloaded once its version moves
+                current = job_store.get_version(job_id)
+                if current is None or current[0] != job.get("version"):
+                    job = job_store.get(job_id)
+        finally:
+            job_events.unsubscribe(job_id, subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Add PDF download endpoint - unchanged
 @app.get("/pdf/download/{job_id}")
 async def download_pdf(job_id: str):
     """Download a processed PDF file."""
     try:
         # Check if job exists
-        if job_id not in processing_jobs:
+        job_info = job_store.get(job_id)
+        if job_info is None:
             raise HTTPException(status_code=404, detail="Job not found")
         
-        job_info = processing_jobs[job_id]
-        
         # Check if processing is complete
         if job_info["status"] != "complete":
             raise HTTPException(status_code=400, detail=f"PDF processing not complete. Current status: {job_info['status']}")
         
         # Check if output file exists
+        if (job_info.get("result") or {}).get("fast_path") == "empty_text":
+            raise HTTPException(status_code=404, detail="No text could be extracted from the PDF, so there is no summary")
         output_pdf = job_info.get("output_pdf")
         if not output_pdf or not os.path.exists(output_pdf):
             raise HTTPException(status_code=404, detail="Processed PDF file not found")
@@ -281,7 +775,7 @@ async def api_status():
         "status": "running",
         "server": server_name,
         "port": port,
-        "job_count": len(processing_jobs),
+        "job_count": job_store.total(),
         "upload_dir": upload_dir,
         "output_dir": output_dir,
         "api_health": "ok"
@@ -291,18 +785,24 @@ async def api_status():
 async def get_system_status():
     """Get the status of the PDF processing system."""
     try:
-        # Count jobs by status
-        status_counts = {}
-        for job in processing_jobs.values():
-            status = job.get("status", "unknown")
-            status_counts[status] = status_counts.get(status, 0) + 1
+        # Status counters are maintained incrementally by the job store
+        status_counts = job_store.counts()
         
         return {
             "status": "running",
             "jobs": {
-                "total": len(processing_jobs),
+                "total": sum(status_counts.values()),
                 "by_status": status_counts
             },
+            "workers": {
+                "dispatch": "shared_queue" if processing_workers > 0 else "local",
+                "api_workers": api_workers,
+                "processing_workers": processing_workers,
+                **worker_pool.stats()
+            },
+            "summary_cache": llama_client.summary_cache.stats(),
+            "llm_rate_limiter": llama_client.rate_limiter.stats(),
+            "job_events": job_events.stats(),
             "directories": {
                 "upload_dir": upload_dir,
                 "output_dir": output_dir
@@ -316,12 +816,117 @@ async def get_system_status():
             content={"status": "error", "error": error_msg}
         )
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the job runners on the server's event loop."""
+    # With dedicated processing workers, API processes only enqueue jobs
+    if processing_workers == 0:
+        worker_pool.start(process_pdf_task)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the job runners and worker executors."""
+    await worker_pool.shutdown()
+    # Deliveries cut short stay recorded as pending on their jobs
+    for task in list(webhook_tasks):
+        task.cancel()
+
+async def claim_queued_jobs(running: set) -> int:
+    """
+    Claim queued jobs from the shared job store up to the worker's job concurrency.
+    
+    Args:
+        running: Set of this worker's running job tasks, updated in place
+        
+    Returns:
+        Number of jobs claimed
+    """
+    claimed = 0
+    while len(running) < worker_pool.job_concurrency:
+        job = job_store.claim_next("uploaded", status="processing", worker_pid=os.getpid())
+        if job is None:
+            break
+        task = asyncio.create_task(process_pdf_task(job["job_id"], job["file_path"]))
+        running.add(task)
+        task.add_done_callback(running.discard)
+        claimed += 1
+    return claimed
+
+async def processing_worker_loop():
+    """Poll the shared job store for queued jobs and process them."""
+    running = set()
+    logger.info(f"Processing worker {os.getpid()} polling for jobs every {job_poll_interval}s")
+    try:
+        while True:
+            await claim_queued_jobs(running)
+            await asyncio.sleep(job_poll_interval)
+    finally:
+        for task in running:
+            task.cancel()
+        await worker_pool.shutdown()
+
+def run_processing_worker():
+    """Run a dedicated processing worker process."""
+    use_shared_job_store()
+    asyncio.run(processing_worker_loop())
+
+def requeue_worker_jobs(pid: int) -> int:
+    """
+    Return the unfinished jobs of a processing worker that exited to the queue.
+    
+    Args:
+        pid: Process id of the worker that exited
+        
+    Returns:
+        Number of jobs requeued
+    """
+    requeued = 0
+    for status in ACTIVE_JOB_STATUSES:
+        for job in job_store.find_by_status(status, limit=None):
+            if job.get("worker_pid") == pid:
+                job_store.update(job["job_id"], status="uploaded", worker_pid=None, progress=None)
+                requeued += 1
+    if requeued:
+        logger.warning(f"Requeued {requeued} jobs from processing worker {pid}")
+    return requeued
+
+def use_shared_job_store():
+    """Switch to the SQLite job store, which every worker process can share."""
+    global job_store
+    if isinstance(job_store, SQLiteJobStore):
+        return
+    logger.warning("Multi-worker mode requires a shared job store, switching JOB_STORE to sqlite")
+    # Worker processes inherit the environment and create the same store on import
+    os.environ["JOB_STORE"] = "sqlite"
+    job_store = create_job_store()
+
 # Simple, direct server startup - no more complex MCP startup logic
 def main():
-    """Start the API server."""
+    """Start the API server, with optional API and processing worker processes."""
     import uvicorn
-    logger.info(f"Starting API server on port {port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    
+    supervisor = None
+    if api_workers > 1 or processing_workers > 0:
+        use_shared_job_store()
+    if processing_workers > 0:
+        supervisor = WorkerSupervisor(
+            run_processing_worker,
+            processing_workers,
+            on_exit=requeue_worker_jobs,
+            start_method=worker_pool.start_method
+        )
+        supervisor.start()
+    
+    try:
+        logger.info(f"Starting API server on port {port} with {api_workers} API workers "
+                    f"and {processing_workers} processing workers")
+        if api_workers > 1:
+            uvicorn.run("backend.api.mcp_http_server:app", host="0.0.0.0", port=port, workers=api_workers)
+        else:
+            uvicorn.run(app, host="0.0.0.0", port=port)
+    finally:
+        if supervisor:
+            supervisor.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
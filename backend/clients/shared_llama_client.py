@@ -4,17 +4,136 @@ This module handles core LlamaCloud API interaction and PDF processing methods.
 """
 
 import os
+import re
+import math
+import hashlib
+import asyncio
 import logging
 import tempfile
-from typing import List, Dict, Any, Union, Optional, Tuple
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Union, Optional, Tuple, Callable, Coroutine, Iterable, AsyncIterable, AsyncIterator, Sized
 from dotenv import load_dotenv
 from llama_index.indices.managed.llama_cloud import LlamaCloudIndex
 from llama_index.llms.openai import OpenAI
+from backend.utils.rate_limiter import AdaptiveRateLimiter
+from backend.utils.retry import RetryPolicy
+from backend.utils.summary_cache import SummaryCache, prompt_version, summary_cache_key
+from backend.utils.chunking import (
+    ChunkSpans, IncrementalChunker, TokenBudgetChunker, SENTENCE_BOUNDARIES, chunk_spans, chunk_text_by_tokens
+)
+from backend.utils.boilerplate import BoilerplateFilter
+from backend.utils.extractive import extractive_summary, require_numpy
+from backend.utils.tokens import DEFAULT_CHARS_PER_TOKEN, DEFAULT_CONTEXT_WINDOW, count_tokens
+from backend.utils.pdf_text import PAGE_SEPARATOR, PageBuffer, extract_pages, iter_pdf_pages
+from backend.utils.worker_pool import iterate_in_thread
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Prompt used for chunk summarization
+SUMMARY_PROMPT_TEMPLATE = """
+            Please summarize the following text in a concise way, highlighting the key points.
+            Keep the summary under {max_length} characters.
+            
+            TEXT:
+            {text}
+            
+            SUMMARY:
+            """
+
+# Pages are held back for the small document check until their text could exceed one
+# chunk; in token mode this many characters per token is assumed as an upper bound
+SINGLE_CHUNK_CHARS_PER_TOKEN = 8
+
+# Summarization engines: the LLM, or local extractive TextRank with no network calls
+SUMMARY_ENGINES = ("llm", "extractive")
+
+# Prompt summarizing several chunks in one request; each summary comes back in its own tag
+BATCH_PROMPT_TEMPLATE = """
+            Summarize each of the {count} sections below independently, in a concise way,
+            highlighting the key points. Keep each summary under {max_length} characters.
+            
+            Reply with exactly one <summary id="N">...</summary> element per section, where N
+            is the section's id, and nothing else.
+            
+            {sections}
+            """
+
+_BATCH_SUMMARY_PATTERN = re.compile(r'<summary\s+id="(\d+)"\s*>(.*?)</summary>', re.DOTALL)
+
+def format_batch_prompt(chunks: List[str], max_length: int) -> str:
+    """Build the prompt summarizing several chunks in one request."""
+    sections = "\n\n".join(f'<section id="{i}">\n{chunk}\n</section>' for i, chunk in enumerate(chunks, 1))
+    return BATCH_PROMPT_TEMPLATE.format(count=len(chunks), max_length=max_length, sections=sections)
+
+def parse_batch_response(text: str, count: int) -> Optional[List[str]]:
+    """
+    Split a batched response into per-chunk summaries.
+    
+    Args:
+        text: Response text
+        count: Number of chunks in the request
+        
+    Returns:
+        Summaries in section order, or None unless every section has exactly one non-empty summary
+    """
+    summaries: Dict[int, str] = {}
+    for match in _BATCH_SUMMARY_PATTERN.finditer(text):
+        section, summary = int(match.group(1)), match.group(2).strip()
+        if section in summaries or not 1 <= section <= count or not summary:
+            return None
+        summaries[section] = summary
+    if len(summaries) != count:
+        return None
+    return [summaries[i] for i in range(1, count + 1)]
+
+# Process-wide limits on concurrent LLM summarization calls, one per event loop
+_global_summary_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _global_summary_semaphore(limit: int) -> asyncio.Semaphore:
+    """Get the process-wide summarization semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _global_summary_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(limit)
+        _global_summary_semaphores[loop] = semaphore
+    return semaphore
+
+def add_call_stats(totals: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    """Add the failed chunk and LLM call counts of one summarization pass to running totals."""
+    totals["failed_chunks"] = totals.get("failed_chunks", 0) + stats.get("failed_chunks", 0)
+    llm_calls = totals.setdefault("llm_calls", {})
+    for key, count in stats.get("llm_calls", {}).items():
+        llm_calls[key] = llm_calls.get(key, 0) + count
+
+async def _chain_pages(head: List[str], rest: AsyncIterable[str]) -> AsyncIterator[str]:
+    """Yield held-back pages, then the rest of the page stream."""
+    for page in head:
+        yield page
+    async for page in rest:
+        yield page
+
+async def _aiter_chunks(chunks: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    """Iterate a sync or async iterable of chunks asynchronously."""
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+def _run_coroutine_sync(coro: Coroutine) -> Any:
+    """Run a coroutine to completion from synchronous code, even inside a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from async code through a sync API: use a private loop on another thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
 class SharedLlamaClient:
     """
     Shared client for interacting with LlamaCloud and processing PDFs.
@@ -46,6 +165,10 @@ class SharedLlamaClient:
         self.api_key = os.getenv("LLAMA_CLOUD_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         
+        # Concurrency limits for chunk summarization (per job and per process)
+        self.summary_concurrency = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+        self.global_summary_concurrency = int(os.getenv("SUMMARY_GLOBAL_CONCURRENCY", "32"))
+        
         # Validate required environment variables
         if not all([self.index_name, self.project_name, self.org_id, self.api_key]):
             logger.warning("Missing required LlamaCloud configuration. Some functions may not work.")
@@ -57,8 +180,66 @@ class SharedLlamaClient:
         self._llm = None
         self._index = None
         
+        # Chunk sizing: "characters" (chunk_size/overlap) or "tokens" (budget from the model context)
+        self.chunking_mode = os.getenv("CHUNKING_MODE", "characters").lower()
+        self.chunk_token_budget_override = int(os.getenv("CHUNK_TOKEN_BUDGET", "0"))
+        self.chunk_overlap_tokens = int(os.getenv("CHUNK_OVERLAP_TOKENS", "100"))
+        
+        # Packing of several chunks into one summarization request
+        self.summary_batching = os.getenv("SUMMARY_BATCHING", "false").lower() in ("1", "true", "yes")
+        self.batch_tokens = int(os.getenv("SUMMARY_BATCH_TOKENS", "2000"))
+        self.batch_max_chunks = int(os.getenv("SUMMARY_BATCH_MAX_CHUNKS", "8"))
+        
+        # Final summary: "concat" joins chunk summaries, "tree" reduces them level by level
+        self.summary_mode = os.getenv("SUMMARY_MODE", "concat").lower()
+        # Engine used unless a request picks one: "llm" or "extractive"
+        self.summary_engine = os.getenv("SUMMARY_ENGINE", "llm").lower()
+        if self.summary_engine == "extractive":
+            # Fail at startup rather than quietly keeping leading sentences
+            require_numpy()
+        self.reduce_fan_in = int(os.getenv("SUMMARY_REDUCE_FAN_IN", "8"))
+        self.summary_target_length = int(os.getenv("SUMMARY_TARGET_LENGTH", "4000"))
+        
+        # Removal of headers, footers and other lines repeated across pages
+        self.strip_boilerplate = os.getenv("BOILERPLATE_STRIP", "false").lower() in ("1", "true", "yes")
+        self.boilerplate_min_pages = int(os.getenv("BOILERPLATE_MIN_PAGES", "3"))
+        self.boilerplate_min_fraction = float(os.getenv("BOILERPLATE_MIN_FRACTION", "0.5"))
+        self.boilerplate_sample_pages = int(os.getenv("BOILERPLATE_SAMPLE_PAGES", "20"))
+        self.boilerplate_zone_lines = int(os.getenv("BOILERPLATE_ZONE_LINES", "3"))
+        
+        # Parallel page-range extraction for large PDFs
+        self.extract_processes = int(os.getenv("PDF_EXTRACT_PROCESSES", "0"))
+        self.parallel_extract_min_pages = int(os.getenv("PDF_PARALLEL_EXTRACT_MIN_PAGES", "64"))
+        
+        # Cache for LLM summaries, keyed on chunk content, prompt version, model and summary length
+        self.summary_cache = SummaryCache.from_env()
+        self.prompt_version = prompt_version(SUMMARY_PROMPT_TEMPLATE, BATCH_PROMPT_TEMPLATE)
+        
+        # Request/token buckets and adaptive concurrency shared by every LLM call in the process
+        self.rate_limiter = AdaptiveRateLimiter.shared()
+        # Deadlines, retries with backoff and optional hedging, shared for its latency history
+        self.retry_policy = RetryPolicy.shared()
+        # Failed chunk summaries: "fail" fails the job, "excerpt" keeps a marked excerpt of the chunk
+        self.summary_on_error = os.getenv("SUMMARY_ON_ERROR", "fail").lower()
+        
         logger.info("Shared LlamaClient initialized")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop lazily created API clients so the client can be sent to worker processes"""
+        state = self.__dict__.copy()
+        state["_llm"] = None
+        state["_index"] = None
+        state["summary_cache"] = None
+        state["rate_limiter"] = None
+        state["retry_policy"] = None
+        return state
     
+    def __setstate__(self, state: Dict[str, Any]):
+        """Rejoin the process-wide rate limiter and retry policy after unpickling"""
+        self.__dict__.update(state)
+        self.rate_limiter = AdaptiveRateLimiter.shared()
+        self.retry_policy = RetryPolicy.shared()
+
     @property
     def llm(self):
         """Lazy-load the LLM when needed"""
@@ -110,24 +291,22 @@ class SharedLlamaClient:
             logger.error(error_msg)
             return f"Error: {error_msg}"
     
-    def extract_text_from_pdf(self, pdf_file_path: str) -> str:
+    def extract_text_from_pdf(self, pdf_file_path: str) -> PageBuffer:
         """
         Extract text from a PDF file.
         
+        PDFs with at least PDF_PARALLEL_EXTRACT_MIN_PAGES pages are extracted
+        in page ranges across worker processes.
+        
         Args:
             pdf_file_path: Path to the PDF file
             
         Returns:
-            Extracted text as a string
+            PageBuffer of the extracted pages (str() gives the full text)
         """
         try:
-            from PyPDF2 import PdfReader
-            
-            with open(pdf_file_path, 'rb') as file:
-                reader = PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n\n"
+            pages = extract_pages(pdf_file_path, self.extract_processes, self.parallel_extract_min_pages)
+            text = PageBuffer(pages)
             
             logger.info(f"Extracted {len(text)} characters from PDF: {pdf_file_path}")
             return text
@@ -137,94 +316,703 @@ class SharedLlamaClient:
             logger.error(error_msg)
             raise RuntimeError(error_msg)
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    def chunk_text(self, text: Union[str, PageBuffer], chunk_size: int = 1000, overlap: int = 200) -> ChunkSpans:
         """
         Split text into chunks with optional overlap.
         
+        Chunks are returned as spans over the text; each chunk's text is only
+        built when it is accessed.
+        
         Args:
-            text: Text to chunk
+            text: Text or extracted PageBuffer to chunk
             chunk_size: Maximum size of each chunk
             overlap: Number of characters to overlap between chunks
             
         Returns:
-            List of text chunks
+            ChunkSpans sequence of text chunks
+        """
+        return chunk_spans(text, chunk_size, overlap, SENTENCE_BOUNDARIES)
+    
+    def _fallback_summary(self, text: str, max_length: int) -> str:
+        """Basic summarization used when no LLM is available: the first few sentences."""
+        sentences = text.split('.')
+        summary_sentences = [s.strip() for s in sentences[:5] if s.strip()]
+        summary = '. '.join(summary_sentences)
+        if len(summary) > max_length:
+            summary = summary[:max_length-3] + '...'
+        return summary
+    
+    @property
+    def model_name(self) -> str:
+        """Name of the summarization model, or an empty string if unknown"""
+        return getattr(self.llm, "model", "") or ""
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens of text with the summarization model's tokenizer."""
+        return count_tokens(text, self.model_name)
+    
+    def chunk_token_budget(self, max_length: int = 500) -> int:
         """
-        chunks = []
-        start = 0
-        text_length = len(text)
+        Token budget for one chunk, filling the model's context window.
+        
+        Leaves room for the summary prompt and the requested summary. CHUNK_TOKEN_BUDGET
+        overrides the derived value.
         
-        while start < text_length:
-            # Calculate end of chunk (respecting chunk_size)
-            end = min(start + chunk_size, text_length)
+        Args:
+            max_length: Maximum length of each summary in characters
             
-            # If not at the end of text and not at a sentence boundary, try to find a good break point
-            if end < text_length:
-                # Try to find sentence boundary (period followed by space or newline)
-                sentence_end = text.rfind('. ', start, end)
-                if sentence_end > start:
-                    end = sentence_end + 1  # Include the period
-                else:
-                    # Try to find paragraph boundary
-                    para_end = text.rfind('\n\n', start, end)
-                    if para_end > start:
-                        end = para_end + 2  # Include the newlines
+        Returns:
+            Maximum number of tokens in each chunk
+        """
+        if self.chunk_token_budget_override > 0:
+            return self.chunk_token_budget_override
+        metadata = getattr(self.llm, "metadata", None)
+        context_window = getattr(metadata, "context_window", None) or DEFAULT_CONTEXT_WINDOW
+        prompt_tokens = self.count_tokens(SUMMARY_PROMPT_TEMPLATE.format(text="", max_length=max_length))
+        summary_tokens = math.ceil(max_length / DEFAULT_CHARS_PER_TOKEN)
+        # Tokenizers disagree slightly across model versions; keep a margin
+        return max(256, int((context_window - prompt_tokens - summary_tokens) * 0.9))
+    
+    def chunk_text_by_tokens(self, text: Union[str, PageBuffer], max_tokens: Optional[int] = None,
+                             overlap_tokens: Optional[int] = None) -> List[str]:
+        """
+        Split text into chunks sized to a token budget.
+        
+        Args:
+            text: Text or extracted PageBuffer to chunk
+            max_tokens: Maximum tokens per chunk (default: chunk_token_budget())
+            overlap_tokens: Approximate tokens to overlap between chunks (default: CHUNK_OVERLAP_TOKENS)
             
-            # Add the chunk to our list
-            chunks.append(text[start:end])
+        Returns:
+            List of text chunks
+        """
+        return chunk_text_by_tokens(
+            text,
+            max_tokens or self.chunk_token_budget(),
+            self.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens,
+            SENTENCE_BOUNDARIES,
+            self.count_tokens
+        )
+    
+    def boilerplate_filter(self) -> BoilerplateFilter:
+        """Create a boilerplate filter with the configured thresholds."""
+        return BoilerplateFilter(
+            self.boilerplate_min_pages,
+            self.boilerplate_min_fraction,
+            self.count_tokens,
+            self.boilerplate_zone_lines
+        )
+    
+    def remove_boilerplate(self, text: PageBuffer) -> Tuple[PageBuffer, Dict[str, Any]]:
+        """
+        Remove lines repeated across pages, such as running headers and footers.
+        
+        Args:
+            text: Extracted PageBuffer
             
-            # Calculate next start position (with overlap)
-            start = end - overlap if end < text_length else text_length
+        Returns:
+            Tuple of the stripped PageBuffer and removal statistics
+        """
+        boilerplate = self.boilerplate_filter()
+        boilerplate.learn(text.pages)
+        stripped = PageBuffer((boilerplate.strip(page) for page in text.pages), text.separator)
+        return stripped, boilerplate.stats()
+    
+    def _summary_cache_key(self, text: str, max_length: int) -> Optional[str]:
+        """Cache key for an LLM summary, or None when caching is unavailable."""
+        if self.summary_cache is None:
+            return None
+        return summary_cache_key(text, self.prompt_version, self.model_name, max_length)
+    
+    def _request_tokens(self, prompt: str, max_length: int) -> int:
+        """Estimate the tokens a completion request consumes, for rate limiting."""
+        return self.count_tokens(prompt) + math.ceil(max_length / DEFAULT_CHARS_PER_TOKEN)
+    
+    def _summary_on_error(self, label: str, text: str, error: Exception) -> str:
+        """
+        Apply SUMMARY_ON_ERROR to text that could not be summarized.
+        
+        Args:
+            label: Description of the text, for messages
+            text: Text that could not be summarized
+            error: Error raised once retries were exhausted
             
-            # Ensure we don't get stuck in an infinite loop
-            if start >= end:
-                break
+        Returns:
+            A marked excerpt of the text when SUMMARY_ON_ERROR is "excerpt"
+            
+        Raises:
+            RuntimeError: When SUMMARY_ON_ERROR is "fail"
+        """
+        if self.summary_on_error != "excerpt":
+            raise RuntimeError(f"Error summarizing {label}: {str(error)}") from error
+        logger.warning(f"Error summarizing {label}, keeping an excerpt: {str(error)}")
+        return text[:500] + "...(truncated)"
+    
+    def _complete(self, prompt: str, max_length: int) -> str:
+        """
+        Run a completion through the rate limiter with retries, returning its text.
         
-        logger.info(f"Created {len(chunks)} chunks from text of length {text_length}")
-        return chunks
+        LLM_REQUEST_DEADLINE and hedging only apply to async completions: a blocking
+        call cannot be abandoned once started.
+        """
+        tokens = self._request_tokens(prompt, max_length)
+        response = self.retry_policy.call(lambda: self.llm.complete(prompt), limiter=self.rate_limiter, tokens=tokens)
+        return response.text.strip()
+    
+    async def _acomplete(self, prompt: str, max_length: int, stats: Optional[Dict[str, Any]] = None,
+                         on_token: Optional[Callable[[Optional[str]], None]] = None) -> str:
+        """
+        Run an async completion through the rate limiter with deadline, retries and hedging.
+        
+        With `on_token`, the completion is streamed when the LLM supports it. Streamed
+        requests are not hedged, since their text is already visible to clients.
+        """
+        tokens = self._request_tokens(prompt, max_length)
+        if on_token is None or not hasattr(self.llm, "astream_complete"):
+            response = await self.retry_policy.acall(
+                lambda: self.llm.acomplete(prompt), stats=stats, limiter=self.rate_limiter, tokens=tokens
+            )
+            return response.text.strip()
+        
+        attempts = 0
+        
+        async def stream() -> str:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                on_token(None)
+            parts = []
+            async for response in await self.llm.astream_complete(prompt):
+                if response.delta:
+                    parts.append(response.delta)
+                    on_token(response.delta)
+            return "".join(parts)
+        
+        text = await self.retry_policy.acall(stream, stats=stats, hedge=False, limiter=self.rate_limiter, tokens=tokens)
+        return text.strip()
     
     def summarize_text(self, text: str, max_length: int = 500) -> str:
         """
         Summarize text using LLM.
         
+        Failures are handled like those of asummarize_chunks: once retries are
+        exhausted, SUMMARY_ON_ERROR either raises or returns a marked excerpt.
+        LLM_REQUEST_DEADLINE does not apply, since blocking calls cannot be abandoned.
+        
         Args:
             text: Text to summarize
             max_length: Maximum length of summary
             
         Returns:
-            Summarized text
+            Summarized text, or a marked excerpt when SUMMARY_ON_ERROR is "excerpt"
+            
+        Raises:
+            RuntimeError: If the text cannot be summarized and SUMMARY_ON_ERROR is "fail"
         """
+        if not self.llm:
+            # Fallback to basic summarization if no LLM is available
+            logger.warning("LLM not initialized, using fallback summarization")
+            return self._fallback_summary(text, max_length)
+        
+        cache_key = self._summary_cache_key(text, max_length)
+        if cache_key:
+            cached = self.summary_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        prompt = SUMMARY_PROMPT_TEMPLATE.format(text=text, max_length=max_length)
+        
         try:
-            if not self.llm:
-                # Fallback to basic summarization if no LLM is available
-                logger.warning("LLM not initialized, using fallback summarization")
-                # Simple fallback: extract first few sentences
-                sentences = text.split('.')
-                summary_sentences = [s.strip() for s in sentences[:5] if s.strip()]
-                summary = '. '.join(summary_sentences)
-                if len(summary) > max_length:
-                    summary = summary[:max_length-3] + '...'
-                return summary
-            
-            prompt = f"""
-            Please summarize the following text in a concise way, highlighting the key points.
-            Keep the summary under {max_length} characters.
+            summary = self._complete(prompt, max_length)
+        except Exception as e:
+            return self._summary_on_error("text", text, e)
+        
+        if cache_key:
+            self.summary_cache.put(cache_key, summary)
+        
+        logger.info(f"Summarized text of length {len(text)} to {len(summary)} characters")
+        return summary
+    
+    async def asummarize_text(self, text: str, max_length: int = 500,
+                              stats: Optional[Dict[str, Any]] = None,
+                              on_token: Optional[Callable[[Optional[str]], None]] = None,
+                              skip_cache_lookup: bool = False) -> str:
+        """
+        Summarize text using the LLM's async completion API.
+        
+        Errors are raised once retries are exhausted, whatever SUMMARY_ON_ERROR says,
+        so callers can decide how to handle them.
+        
+        Args:
+            text: Text to summarize
+            max_length: Maximum length of summary
+            stats: Optional dictionary whose retries, hedges and hedge_wins counts are updated
+            on_token: Optional callback receiving the summary text as it is generated, when
+                the LLM supports streaming; None is passed when a retried request starts over
+            skip_cache_lookup: The caller already missed the cache for this text; the
+                summary is still stored in it
             
-            TEXT:
-            {text}
+        Returns:
+            Summarized text
+        """
+        if not self.llm:
+            return self._fallback_summary(text, max_length)
+        
+        cache_key = self._summary_cache_key(text, max_length)
+        if cache_key and not skip_cache_lookup:
+            cached = self.summary_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        prompt = SUMMARY_PROMPT_TEMPLATE.format(text=text, max_length=max_length)
+        summary = await self._acomplete(prompt, max_length, stats=stats, on_token=on_token)
+        
+        if cache_key:
+            self.summary_cache.put(cache_key, summary)
+        
+        logger.debug(f"Summarized text of length {len(text)} to {len(summary)} characters")
+        return summary
+    
+    async def asummarize_batch(
+        self,
+        chunks: List[str],
+        max_length: int = 500,
+        stats: Optional[Dict[str, Any]] = None,
+        cached: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Summarize several chunks with a single LLM request.
+        
+        Chunks are sent as delimited sections and the response is split back into
+        one summary per chunk. If the response cannot be parsed, each chunk is
+        summarized with its own request instead.
+        
+        Args:
+            chunks: Text chunks to summarize
+            max_length: Maximum length of each summary
+            stats: Optional dictionary whose batch_requests, batch_fallbacks and LLM retry
+                and hedge counts are updated
+            cached: Results of the caller's cache lookups, one per chunk (None for a miss);
+                when given, the cache is not consulted again
             
-            SUMMARY:
-            """
+        Returns:
+            List of summaries, one per chunk, in chunk order
+        """
+        looked_up = cached is not None
+        if not self.llm or len(chunks) == 1:
+            return [summary if summary is not None else
+                    await self.asummarize_text(chunk, max_length, stats=stats, skip_cache_lookup=looked_up)
+                    for chunk, summary in zip(chunks, cached or [None] * len(chunks))]
+        
+        keys = [self._summary_cache_key(chunk, max_length) for chunk in chunks]
+        summaries = list(cached) if looked_up else [self.summary_cache.get(key) if key else None for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if not missing:
+            return summaries
+        
+        parsed = None
+        if len(missing) > 1:
+            prompt = format_batch_prompt([chunks[i] for i in missing], max_length)
+            response = await self._acomplete(prompt, max_length * len(missing), stats=stats)
+            parsed = parse_batch_response(response, len(missing))
+            if stats is not None:
+                stats["batch_requests"] = stats.get("batch_requests", 0) + 1
+        
+        if parsed is None:
+            if len(missing) > 1:
+                logger.warning(f"Could not parse batched summaries of {len(missing)} chunks, summarizing one by one")
+                if stats is not None:
+                    stats["batch_fallbacks"] = stats.get("batch_fallbacks", 0) + 1
+            for i in missing:
+                summaries[i] = await self.asummarize_text(chunks[i], max_length, stats=stats, skip_cache_lookup=True)
+            return summaries
+        
+        for i, summary in zip(missing, parsed):
+            summaries[i] = summary
+            if keys[i]:
+                self.summary_cache.put(keys[i], summary)
+        return summaries
+    
+    async def asummarize_chunks(
+        self,
+        chunks: Union[Iterable[str], AsyncIterable[str]],
+        max_length: int = 500,
+        concurrency: Optional[int] = None,
+        on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        batch: Optional[bool] = None,
+        engine: Optional[str] = None,
+        on_summary: Optional[Callable[[int, str], None]] = None,
+        on_token: Optional[Callable[[int, Optional[str]], None]] = None,
+        stream_tokens: Optional[Callable[[], bool]] = None
+    ) -> List[str]:
+        """
+        Summarize chunks concurrently, keeping the output in chunk order.
+        
+        At most `concurrency` chunks of this call and `SUMMARY_GLOBAL_CONCURRENCY`
+        chunks across the process are summarized at the same time. Chunks may come
+        from an async iterable, in which case summarization starts on the first chunk
+        and the next chunk is only pulled once a slot is free. Byte-identical chunks
+        are summarized once and the summary is reused at every position.
+        
+        In batching mode, chunks are packed into shared requests of up to
+        SUMMARY_BATCH_TOKENS tokens and SUMMARY_BATCH_MAX_CHUNKS chunks; chunks
+        larger than the budget are still sent on their own, and chunks already in
+        the summary cache are answered from it without taking a place in a batch.
+        
+        The "extractive" engine ranks sentences locally on worker threads instead
+        of calling the LLM; batching does not apply to it.
+        
+        Args:
+            chunks: Text chunks to summarize (iterable or async iterable)
+            max_length: Maximum length of each summary
+            concurrency: Per-call concurrency limit (default: SUMMARY_CONCURRENCY)
+            on_progress: Optional callback invoked with (completed, total) after each chunk;
+                total is None while chunks are still arriving
+            stats: Optional dictionary updated with the number of deduplicated_chunks,
+                failed_chunks, the LLM retries, hedges and hedge_wins under llm_calls and,
+                when batching, batched_chunks, batch_requests and batch_fallbacks
+            batch: Pack chunks into shared requests (default: SUMMARY_BATCHING)
+            engine: Summarization engine, "llm" or "extractive" (default: SUMMARY_ENGINE)
+            on_summary: Optional callback invoked with (chunk index, summary) as each summary is ready
+            on_token: Optional callback invoked with (chunk index, text) as single-chunk LLM
+                summaries are generated; text is None when a retried request starts over
+            stream_tokens: Optional check made as each chunk starts; while it returns False,
+                chunks are summarized without on_token, so their requests can be hedged
             
-            response = self.llm.complete(prompt)
-            summary = response.text.strip()
+        Returns:
+            List of summaries, one per chunk, in chunk order
             
-            logger.info(f"Summarized text of length {len(text)} to {len(summary)} characters")
+        Raises:
+            RuntimeError: If a chunk cannot be summarized and SUMMARY_ON_ERROR is "fail"
+        """
+        extractive = (engine or self.summary_engine) == "extractive"
+        if not self.llm and not extractive:
+            logger.warning("LLM not initialized, using fallback summarization")
+        
+        job_limit = asyncio.Semaphore(concurrency or self.summary_concurrency)
+        process_limit = _global_summary_semaphore(self.global_summary_concurrency)
+        total = len(chunks) if isinstance(chunks, Sized) else None
+        completed = 0
+        tasks = []
+        # One summarization per distinct chunk, keyed on a digest of its text
+        unique_tasks: Dict[bytes, asyncio.Future] = {}
+        deduplicated = 0
+        batch = (self.summary_batching if batch is None else batch) and not extractive
+        failed = 0
+        # Batch and retry/hedge counters filled in by the LLM calls of this job
+        call_stats: Dict[str, Any] = {
+            "batched_chunks": 0, "batch_requests": 0, "batch_fallbacks": 0, "retries": 0, "hedges": 0, "hedge_wins": 0
+        }
+        # Chunks waiting to be packed into a batch, with the futures their summaries resolve
+        pending: List[Tuple[int, str, asyncio.Future]] = []
+        pending_tokens = 0
+        loop = asyncio.get_running_loop()
+        
+        def report(i: int, summary: str) -> str:
+            nonlocal completed
+            completed += 1
+            if on_summary:
+                on_summary(i, summary)
+            if on_progress:
+                on_progress(completed, total)
             return summary
+        
+        def summary_on_error(label: str, chunk: str, error: Exception) -> str:
+            # Failures fail the job unless SUMMARY_ON_ERROR keeps a counted, marked excerpt
+            nonlocal failed
+            excerpt = self._summary_on_error(label, chunk, error)
+            failed += 1
+            return excerpt
+        
+        async def summarize_chunk(i: int, chunk: str, looked_up: bool) -> str:
+            try:
+                if extractive:
+                    summary = await asyncio.to_thread(extractive_summary, chunk, max_length)
+                else:
+                    streaming = on_token is not None and (stream_tokens is None or stream_tokens())
+                    chunk_tokens = (lambda text: on_token(i, text)) if streaming else None
+                    async with process_limit:
+                        summary = await self.asummarize_text(
+                            chunk, max_length, stats=call_stats, on_token=chunk_tokens, skip_cache_lookup=looked_up
+                        )
+            except Exception as e:
+                summary = summary_on_error(f"chunk {i+1}", chunk, e)
+            finally:
+                job_limit.release()
+            return report(i, summary)
+        
+        async def summarize_batch(members: List[Tuple[int, str, asyncio.Future]]) -> None:
+            batch_chunks = [chunk for _, chunk, _ in members]
+            try:
+                async with process_limit:
+                    # Batched chunks already missed the cache when they were packed
+                    summaries = await self.asummarize_batch(
+                        batch_chunks, max_length, stats=call_stats, cached=[None] * len(batch_chunks)
+                    )
+            except Exception as e:
+                try:
+                    summaries = [summary_on_error("batched chunk", chunk, e) for chunk in batch_chunks]
+                except RuntimeError as error:
+                    for _, _, future in members:
+                        if not future.done():
+                            future.set_exception(error)
+                    return
+            finally:
+                job_limit.release()
+            for (i, _, future), summary in zip(members, summaries):
+                if not future.done():
+                    future.set_result(report(i, summary))
+        
+        async def flush_batch() -> None:
+            nonlocal pending, pending_tokens
+            if not pending:
+                return
+            members, pending, pending_tokens = pending, [], 0
+            await job_limit.acquire()
+            call_stats["batched_chunks"] += len(members)
+            tasks.append(asyncio.create_task(summarize_batch(members)))
+        
+        async def reuse_summary(i: int, original: asyncio.Future) -> str:
+            return report(i, await original)
+        
+        futures: List[asyncio.Future] = []
+        try:
+            i = 0
+            async for chunk in _aiter_chunks(chunks):
+                digest = hashlib.sha256(chunk.encode("utf-8")).digest()
+                original = unique_tasks.get(digest)
+                if original is not None:
+                    deduplicated += 1
+                    task = asyncio.create_task(reuse_summary(i, original))
+                    tasks.append(task)
+                    futures.append(task)
+                    i += 1
+                    continue
+                
+                tokens = self.count_tokens(chunk) if batch else 0
+                cache_key = self._summary_cache_key(chunk, max_length) if batch and self.llm else None
+                cached = self.summary_cache.get(cache_key) if cache_key else None
+                if cached is not None:
+                    future = loop.create_future()
+                    future.set_result(report(i, cached))
+                elif batch and tokens <= self.batch_tokens:
+                    # Pack the chunk, sending the current batch first if it would overflow
+                    if pending and (pending_tokens + tokens > self.batch_tokens or len(pending) >= self.batch_max_chunks):
+                        await flush_batch()
+                    future = loop.create_future()
+                    pending.append((i, chunk, future))
+                    pending_tokens += tokens
+                else:
+                    # Backpressure: only pull the next chunk once a slot is free
+                    await job_limit.acquire()
+                    future = asyncio.create_task(summarize_chunk(i, chunk, cache_key is not None))
+                    tasks.append(future)
+                unique_tasks[digest] = future
+                futures.append(future)
+                i += 1
+            await flush_batch()
+            total = len(futures)
+            summaries = await asyncio.gather(*futures)
+        except BaseException:
+            for future in tasks + futures:
+                future.cancel()
+            raise
+        
+        if stats is not None:
+            stats["deduplicated_chunks"] = deduplicated
+            if batch:
+                stats.update({key: call_stats[key] for key in ("batched_chunks", "batch_requests", "batch_fallbacks")})
+            # Failure and retry counts add up across calls sharing the dictionary
+            add_call_stats(stats, {
+                "failed_chunks": failed,
+                "llm_calls": {key: call_stats[key] for key in ("retries", "hedges", "hedge_wins")}
+            })
+        logger.info(f"Summarized {total} chunks ({deduplicated} deduplicated)")
+        return list(summaries)
+    
+    async def areduce_summaries(
+        self,
+        summaries: List[str],
+        max_length: int = 500,
+        fan_in: Optional[int] = None,
+        target_length: Optional[int] = None,
+        on_level: Optional[Callable[[int, int], None]] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        engine: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """
+        Reduce chunk summaries to one summary of bounded length.
+        
+        Summaries are grouped `fan_in` at a time and each group is summarized again,
+        level by level, until the joined summaries fit `target_length`. The groups of
+        a level are summarized concurrently.
+        
+        Args:
+            summaries: Chunk summaries, in document order
+            max_length: Maximum length of each group summary
+            fan_in: Number of summaries combined per group (default: SUMMARY_REDUCE_FAN_IN)
+            target_length: Length the final summary must fit (default: SUMMARY_TARGET_LENGTH)
+            on_level: Optional callback invoked with (level, number of groups) as each level starts
+            stats: Optional dictionary accumulating failed_chunks and llm_calls over all levels
+            engine: Summarization engine, "llm" or "extractive" (default: SUMMARY_ENGINE)
             
-        except Exception as e:
-            error_msg = f"Error summarizing text: {str(e)}"
-            logger.error(error_msg)
-            return f"Error: {error_msg}"
+        Returns:
+            Tuple of the final summary and the number of reduce levels run
+        """
+        fan_in = max(2, fan_in or self.reduce_fan_in)
+        target_length = target_length or self.summary_target_length
+        current = list(summaries)
+        levels = 0
+        
+        while len(current) > 1 and len("\n\n".join(current)) > target_length:
+            groups = ["\n\n".join(current[i:i + fan_in]) for i in range(0, len(current), fan_in)]
+            levels += 1
+            if on_level:
+                on_level(levels, len(groups))
+            logger.info(f"Reduce level {levels}: {len(current)} summaries into {len(groups)}")
+            current = await self.asummarize_chunks(groups, max_length, stats=stats, engine=engine)
+        
+        return "\n\n".join(current), levels
+    
+    async def asummarize_pdf(
+        self,
+        pdf_path: str,
+        pages: Optional[AsyncIterable[str]] = None,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        max_length: int = 500,
+        on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        on_chunked: Optional[Callable[[int, int], None]] = None,
+        chunk_tokens: Optional[int] = None,
+        overlap_tokens: int = 0,
+        strip_boilerplate: bool = False,
+        batch: Optional[bool] = None,
+        engine: Optional[str] = None,
+        on_summary: Optional[Callable[[int, str], None]] = None,
+        on_token: Optional[Callable[[int, Optional[str]], None]] = None,
+        stream_tokens: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Summarize a PDF with pipelined extract, chunk and summarize stages.
+        
+        Pages are chunked as they are extracted and each chunk is summarized as soon
+        as it is complete, so the first summary is ready while later pages are still
+        being parsed. Bounded buffers between the stages cap memory use.
+        
+        Documents that fit in one chunk take a fast path: "empty_text" when nothing
+        was extracted, "short_text" when the text is no longer than `max_length` and
+        is kept as its own summary without calling the LLM, and "single_chunk" when
+        the text is summarized whole without going through the chunker.
+        
+        Args:
+            pdf_path: Path to the input PDF file
+            pages: Async iterable of page texts (default: extract on a worker thread)
+            chunk_size: Maximum size of each chunk
+            overlap: Number of characters to overlap between chunks
+            max_length: Maximum length of each summary
+            on_progress: Optional callback invoked with (completed, total) after each chunk
+            on_chunked: Optional callback invoked with (text_length, num_chunks) once
+                extraction and chunking are finished
+            chunk_tokens: Token budget per chunk; when set, replaces chunk_size/overlap
+            overlap_tokens: Approximate tokens to overlap between chunks in token mode
+            strip_boilerplate: Remove lines repeated across pages before chunking
+            batch: Pack small chunks into shared requests (default: SUMMARY_BATCHING)
+            engine: Summarization engine, "llm" or "extractive" (default: SUMMARY_ENGINE)
+            on_summary: Optional callback invoked with (chunk index, summary) as each summary is ready
+            on_token: Optional callback invoked with (chunk index, text) as summaries are generated
+            stream_tokens: Optional check made as each chunk starts, deciding whether on_token is used
+            
+        Returns:
+            Dictionary with the chunk summaries, extracted text length, chunk count,
+            deduplicated and failed chunk counts, LLM retry and hedge counts, the small
+            document fast path taken (or None), batched chunk count when batching and,
+            when stripping, boilerplate removal statistics
+        """
+        if pages is None:
+            pages = iterate_in_thread(iter_pdf_pages, pdf_path)
+        boilerplate = None
+        if strip_boilerplate:
+            boilerplate = self.boilerplate_filter()
+            pages = boilerplate.astrip_stream(pages, self.boilerplate_sample_pages)
+        
+        # Hold back pages until the text outgrows one chunk, so small documents skip stages
+        single_chunk_chars = chunk_tokens * SINGLE_CHUNK_CHARS_PER_TOKEN if chunk_tokens else chunk_size
+        head: List[str] = []
+        head_length = 0
+        exhausted = True
+        async for page in pages:
+            head.append(page)
+            head_length += len(page) + len(PAGE_SEPARATOR)
+            if head_length > single_chunk_chars:
+                exhausted = False
+                break
+        
+        summary_stats: Dict[str, Any] = {
+            "deduplicated_chunks": 0, "failed_chunks": 0, "llm_calls": {"retries": 0, "hedges": 0, "hedge_wins": 0}
+        }
+        fast_path = None
+        if exhausted:
+            text = "".join(page + PAGE_SEPARATOR for page in head)
+            content = text.strip()
+            text_length, num_chunks = len(text), 1
+            if not content:
+                fast_path, summaries, num_chunks = "empty_text", [], 0
+            elif len(content) <= max_length:
+                # Already shorter than a summary: the text is its own summary
+                fast_path, summaries = "short_text", [content]
+                if on_summary:
+                    on_summary(0, content)
+                if on_progress:
+                    on_progress(1, 1)
+            elif (self.count_tokens(text) <= chunk_tokens) if chunk_tokens else len(text) <= chunk_size:
+                fast_path = "single_chunk"
+                summaries = await self.asummarize_chunks(
+                    [text], max_length, on_progress=on_progress, stats=summary_stats, batch=False, engine=engine,
+                    on_summary=on_summary, on_token=on_token, stream_tokens=stream_tokens
+                )
+            if fast_path:
+                logger.info(f"Small document fast path '{fast_path}' for text of length {text_length}")
+                if on_chunked:
+                    on_chunked(text_length, num_chunks)
+        
+        if fast_path is None:
+            if chunk_tokens:
+                chunker = TokenBudgetChunker(chunk_tokens, overlap_tokens, SENTENCE_BOUNDARIES, self.count_tokens)
+            else:
+                chunker = IncrementalChunker(chunk_size, overlap, SENTENCE_BOUNDARIES)
+            
+            async def stream_chunks():
+                async for page in _chain_pages(head, pages):
+                    for segment in (page, PAGE_SEPARATOR):
+                        for chunk in chunker.feed(segment):
+                            yield chunk
+                for chunk in chunker.finish():
+                    yield chunk
+                if on_chunked:
+                    on_chunked(chunker.length, chunker.num_chunks)
+            
+            summaries = await self.asummarize_chunks(
+                stream_chunks(), max_length, on_progress=on_progress, stats=summary_stats, batch=batch, engine=engine,
+                on_summary=on_summary, on_token=on_token, stream_tokens=stream_tokens
+            )
+            text_length, num_chunks = chunker.length, chunker.num_chunks
+        
+        result = {
+            "summaries": summaries,
+            "extracted_text_length": text_length,
+            "num_chunks": num_chunks,
+            "deduplicated_chunks": summary_stats["deduplicated_chunks"],
+            "failed_chunks": summary_stats["failed_chunks"],
+            "llm_calls": summary_stats["llm_calls"],
+            "fast_path": fast_path
+        }
+        if "batched_chunks" in summary_stats:
+            result["batched_chunks"] = summary_stats["batched_chunks"]
+        if boilerplate:
+            result["extracted_text_length"] += boilerplate.chars_removed
+            result["boilerplate"] = boilerplate.stats()
+        return result
     
     def generate_pdf(self, text: str, output_path: str) -> str:
         """
@@ -285,36 +1073,51 @@ class SharedLlamaClient:
                 temp_dir = tempfile.TemporaryDirectory()
                 output_dir = temp_dir.name
             
-            # Extract text from PDF
-            extracted_text = self.extract_text_from_pdf(pdf_path)
-            
-            # Chunk the text
-            chunks = self.chunk_text(extracted_text)
+            # Extract, chunk and summarize as a pipeline
+            options = {"strip_boilerplate": self.strip_boilerplate, "engine": self.summary_engine}
+            if self.chunking_mode == "tokens":
+                options.update(chunk_tokens=self.chunk_token_budget(), overlap_tokens=self.chunk_overlap_tokens)
+            pipeline = _run_coroutine_sync(self.asummarize_pdf(pdf_path, **options))
             
-            # Summarize each chunk
-            summaries = []
-            for i, chunk in enumerate(chunks):
-                summary = self.summarize_text(chunk)
-                summaries.append(summary)
-            
-            # Create a combined summary
-            combined_summary = "\n\n".join(summaries)
+            # Create a combined summary, reduced to a bounded length in tree mode
+            reduce_levels = 0
+            if self.summary_mode == "tree":
+                reduce_stats: Dict[str, Any] = {}
+                combined_summary, reduce_levels = _run_coroutine_sync(
+                    self.areduce_summaries(pipeline["summaries"], stats=reduce_stats, engine=self.summary_engine)
+                )
+                add_call_stats(pipeline, reduce_stats)
+            else:
+                combined_summary = "\n\n".join(pipeline["summaries"])
             
-            # Generate summary PDF
-            summary_pdf_path = os.path.join(output_dir, "summary.pdf")
-            self.generate_pdf(combined_summary, summary_pdf_path)
+            # Generate summary PDF, unless there is no text to summarize
+            summary_pdf_path = None
+            if pipeline["fast_path"] != "empty_text":
+                summary_pdf_path = os.path.join(output_dir, "summary.pdf")
+                self.generate_pdf(combined_summary, summary_pdf_path)
             
             # Clean up temp directory if we created one
             if temp_dir:
                 temp_dir.cleanup()
             
-            return {
+            result = {
                 "input_pdf": pdf_path,
-                "extracted_text_length": len(extracted_text),
-                "num_chunks": len(chunks),
+                "summary_engine": self.summary_engine,
+                "extracted_text_length": pipeline["extracted_text_length"],
+                "num_chunks": pipeline["num_chunks"],
+                "deduplicated_chunks": pipeline["deduplicated_chunks"],
+                "reduce_levels": reduce_levels,
+                "failed_chunks": pipeline["failed_chunks"],
+                "llm_calls": pipeline["llm_calls"],
                 "summary_length": len(combined_summary),
+                "fast_path": pipeline["fast_path"],
                 "output_pdf": summary_pdf_path
             }
+            if "batched_chunks" in pipeline:
+                result["batched_chunks"] = pipeline["batched_chunks"]
+            if "boilerplate" in pipeline:
+                result["boilerplate"] = pipeline["boilerplate"]
+            return result
             
         except Exception as e:
             error_msg = f"Error processing PDF: {str(e)}"
@@ -0,0 +1,191 @@
+"""
+Boilerplate stripping for the PDF chunking system.
+This module finds lines repeated across pages (running headers, footers, page
+numbers, disclaimers) at the top and bottom of pages and removes them before
+text is summarized.
+"""
+
+import re
+import logging
+from collections import Counter
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from backend.utils.tokens import count_tokens
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+
+# Page-number-like tokens: "page 3", "p. 3 of 40", "3 of 40", "3/40", or a line that is only a number
+_PAGE_NUMBER = re.compile(
+    r"\b(?:page|pg\.?|p\.)\s*\d+(?:\s*(?:of|/)\s*\d+)?\b"
+    r"|\b\d+\s*(?:of|/)\s*\d+\b"
+    r"|^[-\u2013\u2014\s]*\d+[-\u2013\u2014\s]*$"
+)
+
+
+def line_key(line: str) -> Optional[int]:
+    """
+    Hash a line for boilerplate detection.
+
+    Whitespace is collapsed and digits in page-number-like tokens are masked, so
+    "Page 3 of 40" and "Page 4 of 40" hash the same while other numbers, such
+    as table figures, are kept.
+
+    Args:
+        line: Line of page text
+
+    Returns:
+        Hash of the normalized line, or None for blank lines
+    """
+    normalized = _WHITESPACE.sub(" ", line).strip().lower()
+    normalized = _PAGE_NUMBER.sub(lambda match: _DIGITS.sub("#", match.group()), normalized)
+    if not normalized:
+        return None
+    return hash(normalized)
+
+
+class BoilerplateFilter:
+    """
+    Removes lines that repeat across the pages of a document.
+
+    Only the first and last `zone_lines` non-blank lines of each page, where
+    running headers and footers sit, are considered. A line there is boilerplate
+    when its normalized form appears in the zone of at least `min_pages` pages
+    and of at least `min_fraction` of the pages learned from.
+    """
+
+    def __init__(self, min_pages: int = 3, min_fraction: float = 0.5,
+                 count_tokens: Callable[[str], int] = count_tokens, zone_lines: int = 3):
+        """
+        Initialize the filter.
+
+        Args:
+            min_pages: Minimum number of pages a line must appear on
+            min_fraction: Minimum fraction of pages a line must appear on
+            count_tokens: Function counting the tokens of a text, for reporting
+            zone_lines: Non-blank lines at the top and at the bottom of a page that may be boilerplate
+        """
+        self.min_pages = min_pages
+        self.min_fraction = min_fraction
+        self.count_tokens = count_tokens
+        self.zone_lines = zone_lines
+
+        self.boilerplate: Set[int] = set()
+        self.pages_learned = 0
+        self.lines_removed = 0
+        self.chars_removed = 0
+        self.tokens_saved = 0
+
+    def zone(self, lines: List[str]) -> Set[int]:
+        """
+        Find the header and footer lines of a page.
+
+        Args:
+            lines: Lines of page text
+
+        Returns:
+            Indices of the first and last `zone_lines` non-blank lines
+        """
+        non_blank = [index for index, line in enumerate(lines) if line.strip()]
+        if self.zone_lines <= 0:
+            return set()
+        return set(non_blank[:self.zone_lines]) | set(non_blank[-self.zone_lines:])
+
+    def learn(self, pages: Iterable[str]) -> int:
+        """
+        Find the boilerplate lines of a set of pages.
+
+        Args:
+            pages: Page texts to learn from
+
+        Returns:
+            Number of distinct boilerplate lines found
+        """
+        page_counts: Counter = Counter()
+        num_pages = 0
+        for page in pages:
+            num_pages += 1
+            lines = page.split("\n")
+            keys = {line_key(lines[index]) for index in self.zone(lines)}
+            page_counts.update(keys - {None})
+
+        self.pages_learned = num_pages
+        threshold = max(self.min_pages, self.min_fraction * num_pages)
+        self.boilerplate = {key for key, count in page_counts.items() if count >= threshold}
+        if self.boilerplate:
+            logger.info(f"Found {len(self.boilerplate)} boilerplate lines across {num_pages} pages")
+        return len(self.boilerplate)
+
+    def strip(self, page: str) -> str:
+        """
+        Remove boilerplate lines from the header and footer of a page.
+
+        Args:
+            page: Page text
+
+        Returns:
+            Page text without boilerplate lines
+        """
+        if not self.boilerplate:
+            return page
+        lines = page.split("\n")
+        zone = self.zone(lines)
+        kept, removed = [], []
+        for index, line in enumerate(lines):
+            if index in zone and line_key(line) in self.boilerplate:
+                removed.append(line)
+            else:
+                kept.append(line)
+        if not removed:
+            return page
+
+        removed_text = "\n".join(removed)
+        self.lines_removed += len(removed)
+        self.chars_removed += len(page) - len("\n".join(kept))
+        self.tokens_saved += self.count_tokens(removed_text)
+        return "\n".join(kept)
+
+    async def astrip_stream(self, pages: AsyncIterable[str], sample_pages: int = 20) -> AsyncIterator[str]:
+        """
+        Strip boilerplate from streamed pages, learning from the first pages.
+
+        The first `sample_pages` pages are held back until boilerplate has been
+        learned from them, then every page is stripped as it passes through.
+
+        Args:
+            pages: Async iterable of page texts
+            sample_pages: Number of leading pages to learn boilerplate from
+
+        Yields:
+            Page texts without boilerplate lines, in page order
+        """
+        sample: List[str] = []
+        learned = False
+        async for page in pages:
+            if learned:
+                yield self.strip(page)
+                continue
+            sample.append(page)
+            if len(sample) >= sample_pages:
+                self.learn(sample)
+                learned = True
+                for held in sample:
+                    yield self.strip(held)
+                sample = []
+        if not learned:
+            self.learn(sample)
+            for held in sample:
+                yield self.strip(held)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return what was removed so far."""
+        return {
+            "boilerplate_lines": len(self.boilerplate),
+            "lines_removed": self.lines_removed,
+            "chars_removed": self.chars_removed,
+            "tokens_saved": self.tokens_saved,
+        }
@@ -0,0 +1,503 @@
+"""
+Text chunking for the PDF chunking system.
+This module provides an incremental chunker that consumes text as it is
+extracted and emits overlapping chunks as soon as their boundaries are known,
+and a boundary-indexed chunker for whole texts with sparse break points.
+"""
+
+import bisect
+import logging
+from array import array
+from collections.abc import Sequence as SequenceABC
+from itertools import accumulate
+from operator import add
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from backend.utils.pdf_text import PageBuffer
+from backend.utils.tokens import DEFAULT_CHARS_PER_TOKEN, count_tokens
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Preferred break points, in order, with how many characters of the separator to keep
+SENTENCE_BOUNDARIES: Tuple[Tuple[str, int], ...] = (
+    ('. ', 1),    # Sentence boundary: include the period
+    ('\n\n', 2),  # Paragraph boundary: include the newlines
+)
+LINE_BOUNDARIES: Tuple[Tuple[str, int], ...] = SENTENCE_BOUNDARIES + (
+    ('\n', 1),    # Line break: include the newline
+)
+
+# Characters sampled when choosing between window scans and a boundary index
+INDEX_SAMPLE_SIZE = 64 * 1024
+
+# Characters sampled to estimate characters per token
+TOKEN_SAMPLE_SIZE = 16 * 1024
+
+
+class IncrementalChunker:
+    """
+    Chunker that accepts text piece by piece.
+
+    Produces the same chunks as splitting the concatenated text at once: each chunk
+    is at most `chunk_size` characters, ends at the last preferred boundary in its
+    window when there is one, and the next chunk starts `overlap` characters before
+    its end. A chunk shorter than the overlap is followed without overlap, so the
+    chunker always moves forward.
+
+    With `spans=True` the chunker emits (start, end) offsets into the fed text
+    instead of chunk strings.
+    """
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200,
+                 boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES,
+                 spans: bool = False):
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_size: Maximum size of each chunk
+            overlap: Number of characters to overlap between chunks
+            boundaries: Preferred break points as (separator, characters kept) pairs
+            spans: Emit (start, end) offsets instead of chunk strings
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+        self.overlap = max(0, overlap)
+        self.boundaries = tuple(boundaries)
+        self.spans = spans
+
+        self._buffer = ""
+        self._offset = 0      # Absolute position of _buffer[0]
+        self._start = 0       # Absolute start of the next chunk
+        self._finished = False
+        self.length = 0       # Total characters fed so far
+        self.num_chunks = 0
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text and return the chunks that are now complete.
+
+        Args:
+            text: Next piece of the document
+
+        Returns:
+            Chunks whose boundaries no longer depend on text still to come
+        """
+        if self._finished:
+            raise RuntimeError("Cannot feed a finished chunker")
+        self._buffer += text
+        self.length += len(text)
+        return self._emit()
+
+    def finish(self) -> List[str]:
+        """
+        Mark the end of the document and return the remaining chunks.
+
+        Returns:
+            The final chunks
+        """
+        self._finished = True
+        chunks = self._emit()
+        logger.info(f"Created {self.num_chunks} chunks from text of length {self.length}")
+        return chunks
+
+    def _emit(self) -> list:
+        chunks = []
+        buffer_end = self._offset + len(self._buffer)
+
+        while self._start < buffer_end:
+            start = self._start
+            end = start + self.chunk_size
+            # Until the document is finished, a chunk is only final once text exists past its window
+            if not self._finished and end >= buffer_end:
+                break
+            end = min(end, buffer_end)
+
+            if end < buffer_end:
+                end = self._break_point(start, end)
+
+            if self.spans:
+                chunks.append((start, end))
+            else:
+                chunks.append(self._buffer[start - self._offset:end - self._offset])
+            self.num_chunks += 1
+
+            next_start = end - self.overlap if end < buffer_end else buffer_end
+            # Overlap never reaches back past the start of the chunk just emitted
+            self._start = next_start if next_start > start else end
+
+        # Drop consumed text once it dominates the buffer, keeping trimming linear overall
+        consumed = self._start - self._offset
+        if consumed > 0 and consumed * 2 >= len(self._buffer):
+            self._buffer = self._buffer[consumed:]
+            self._offset = self._start
+        return chunks
+
+    def _break_point(self, start: int, end: int) -> int:
+        """Find the preferred end of the chunk in [start, end)."""
+        local_start = start - self._offset
+        local_end = end - self._offset
+        for separator, keep in self.boundaries:
+            position = self._buffer.rfind(separator, local_start, local_end)
+            if position > local_start:
+                return position + keep + self._offset
+        return end
+
+
+def find_all(text: str, separator: str) -> List[int]:
+    """
+    Find every occurrence of a separator, including overlapping ones.
+
+    Non-overlapping occurrences come from a single str.split pass; occurrences
+    overlapping those (e.g. the second '\\n\\n' in '\\n\\n\\n') are added afterwards.
+
+    Args:
+        text: Text to search
+        separator: Non-empty separator to find
+
+    Returns:
+        Sorted list of occurrence start offsets
+    """
+    length = len(separator)
+    pieces = text.split(separator)
+    # Occurrence k starts after pieces 0..k and k earlier separators
+    positions = list(map(add, accumulate(map(len, pieces[:-1])), range(0, length * (len(pieces) - 1), length)))
+
+    # Shifts at which the separator can overlap itself
+    shifts = [k for k in range(1, length) if separator[k:] == separator[:length - k]]
+    if shifts and positions:
+        overlapping = [p + k for p in positions for k in shifts if text.startswith(separator, p + k)]
+        if overlapping:
+            positions = sorted(set(positions).union(overlapping))
+    return positions
+
+
+class BoundaryIndex:
+    """
+    Sorted offsets of every preferred break point in a text.
+
+    Built in one pass per separator; finding the cut point of a chunk is then a
+    binary search instead of a scan of the chunk window.
+    """
+
+    __slots__ = ("entries",)
+
+    def __init__(self, text: str, boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES):
+        """
+        Index the boundaries of a text.
+
+        Args:
+            text: Text to index
+            boundaries: Preferred break points as (separator, characters kept) pairs
+        """
+        self.entries = [(find_all(text, separator), len(separator), keep) for separator, keep in boundaries]
+
+    def break_point(self, start: int, end: int) -> int:
+        """Find the preferred end of the chunk in [start, end), as str.rfind would."""
+        for positions, length, keep in self.entries:
+            i = bisect.bisect_right(positions, end - length) - 1
+            if i >= 0 and positions[i] > start:
+                return positions[i] + keep
+        return end
+
+
+class TokenBudgetChunker:
+    """
+    Chunker that sizes chunks to a token budget instead of a character count.
+
+    Keeps the boundary preferences of IncrementalChunker: the characters per token
+    of the first text fed sets the chunk window, and any chunk that still exceeds
+    the budget is split again at its own boundaries.
+    """
+
+    def __init__(self, max_tokens: int, overlap_tokens: int = 0,
+                 boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES,
+                 count_tokens: Callable[[str], int] = count_tokens):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_tokens: Maximum number of tokens in each chunk
+            overlap_tokens: Approximate number of tokens to overlap between chunks
+            boundaries: Preferred break points as (separator, characters kept) pairs
+            count_tokens: Function counting the tokens of a text
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = max(0, overlap_tokens)
+        self.boundaries = tuple(boundaries)
+        self.count_tokens = count_tokens
+        self.chars_per_token = DEFAULT_CHARS_PER_TOKEN
+
+        self._chunker: Optional[IncrementalChunker] = None
+        self.num_chunks = 0
+
+    @property
+    def length(self) -> int:
+        """Total characters fed so far."""
+        return self._chunker.length if self._chunker else 0
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text and return the chunks that are now complete.
+
+        Args:
+            text: Next piece of the document
+
+        Returns:
+            Chunks within the token budget
+        """
+        if self._chunker is None:
+            self._chunker = self._calibrate(text)
+        return self._fit(self._chunker.feed(text))
+
+    def finish(self) -> List[str]:
+        """
+        Mark the end of the document and return the remaining chunks.
+
+        Returns:
+            The final chunks
+        """
+        if self._chunker is None:
+            self._chunker = self._calibrate("")
+        return self._fit(self._chunker.finish())
+
+    def _calibrate(self, text: str) -> IncrementalChunker:
+        """Create the character chunker from the characters per token of a sample."""
+        sample = text[:TOKEN_SAMPLE_SIZE]
+        tokens = self.count_tokens(sample) if sample else 0
+        if tokens:
+            self.chars_per_token = len(sample) / tokens
+        chunk_size = max(1, int(self.max_tokens * self.chars_per_token))
+        overlap = min(int(self.overlap_tokens * self.chars_per_token), chunk_size - 1)
+        logger.info(f"Token chunking with {self.chars_per_token:.2f} characters per token, chunk_size={chunk_size}")
+        return IncrementalChunker(chunk_size, overlap, self.boundaries)
+
+    def _fit(self, chunks: List[str]) -> List[str]:
+        """Split chunks that exceed the token budget."""
+        fitted = []
+        for chunk in chunks:
+            fitted += self._split(chunk)
+        self.num_chunks += len(fitted)
+        return fitted
+
+    def _split(self, chunk: str) -> List[str]:
+        """Split one chunk until every piece is within the token budget."""
+        tokens = self.count_tokens(chunk)
+        if tokens <= self.max_tokens or len(chunk) <= 1:
+            return [chunk]
+        # Shrink the window in proportion to the overshoot, with some headroom
+        chunk_size = max(1, min(len(chunk) - 1, int(len(chunk) * self.max_tokens / tokens * 0.9)))
+        overlap = min(int(self.overlap_tokens * self.chars_per_token), chunk_size // 2)
+        pieces = IncrementalChunker(chunk_size, overlap, self.boundaries)
+        return [piece for part in pieces.feed(chunk) + pieces.finish() for piece in self._split(part)]
+
+
+def chunk_text_by_tokens(text: Union[str, PageBuffer], max_tokens: int, overlap_tokens: int = 0,
+                         boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES,
+                         count_tokens: Callable[[str], int] = count_tokens) -> List[str]:
+    """
+    Split text into chunks of at most `max_tokens` tokens.
+
+    Args:
+        text: Text or page buffer to chunk
+        max_tokens: Maximum number of tokens in each chunk
+        overlap_tokens: Approximate number of tokens to overlap between chunks
+        boundaries: Preferred break points as (separator, characters kept) pairs
+        count_tokens: Function counting the tokens of a text
+
+    Returns:
+        List of text chunks
+    """
+    chunker = TokenBudgetChunker(max_tokens, overlap_tokens, boundaries, count_tokens)
+    segments = text.segments() if isinstance(text, PageBuffer) else (text,)
+    chunks = []
+    for segment in segments:
+        chunks += chunker.feed(segment)
+    return chunks + chunker.finish()
+
+
+def _indexed_spans(text: str, chunk_size: int, overlap: int,
+                   boundaries: Sequence[Tuple[str, int]]) -> Tuple[array, array]:
+    """Compute chunk spans of a whole text with a boundary index."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    overlap = max(0, overlap)
+    index = BoundaryIndex(text, boundaries)
+    starts, ends = array("q"), array("q")
+    start = 0
+    text_length = len(text)
+
+    while start < text_length:
+        end = min(start + chunk_size, text_length)
+        if end < text_length:
+            end = index.break_point(start, end)
+        starts.append(start)
+        ends.append(end)
+
+        next_start = end - overlap if end < text_length else text_length
+        start = next_start if next_start > start else end
+
+    logger.info(f"Created {len(starts)} chunks from text of length {text_length}")
+    return starts, ends
+
+
+def chunk_text_indexed(text: str, chunk_size: int = 1000, overlap: int = 200,
+                       boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES) -> List[str]:
+    """
+    Split text into chunks using a boundary index.
+
+    Produces the same chunks as IncrementalChunker.
+
+    Args:
+        text: Text to chunk
+        chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+        boundaries: Preferred break points as (separator, characters kept) pairs
+
+    Returns:
+        List of text chunks
+    """
+    starts, ends = _indexed_spans(text, chunk_size, overlap, boundaries)
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+
+def prefers_boundary_index(text: str, chunk_size: int,
+                           boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES) -> bool:
+    """
+    Decide whether indexing boundaries beats scanning chunk windows.
+
+    Window scans stop at the last preferred boundary, so they are cheap unless
+    that boundary is usually far back in the window. Building the index costs a
+    pass over the text, which only pays off when boundaries are sparse.
+
+    Args:
+        text: Text about to be chunked
+        chunk_size: Maximum size of each chunk
+        boundaries: Preferred break points as (separator, characters kept) pairs
+
+    Returns:
+        True if the first preferred boundary is on average more than two chunks apart
+    """
+    if not boundaries or len(text) <= chunk_size:
+        return False
+    sample = text[:INDEX_SAMPLE_SIZE]
+    return sample.count(boundaries[0][0]) * chunk_size * 2 < len(sample)
+
+
+class ChunkSpans(SequenceABC):
+    """
+    Chunks stored as (start, end) offsets into their source text.
+
+    Offsets live in two arrays, so a chunk costs 16 bytes until its text is
+    needed; indexing or iterating slices the source on demand. For a PageBuffer
+    source each span also maps to the pages it covers.
+    """
+
+    __slots__ = ("source", "starts", "ends")
+
+    def __init__(self, source: Union[str, PageBuffer], starts: array, ends: array):
+        """
+        Initialize the chunk spans.
+
+        Args:
+            source: Text or page buffer the offsets refer to
+            starts: Start offset of each chunk
+            ends: End offset (exclusive) of each chunk
+        """
+        self.source = source
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self.starts[index], self.ends[index]
+        if isinstance(self.source, PageBuffer):
+            return self.source.slice(start, end)
+        return self.source[start:end]
+
+    def __repr__(self) -> str:
+        return f"ChunkSpans(chunks={len(self)}, length={len(self.source)})"
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """Return the (start, end) offsets of a chunk."""
+        return self.starts[index], self.ends[index]
+
+    def pages(self, index: int) -> Optional[Tuple[int, int]]:
+        """
+        Return the first and last page a chunk covers.
+
+        Args:
+            index: Chunk index
+
+        Returns:
+            (first page, last page) indexes, or None if the source has no pages
+        """
+        if not isinstance(self.source, PageBuffer):
+            return None
+        start, end = self.span(index)
+        return self.source.page_at(start), self.source.page_at(max(start, end - 1))
+
+
+def chunk_spans(text: Union[str, PageBuffer], chunk_size: int = 1000, overlap: int = 200,
+                boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES,
+                indexed: Optional[bool] = None) -> ChunkSpans:
+    """
+    Split text into chunk spans without copying any chunk text.
+
+    A PageBuffer is chunked page by page without joining the document. Text with
+    sparse boundaries is chunked with a boundary index; both give the same chunks.
+
+    Args:
+        text: Text or page buffer to chunk
+        chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+        boundaries: Preferred break points as (separator, characters kept) pairs
+        indexed: Force (True) or disable (False) the boundary index (default: automatic)
+
+    Returns:
+        ChunkSpans over the text
+    """
+    if indexed is None:
+        indexed = isinstance(text, str) and prefers_boundary_index(text, chunk_size, boundaries)
+    if indexed:
+        return ChunkSpans(text, *_indexed_spans(str(text), chunk_size, overlap, boundaries))
+
+    chunker = IncrementalChunker(chunk_size, overlap, boundaries, spans=True)
+    segments = text.segments() if isinstance(text, PageBuffer) else (text,)
+    starts, ends = array("q"), array("q")
+    for segment in segments:
+        for start, end in chunker.feed(segment):
+            starts.append(start)
+            ends.append(end)
+    for start, end in chunker.finish():
+        starts.append(start)
+        ends.append(end)
+    return ChunkSpans(text, starts, ends)
+
+
+def chunk_text(text: Union[str, PageBuffer], chunk_size: int = 1000, overlap: int = 200,
+               boundaries: Sequence[Tuple[str, int]] = SENTENCE_BOUNDARIES,
+               indexed: Optional[bool] = None) -> List[str]:
+    """
+    Split text into chunks with optional overlap.
+
+    Args:
+        text: Text or page buffer to chunk
+        chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+        boundaries: Preferred break points as (separator, characters kept) pairs
+        indexed: Force (True) or disable (False) the boundary index (default: automatic)
+
+    Returns:
+        List of text chunks
+    """
+    return list(chunk_spans(text, chunk_size, overlap, boundaries, indexed))
@@ -0,0 +1,203 @@
+"""
+Job event streaming for the PDF chunking system.
+This module fans out events published by running jobs (chunk summaries,
+generated tokens, completion) to Server-Sent Events subscribers.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# An event as delivered to subscribers: (event id, event name, data)
+JobEvent = Tuple[int, str, Dict[str, Any]]
+
+# Events after which a job publishes nothing more
+FINAL_EVENTS = ("complete", "error")
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """
+    Format an event as a Server-Sent Events frame.
+
+    Args:
+        event: Event name
+        data: JSON-serializable event data
+        event_id: Optional id, sent back by clients in Last-Event-ID when they reconnect
+
+    Returns:
+        The frame, terminated by a blank line
+    """
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class JobSubscription:
+    """
+    Events of one job waiting to be sent to one client.
+
+    A subscription that falls `max_pending` events behind is closed and marked
+    as overflowed rather than buffering without bound.
+    """
+
+    def __init__(self, max_pending: int):
+        """
+        Initialize the subscription.
+
+        Args:
+            max_pending: Events buffered before the subscription overflows
+        """
+        self.max_pending = max_pending
+        self.events: Deque[JobEvent] = deque()
+        self.closed = False
+        self.overflowed = False
+        self._ready = asyncio.Event()
+
+    def push(self, event: JobEvent) -> None:
+        """Buffer an event for the client."""
+        if self.closed:
+            return
+        if len(self.events) >= self.max_pending:
+            self.overflowed = True
+            self.closed = True
+        else:
+            self.events.append(event)
+        self._ready.set()
+
+    def finish(self) -> None:
+        """Mark that no more events will arrive."""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[JobEvent]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            The next event, or None on timeout or once the subscription is closed and drained
+        """
+        if not self.events and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.events.popleft() if self.events else None
+
+
+class JobEventHub:
+    """
+    In-process publish/subscribe hub for job events.
+
+    Provides:
+    - Per-job event ids, increasing from 1
+    - A bounded history of replayable events for running jobs, so clients that
+      subscribe late or reconnect with Last-Event-ID miss nothing but token deltas
+    - Bounded per-subscriber buffers
+
+    Publishing and subscribing happen on the server's event loop. Jobs run by
+    processing workers in other processes publish to their own, unsubscribed hub.
+    """
+
+    def __init__(self, history_size: int = 1000, max_pending: int = 1000):
+        """
+        Initialize the hub.
+
+        Args:
+            history_size: Replayable events kept per running job
+            max_pending: Events buffered per subscriber before it is dropped
+        """
+        self.history_size = history_size
+        self.max_pending = max_pending
+        self._last_ids: Dict[str, int] = {}
+        self._history: Dict[str, Deque[JobEvent]] = {}
+        self._subscribers: Dict[str, Set[JobSubscription]] = {}
+
+    @classmethod
+    def from_env(cls) -> "JobEventHub":
+        """Create a hub configured from environment variables."""
+        return cls(
+            history_size=int(os.getenv("JOB_EVENT_HISTORY", "1000")),
+            max_pending=int(os.getenv("JOB_EVENT_QUEUE_SIZE", "1000")),
+        )
+
+    def publish(self, job_id: str, event: str, data: Dict[str, Any], replay: bool = True) -> int:
+        """
+        Publish an event to the job's subscribers.
+
+        Args:
+            job_id: ID of the job
+            event: Event name
+            data: JSON-serializable event data
+            replay: Keep the event for clients that subscribe later
+
+        Returns:
+            Id of the event
+        """
+        event_id = self._last_ids.get(job_id, 0) + 1
+        self._last_ids[job_id] = event_id
+        item = (event_id, event, data)
+        if replay:
+            history = self._history.get(job_id)
+            if history is None:
+                history = self._history[job_id] = deque(maxlen=self.history_size)
+            history.append(item)
+        for subscription in self._subscribers.get(job_id, ()):
+            subscription.push(item)
+        return event_id
+
+    def subscribe(self, job_id: str, last_event_id: int = 0, replay: bool = True) -> JobSubscription:
+        """
+        Subscribe to a job's events, starting with its replayable history.
+
+        Args:
+            job_id: ID of the job
+            last_event_id: Id of the last event the client already has
+            replay: Start with the history; otherwise only later events are delivered
+
+        Returns:
+            Subscription to read events from; unsubscribe when done
+        """
+        subscription = JobSubscription(self.max_pending)
+        for item in self._history.get(job_id, ()) if replay else ():
+            if item[0] > last_event_id:
+                subscription.push(item)
+        self._subscribers.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def has_subscribers(self, job_id: str) -> bool:
+        """Check whether any client is subscribed to a job's events."""
+        return bool(self._subscribers.get(job_id))
+
+    def unsubscribe(self, job_id: str, subscription: JobSubscription) -> None:
+        """Remove a subscription."""
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def close(self, job_id: str) -> None:
+        """Forget a finished job, ending its subscriptions once they are drained."""
+        self._last_ids.pop(job_id, None)
+        self._history.pop(job_id, None)
+        for subscription in self._subscribers.pop(job_id, ()):
+            subscription.finish()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tracked jobs and subscribers."""
+        return {
+            "jobs": len(self._last_ids),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+        }
@@ -0,0 +1,472 @@
+"""
+Job store for the PDF chunking system.
+This module provides pluggable storage for processing job records, with an
+in-memory backend and a SQLite backend that can be shared between processes.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Minimum interval between automatic expiry sweeps
+EXPIRE_INTERVAL_SECONDS = 60.0
+
+# Job fields holding files (the upload and the summary PDF) removed along with expired jobs
+JOB_FILE_FIELDS = ("file_path", "output_pdf")
+
+
+class JobStore:
+    """
+    Base class for job record storage.
+
+    Job records are JSON-serializable dictionaries keyed by "job_id". Stores keep
+    indexes by status and content key, maintain status counters incrementally and
+    expire records that have not been updated for `ttl_seconds`, deleting their
+    files once no remaining record refers to them. Every record carries a
+    "version", 1 on creation and incremented by each update.
+    """
+
+    def __init__(self, ttl_seconds: float = 0):
+        """
+        Initialize the job store.
+
+        Args:
+            ttl_seconds: Seconds after its last update before a job expires (0 disables expiry)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._last_expired = 0.0
+
+    def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new job record and return it."""
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a job record, or None if it does not exist."""
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job record and return the updated record, or None if missing."""
+        raise NotImplementedError
+
+    def get_version(self, job_id: str) -> Optional[Tuple[int, str]]:
+        """Return a job's version and status without loading its record, or None if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a job record, returning whether it existed."""
+        raise NotImplementedError
+
+    def find_by_status(self, status: str, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Return up to `limit` jobs with the given status (all of them for None), oldest first."""
+        raise NotImplementedError
+
+    def find_by_content_key(self, content_key: str, status: str = "complete") -> Optional[Dict[str, Any]]:
+        """Return the most recently updated job with the given content key and status."""
+        raise NotImplementedError
+
+    def claim_next(self, from_status: str, **fields) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest job with the given status.
+
+        Args:
+            from_status: Status of the jobs to claim from (e.g. "uploaded")
+            **fields: Fields merged into the claimed job, which must change its status
+
+        Returns:
+            The claimed job record, or None if no job has the status
+        """
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each status."""
+        raise NotImplementedError
+
+    def total(self) -> int:
+        """Return the total number of jobs."""
+        return sum(self.counts().values())
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Remove expired jobs and their files, and return how many jobs were removed."""
+        raise NotImplementedError
+
+    def _referenced_paths(self, paths: Set[str]) -> Set[str]:
+        """Return the paths among `paths` that a stored job still refers to."""
+        raise NotImplementedError
+
+    def _delete_files(self, expired: List[Dict[str, Any]]) -> None:
+        """
+        Delete the files of expired jobs.
+
+        Uploads deduplicated against a finished job share its files, so paths
+        still referenced by a remaining job are kept.
+        """
+        paths = {job[field] for job in expired for field in JOB_FILE_FIELDS if job.get(field)}
+        if not paths:
+            return
+        for path in paths - self._referenced_paths(paths):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not delete file of expired job {path}: {str(e)}")
+
+    def close(self) -> None:
+        """Release resources held by the store."""
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def _expires_at(self, updated_at: float) -> Optional[float]:
+        """Expiry timestamp for a record updated at `updated_at`."""
+        return updated_at + self.ttl_seconds if self.ttl_seconds > 0 else None
+
+    def _maybe_expire(self) -> None:
+        """Run an expiry sweep if the last one was long enough ago."""
+        if self.ttl_seconds <= 0:
+            return
+        now = time.time()
+        if now - self._last_expired >= EXPIRE_INTERVAL_SECONDS:
+            self._last_expired = now
+            removed = self.expire(now)
+            if removed:
+                logger.info(f"Expired {removed} jobs")
+
+
+class InMemoryJobStore(JobStore):
+    """Job store kept in process memory, indexed by status and content key."""
+
+    def __init__(self, ttl_seconds: float = 0):
+        super().__init__(ttl_seconds)
+        self._lock = threading.RLock()
+        # Ordered by last update, so the oldest records expire first
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._by_status: Dict[str, Set[str]] = {}
+        self._by_content_key: Dict[str, Set[str]] = {}
+        self._counts: Counter = Counter()
+
+    def _index(self, job: Dict[str, Any]) -> None:
+        status = job.get("status", "unknown")
+        self._by_status.setdefault(status, set()).add(job["job_id"])
+        self._counts[status] += 1
+        if job.get("content_key"):
+            self._by_content_key.setdefault(job["content_key"], set()).add(job["job_id"])
+
+    def _unindex(self, job: Dict[str, Any]) -> None:
+        status = job.get("status", "unknown")
+        self._by_status.get(status, set()).discard(job["job_id"])
+        self._counts[status] -= 1
+        if self._counts[status] <= 0:
+            del self._counts[status]
+        if job.get("content_key"):
+            self._by_content_key.get(job["content_key"], set()).discard(job["job_id"])
+
+    def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        self._maybe_expire()
+        with self._lock:
+            record = dict(job)
+            now = time.time()
+            record.setdefault("created_at", now)
+            record["updated_at"] = now
+            record["version"] = 1
+            if record["job_id"] in self._jobs:
+                self._unindex(self._jobs.pop(record["job_id"]))
+            self._jobs[record["job_id"]] = record
+            self._index(record)
+            return dict(record)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._unindex(job)
+            job.update(fields)
+            job["updated_at"] = time.time()
+            job["version"] = job.get("version", 0) + 1
+            self._index(job)
+            self._jobs.move_to_end(job_id)
+            return dict(job)
+
+    def get_version(self, job_id: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return (job.get("version", 0), job.get("status", "unknown")) if job is not None else None
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            self._unindex(job)
+            return True
+
+    def find_by_status(self, status: str, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = sorted((self._jobs[job_id] for job_id in self._by_status.get(status, ())),
+                          key=lambda job: job["created_at"])
+            return [dict(job) for job in jobs[:limit]]
+
+    def find_by_content_key(self, content_key: str, status: str = "complete") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            matches = [self._jobs[job_id] for job_id in self._by_content_key.get(content_key, ())
+                       if self._jobs[job_id].get("status") == status]
+            if not matches:
+                return None
+            return dict(max(matches, key=lambda job: job["updated_at"]))
+
+    def claim_next(self, from_status: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            jobs = self.find_by_status(from_status, limit=1)
+            if not jobs:
+                return None
+            return self.update(jobs[0]["job_id"], **fields)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def total(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        if self.ttl_seconds <= 0:
+            return 0
+        now = now or time.time()
+        expired = []
+        with self._lock:
+            while self._jobs:
+                job_id, job = next(iter(self._jobs.items()))
+                if job["updated_at"] + self.ttl_seconds > now:
+                    break
+                del self._jobs[job_id]
+                self._unindex(job)
+                expired.append(job)
+        self._delete_files(expired)
+        return len(expired)
+
+    def _referenced_paths(self, paths: Set[str]) -> Set[str]:
+        with self._lock:
+            return {job[field] for job in self._jobs.values() for field in JOB_FILE_FIELDS
+                    if job.get(field) in paths}
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store backed by a SQLite database in WAL mode.
+
+    Status counters live in a separate table maintained by triggers, so they stay
+    correct when several processes share the database and are read in O(1).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            content_key TEXT,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            expires_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+        CREATE INDEX IF NOT EXISTS jobs_content_key ON jobs (content_key, status, updated_at);
+        CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+        CREATE TABLE IF NOT EXISTS job_counts (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS jobs_count_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO job_counts (status, count) VALUES (NEW.status, 1)
+                ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_count_delete AFTER DELETE ON jobs BEGIN
+            UPDATE job_counts SET count = count - 1 WHERE status = OLD.status;
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_count_update AFTER UPDATE OF status ON jobs
+        WHEN OLD.status != NEW.status BEGIN
+            UPDATE job_counts SET count = count - 1 WHERE status = OLD.status;
+            INSERT INTO job_counts (status, count) VALUES (NEW.status, 1)
+                ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        END;
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 0):
+        """
+        Initialize the SQLite job store.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl_seconds: Seconds after its last update before a job expires (0 disables expiry)
+        """
+        super().__init__(ttl_seconds)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        logger.info(f"SQLite job store opened at {path}")
+
+    def _load(self, row) -> Optional[Dict[str, Any]]:
+        return json.loads(row[0]) if row else None
+
+    def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        self._maybe_expire()
+        record = dict(job)
+        now = time.time()
+        record.setdefault("created_at", now)
+        record["updated_at"] = now
+        record["version"] = 1
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, content_key, data, created_at, updated_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record["job_id"], record.get("status", "unknown"), record.get("content_key"),
+                 json.dumps(record), record["created_at"], now, self._expires_at(now))
+            )
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._load(row)
+
+    def _write(self, job: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge fields into a loaded job and write it back. Caller holds a write transaction."""
+        job.update(fields)
+        now = time.time()
+        job["updated_at"] = now
+        job["version"] = job.get("version", 0) + 1
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, content_key = ?, data = ?, updated_at = ?, expires_at = ? "
+            "WHERE job_id = ?",
+            (job.get("status", "unknown"), job.get("content_key"), json.dumps(job), now,
+             self._expires_at(now), job["job_id"])
+        )
+        return job
+
+    def _read_modify_write(self, query: str, params: tuple, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Load one job with `query` and update it inside a single write transaction."""
+        with self._lock:
+            # BEGIN IMMEDIATE serializes read-modify-write across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                job = self._load(self._conn.execute(query, params).fetchone())
+                if job is not None:
+                    job = self._write(job, fields)
+                self._conn.execute("COMMIT")
+                return job
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        return self._read_modify_write("SELECT data FROM jobs WHERE job_id = ?", (job_id,), fields)
+
+    def get_version(self, job_id: str) -> Optional[Tuple[int, str]]:
+        # Read from the stored JSON in SQLite, so polling a job never decodes its record
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT json_extract(data, '$.version'), status FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return (row[0] or 0, row[1]) if row else None
+
+    def claim_next(self, from_status: str, **fields) -> Optional[Dict[str, Any]]:
+        return self._read_modify_write(
+            "SELECT data FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (from_status,), fields
+        )
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        return cursor.rowcount > 0
+
+    def find_by_status(self, status: str, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            # A negative LIMIT means no limit in SQLite
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status = ? ORDER BY created_at LIMIT ?", (status, -1 if limit is None else limit)
+            ).fetchall()
+        return [self._load(row) for row in rows]
+
+    def find_by_content_key(self, content_key: str, status: str = "complete") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE content_key = ? AND status = ? ORDER BY updated_at DESC LIMIT 1",
+                (content_key, status)
+            ).fetchone()
+        return self._load(row)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, count FROM job_counts WHERE count > 0").fetchall()
+        return dict(rows)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        if self.ttl_seconds <= 0:
+            return 0
+        now = now or time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT data FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+                ).fetchall()
+                self._conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._delete_files([self._load(row) for row in rows])
+        return len(rows)
+
+    def _referenced_paths(self, paths: Set[str]) -> Set[str]:
+        referenced = set()
+        with self._lock:
+            for field in JOB_FILE_FIELDS:
+                # Expiry sweeps are infrequent, so scanning the stored JSON is acceptable
+                rows = self._conn.execute(
+                    f"SELECT DISTINCT json_extract(data, '$.{field}') FROM jobs "
+                    f"WHERE json_extract(data, '$.{field}') IN ({', '.join('?' * len(paths))})",
+                    tuple(paths)
+                ).fetchall()
+                referenced.update(row[0] for row in rows)
+        return referenced
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_store() -> JobStore:
+    """
+    Create the job store selected by environment variables.
+
+    JOB_STORE selects the backend ("memory" or "sqlite"), JOB_STORE_PATH the SQLite
+    database file and JOB_TTL_SECONDS how long finished jobs are kept.
+    """
+    backend = os.getenv("JOB_STORE", "memory").lower()
+    ttl_seconds = float(os.getenv("JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    if backend == "sqlite":
+        return SQLiteJobStore(os.getenv("JOB_STORE_PATH", "./data/jobs.sqlite3"), ttl_seconds=ttl_seconds)
+    if backend != "memory":
+        raise ValueError(f"Unknown job store backend: {backend}")
+    return InMemoryJobStore(ttl_seconds=ttl_seconds)
@@ -9,6 +9,9 @@ import tempfile
 from typing import List, Dict, Any, Union, Optional, Tuple
 import uuid
 
+from backend.utils.chunking import ChunkSpans, LINE_BOUNDARIES, chunk_spans
+from backend.utils.pdf_text import PageBuffer, extract_pages
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,34 +29,28 @@ class PDFProcessor:
     
     def __init__(self):
         """Initialize the PDF processor."""
+        # Parallel page-range extraction for large PDFs
+        self.extract_processes = int(os.getenv("PDF_EXTRACT_PROCESSES", "0"))
+        self.parallel_extract_min_pages = int(os.getenv("PDF_PARALLEL_EXTRACT_MIN_PAGES", "64"))
         logger.info("PDF Processor initialized")
     
-    def extract_text_from_pdf(self, pdf_file_path: str) -> str:
+    def extract_text_from_pdf(self, pdf_file_path: str) -> PageBuffer:
         """
         Extract text from a PDF file.
         
+        PDFs with at least PDF_PARALLEL_EXTRACT_MIN_PAGES pages are extracted
+        in page ranges across worker processes.
+        
         Args:
             pdf_file_path: Path to the PDF file
             
         Returns:
-            Extracted text as a string
+            PageBuffer of the extracted pages (str() gives the full text)
         """
         try:
-            from PyPDF2 import PdfReader
-            
-            with open(pdf_file_path, 'rb') as file:
-                reader = PdfReader(file)
-                text = ""
-                total_pages = len(reader.pages)
-                logger.info(f"Extracting text from PDF with {total_pages} pages")
-                
-                for i, page in enumerate(reader.pages):
-                    # Log progress for large PDFs
-                    if i % 10 == 0 and total_pages > 20:
-                        logger.info(f"Extracting page {i+1}/{total_pages}")
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
+            pages = extract_pages(pdf_file_path, self.extract_processes, self.parallel_extract_min_pages)
+            logger.info(f"Extracted text from PDF with {len(pages)} pages")
+            text = PageBuffer(page_text for page_text in pages if page_text)
             
             logger.info(f"Extracted {len(text)} characters from PDF: {pdf_file_path}")
             return text
@@ -63,57 +60,22 @@ class PDFProcessor:
             logger.error(error_msg)
             raise RuntimeError(error_msg)
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    def chunk_text(self, text: Union[str, PageBuffer], chunk_size: int = 1000, overlap: int = 200) -> ChunkSpans:
         """
         Split text into chunks with optional overlap.
         
+        Chunks are returned as spans over the text; each chunk's text is only
+        built when it is accessed.
+        
         Args:
-            text: Text to chunk
+            text: Text or extracted PageBuffer to chunk
             chunk_size: Maximum size of each chunk
             overlap: Number of characters to overlap between chunks
             
         Returns:
-            List of text chunks
+            ChunkSpans sequence of text chunks
         """
-        chunks = []
-        start = 0
-        text_length = len(text)
-        
-        logger.info(f"Chunking text of length {text_length} with chunk_size={chunk_size}, overlap={overlap}")
-        
-        while start < text_length:
-            # Calculate end of chunk (respecting chunk_size)
-            end = min(start + chunk_size, text_length)
-            
-            # If not at the end of text and not at a sentence boundary, try to find a good break point
-            if end < text_length:
-                # Try to find sentence boundary (period followed by space or newline)
-                sentence_end = text.rfind('. ', start, end)
-                if sentence_end > start:
-                    end = sentence_end + 1  # Include the period
-                else:
-                    # Try to find paragraph boundary
-                    para_end = text.rfind('\n\n', start, end)
-                    if para_end > start:
-                        end = para_end + 2  # Include the newlines
-                    else:
-                        # Try to find line break
-                        line_end = text.rfind('\n', start, end)
-                        if line_end > start:
-                            end = line_end + 1  # Include the newline
-            
-            # Add the chunk to our list
-            chunks.append(text[start:end])
-            
-            # Calculate next start position (with overlap)
-            start = end - overlap if end < text_length else text_length
-            
-            # Ensure we don't get stuck in an infinite loop
-            if start >= end:
-                break
-        
-        logger.info(f"Created {len(chunks)} chunks from text of length {text_length}")
-        return chunks
+        return chunk_spans(text, chunk_size, overlap, LINE_BOUNDARIES)
     
     def generate_pdf(self, text: str, output_path: str, title: Optional[str] = None) -> str:
         """
@@ -0,0 +1,272 @@
+"""
+PDF text extraction helpers for the PDF chunking system.
+This module provides page-level extraction that can stream pages one at a time
+or extract page ranges in worker processes.
+"""
+
+import os
+import bisect
+import logging
+import multiprocessing
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Separator placed after every page in the extracted document text
+PAGE_SEPARATOR = "\n\n"
+
+# Page ranges handed out per worker process, so uneven pages still balance
+TASKS_PER_PROCESS = 4
+
+
+class PageBuffer:
+    """
+    Extracted document text held as a list of pages.
+
+    Each page is followed by the separator in the document text. Cumulative page
+    offsets map positions in the text to pages, and the full text is only built
+    when it is asked for, so extraction never copies the document.
+    """
+
+    __slots__ = ("pages", "separator", "offsets", "_text")
+
+    def __init__(self, pages: Iterable[str], separator: str = PAGE_SEPARATOR):
+        """
+        Initialize the page buffer.
+
+        Args:
+            pages: Page texts, in page order
+            separator: Text placed after every page
+        """
+        self.pages = list(pages)
+        self.separator = separator
+        # offsets[i] is where page i starts; the final entry is the total length
+        self.offsets = array("q", [0])
+        position = 0
+        for page in self.pages:
+            position += len(page) + len(separator)
+            self.offsets.append(position)
+        self._text: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"PageBuffer(pages={len(self.pages)}, length={len(self)})"
+
+    @property
+    def text(self) -> str:
+        """The full document text, joined on first use."""
+        if self._text is None:
+            self._text = "".join(self.segments())
+        return self._text
+
+    def segments(self) -> Iterator[str]:
+        """Yield the document text piece by piece, without joining it."""
+        for page in self.pages:
+            yield page
+            yield self.separator
+
+    def page_at(self, offset: int) -> int:
+        """
+        Find the page containing a position in the document text.
+
+        Args:
+            offset: Character offset into the document text
+
+        Returns:
+            Index of the page (separators belong to the page before them)
+        """
+        if not self.pages:
+            raise IndexError("PageBuffer is empty")
+        page = bisect.bisect_right(self.offsets, offset) - 1
+        return min(max(page, 0), len(self.pages) - 1)
+
+    def page_offset(self, page: int) -> int:
+        """Return the offset of the first character of a page."""
+        return self.offsets[page]
+
+    def slice(self, start: int, end: int) -> str:
+        """
+        Return the document text in [start, end), joining only the pages it covers.
+
+        Args:
+            start: Start offset
+            end: End offset (exclusive)
+
+        Returns:
+            The text of the range
+        """
+        if self._text is not None:
+            return self._text[start:end]
+        start, end = max(start, 0), min(end, len(self))
+        if start >= end:
+            return ""
+        parts = []
+        for page in range(self.page_at(start), self.page_at(end - 1) + 1):
+            page_text = self.pages[page] + self.separator
+            page_start = self.offsets[page]
+            parts.append(page_text[max(start - page_start, 0):end - page_start])
+        return "".join(parts)
+
+
+def count_pdf_pages(pdf_file_path: str) -> int:
+    """
+    Count the pages of a PDF file.
+
+    Args:
+        pdf_file_path: Path to the PDF file
+
+    Returns:
+        Number of pages
+    """
+    from PyPDF2 import PdfReader
+
+    with open(pdf_file_path, 'rb') as file:
+        return len(PdfReader(file).pages)
+
+
+def iter_pdf_pages(pdf_file_path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF file, one page at a time.
+
+    Args:
+        pdf_file_path: Path to the PDF file
+        start: Index of the first page to extract
+        stop: Index after the last page to extract (default: end of document)
+
+    Yields:
+        Text of each page, in page order
+    """
+    from PyPDF2 import PdfReader
+
+    with open(pdf_file_path, 'rb') as file:
+        reader = PdfReader(file)
+        total_pages = len(reader.pages)
+        stop = total_pages if stop is None else min(stop, total_pages)
+        for i in range(start, stop):
+            yield reader.pages[i].extract_text() or ""
+
+
+def extract_page_range(pdf_file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of a range of pages, opening the file independently.
+
+    Suitable for running in a worker process.
+
+    Args:
+        pdf_file_path: Path to the PDF file
+        start: Index of the first page to extract
+        stop: Index after the last page to extract
+
+    Returns:
+        List of page texts, in page order
+    """
+    return list(iter_pdf_pages(pdf_file_path, start, stop))
+
+
+def extract_small_pdf(pdf_file_path: str, min_parallel_pages: int) -> Tuple[int, Optional[List[str]]]:
+    """
+    Open a PDF once, extracting all of its pages unless it is large enough to split.
+
+    Suitable for running in a worker process: small documents need no further
+    calls, larger ones are split into page ranges using the returned count.
+
+    Args:
+        pdf_file_path: Path to the PDF file
+        min_parallel_pages: Page count at which the document is left for parallel extraction (0 = never)
+
+    Returns:
+        Number of pages, and the page texts in page order, or None for a large document
+    """
+    from PyPDF2 import PdfReader
+
+    with open(pdf_file_path, 'rb') as file:
+        reader = PdfReader(file)
+        total_pages = len(reader.pages)
+        if min_parallel_pages > 0 and total_pages >= min_parallel_pages:
+            return total_pages, None
+        return total_pages, [page.extract_text() or "" for page in reader.pages]
+
+
+def page_ranges(total_pages: int, pages_per_range: int) -> List[Tuple[int, int]]:
+    """
+    Split a document into consecutive page ranges.
+
+    Args:
+        total_pages: Number of pages in the document
+        pages_per_range: Maximum number of pages in each range
+
+    Returns:
+        List of (start, stop) page index pairs, in page order
+    """
+    pages_per_range = max(1, pages_per_range)
+    return [(start, min(start + pages_per_range, total_pages))
+            for start in range(0, total_pages, pages_per_range)]
+
+
+def extract_pages_parallel(
+    pdf_file_path: str,
+    processes: Optional[int] = None,
+    total_pages: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> List[str]:
+    """
+    Extract page texts by splitting page ranges across worker processes.
+
+    Each worker opens the file on its own; results are reassembled in page order.
+
+    Args:
+        pdf_file_path: Path to the PDF file
+        processes: Number of worker processes (default: cpu_count)
+        total_pages: Number of pages, if already known
+        executor: Existing executor to run on (default: a temporary process pool)
+
+    Returns:
+        List of page texts, in page order
+    """
+    processes = processes or os.cpu_count() or 1
+    if total_pages is None:
+        total_pages = count_pdf_pages(pdf_file_path)
+    ranges = page_ranges(total_pages, -(-total_pages // (processes * TASKS_PER_PROCESS)))
+    starts, stops = [start for start, _ in ranges], [stop for _, stop in ranges]
+
+    logger.info(f"Extracting {total_pages} pages in {len(ranges)} ranges across {processes} processes")
+    if executor is not None:
+        results = executor.map(extract_page_range, [pdf_file_path] * len(ranges), starts, stops)
+        return [page for pages in results for page in pages]
+
+    # spawn keeps workers independent of any threads in the parent process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(processes, len(ranges)) or 1, mp_context=context) as pool:
+        results = pool.map(extract_page_range, [pdf_file_path] * len(ranges), starts, stops)
+        return [page for pages in results for page in pages]
+
+
+def extract_pages(pdf_file_path: str, processes: int = 0, min_parallel_pages: int = 64) -> List[str]:
+    """
+    Extract page texts, in parallel for documents of at least `min_parallel_pages` pages.
+
+    Small documents stay on the single-process path, where starting worker
+    processes would cost more than it saves.
+
+    Args:
+        pdf_file_path: Path to the PDF file
+        processes: Number of worker processes (0 = cpu_count, 1 = never parallel)
+        min_parallel_pages: Page count at which extraction switches to worker processes
+
+    Returns:
+        List of page texts, in page order
+    """
+    processes = processes or os.cpu_count() or 1
+    total_pages = count_pdf_pages(pdf_file_path)
+    if processes > 1 and min_parallel_pages > 0 and total_pages >= min_parallel_pages:
+        return extract_pages_parallel(pdf_file_path, processes, total_pages)
+    return list(iter_pdf_pages(pdf_file_path))
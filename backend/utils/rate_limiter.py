@@ -0,0 +1,402 @@
+"""
+Rate limiting for LLM calls in the PDF chunking system.
+This module provides a process-wide limiter combining request and token
+buckets with an AIMD concurrency limit driven by rate-limit and latency signals.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Pause applied after a rate-limit error that carries no Retry-After hint
+DEFAULT_COOLDOWN_SECONDS = 2.0
+
+
+def error_status_code(error: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status code of an LLM client error.
+
+    Args:
+        error: Exception raised by an LLM call
+
+    Returns:
+        Status code, or None if the error does not carry one
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Check whether an exception is a provider rate-limit (HTTP 429) error.
+
+    Args:
+        error: Exception raised by an LLM call
+
+    Returns:
+        True for rate-limit errors
+    """
+    return type(error).__name__ == "RateLimitError" or error_status_code(error) == 429
+
+
+def rate_limit_retried(error: BaseException) -> bool:
+    """
+    Check whether a rate-limit error was already re-queued by the limiter.
+
+    Such errors are final: retrying them again would multiply the requests
+    sent to a provider that is already over its limit.
+
+    Args:
+        error: Exception raised by an LLM call
+
+    Returns:
+        True if the limiter gave up on the call after re-queueing it
+    """
+    return getattr(error, "rate_limit_retried", False) is True
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Read the Retry-After hint of a rate-limit error.
+
+    Args:
+        error: Exception raised by an LLM call
+
+    Returns:
+        Seconds to wait, or None if the error carries no usable hint
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    Reservations may take the bucket below zero; the caller then waits until
+    the debt has been refilled, so reservations are served in arrival order.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        """
+        Initialize the bucket, full.
+
+        Args:
+            per_minute: Refill rate in units per minute
+            burst_seconds: Seconds of refill the bucket can hold
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take units from the bucket. Not thread-safe; callers hold a lock.
+
+        Args:
+            amount: Units to take (capped at the bucket capacity)
+            now: Current monotonic time
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+
+class AdaptiveRateLimiter:
+    """
+    Client-side limiter in front of LLM calls.
+
+    Provides:
+    - Request and token buckets matching the provider's RPM/TPM limits (0 disables either)
+    - A concurrency limit that grows additively on fast successes and shrinks
+      multiplicatively on rate-limit errors and on calls slower than the latency target
+    - A cooldown after rate-limit errors, honouring Retry-After, with rate-limited calls re-queued;
+      the limiter owns 429 retries, and an error it gives up on is marked so
+      RetryPolicy does not retry it again
+    - One instance shared across all jobs and event loops of the process
+    """
+
+    _shared: Optional["AdaptiveRateLimiter"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 initial_concurrency: int = 8, min_concurrency: int = 1, max_concurrency: int = 32,
+                 latency_target: float = 0.0, decrease_factor: float = 0.5, max_rate_limit_retries: int = 3):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request rate limit (0 for unlimited)
+            tokens_per_minute: Token rate limit (0 for unlimited)
+            initial_concurrency: Starting number of concurrent calls
+            min_concurrency: Lower bound of the concurrency limit
+            max_concurrency: Upper bound of the concurrency limit
+            latency_target: Call latency in seconds above which concurrency is reduced (0 disables)
+            decrease_factor: Multiplier applied to the concurrency limit on a rate-limit error
+            max_rate_limit_retries: Times a rate-limited call is re-queued before the error is raised
+        """
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        self._lock = threading.Lock()
+        self._waiters: Deque[Callable[[], bool]] = deque()
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        # Calls started before the last decrease do not decrease the limit again
+        self._last_decrease = 0.0
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.slow_calls = 0
+        self.timeouts = 0
+        self.throttled_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveRateLimiter":
+        """Create a limiter configured from environment variables."""
+        return cls(
+            requests_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", "0")),
+            tokens_per_minute=float(os.getenv("LLM_RATE_LIMIT_TPM", "0")),
+            initial_concurrency=int(os.getenv("LLM_CONCURRENCY_INITIAL", "8")),
+            min_concurrency=int(os.getenv("LLM_CONCURRENCY_MIN", "1")),
+            max_concurrency=int(os.getenv("LLM_CONCURRENCY_MAX", "32")),
+            latency_target=float(os.getenv("LLM_LATENCY_TARGET", "0")),
+            max_rate_limit_retries=int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3")),
+        )
+
+    @classmethod
+    def shared(cls) -> "AdaptiveRateLimiter":
+        """Get the process-wide limiter, creating it from the environment on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+            return cls._shared
+
+    def _grant_waiters(self) -> None:
+        """Hand free slots to waiting callers in arrival order. Called with the lock held."""
+        while self._waiters and self.in_flight < int(self.limit):
+            grant = self._waiters.popleft()
+            self.in_flight += 1
+            if not grant():
+                self.in_flight -= 1
+
+    def _release(self) -> None:
+        """Free a concurrency slot."""
+        with self._lock:
+            self.in_flight -= 1
+            self._grant_waiters()
+
+    async def _acquire_async(self) -> None:
+        """Wait for a concurrency slot from async code."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve():
+            # A caller cancelled while the grant was in transit gives the slot back
+            if future.cancelled():
+                self._release()
+            else:
+                future.set_result(None)
+
+        def grant() -> bool:
+            try:
+                loop.call_soon_threadsafe(resolve)
+                return True
+            except RuntimeError:
+                # The waiting loop has been closed
+                return False
+
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            self._waiters.append(grant)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if grant in self._waiters:
+                    self._waiters.remove(grant)
+            raise
+
+    def _acquire_sync(self) -> None:
+        """Wait for a concurrency slot from synchronous code."""
+        granted = threading.Event()
+
+        def grant() -> bool:
+            granted.set()
+            return True
+
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            self._waiters.append(grant)
+        granted.wait()
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve request and token budget for one call, returning the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self.cooldown_until - now)
+            if self._requests:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens and tokens:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            self.calls += 1
+            self.throttled_seconds += delay
+            return delay
+
+    def _decrease(self, started: float, now: float) -> None:
+        """Shrink the concurrency limit once per congestion event. Called with the lock held."""
+        if started >= self._last_decrease:
+            self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+            self._last_decrease = now
+
+    def _on_success(self, started: float, latency: float) -> None:
+        """Adjust the concurrency limit after a successful call."""
+        with self._lock:
+            if self.latency_target and latency > self.latency_target:
+                self.slow_calls += 1
+                self._decrease(started, time.monotonic())
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+                self._grant_waiters()
+
+    def _on_timeout(self, started: float) -> None:
+        """Shrink the concurrency limit after a call ran past its deadline."""
+        with self._lock:
+            self.timeouts += 1
+            self._decrease(started, time.monotonic())
+
+    def _on_rate_limited(self, started: float, error: BaseException) -> None:
+        """Back off after a rate-limit error."""
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited += 1
+            self._decrease(started, now)
+            cooldown = retry_after_seconds(error)
+            self.cooldown_until = max(self.cooldown_until, now + (DEFAULT_COOLDOWN_SECONDS if cooldown is None else cooldown))
+        logger.warning(f"LLM rate limit hit, concurrency limit now {int(self.limit)}: {str(error)}")
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 0, timeout: Optional[float] = None,
+                    on_start: Optional[Callable[[], None]] = None) -> T:
+        """
+        Run an async LLM call under the limiter.
+
+        Args:
+            fn: Function starting the call
+            tokens: Estimated tokens the call consumes (prompt and completion)
+            timeout: Deadline in seconds for the call itself, excluding time spent queued
+            on_start: Optional callback invoked each time the call leaves the queue and starts
+
+        Returns:
+            Result of the call
+        """
+        for attempt in range(self.max_rate_limit_retries + 1):
+            await self._acquire_async()
+            try:
+                delay = self._reserve(tokens)
+                if delay:
+                    await asyncio.sleep(delay)
+                started = time.monotonic()
+                if on_start:
+                    on_start()
+                try:
+                    result = await (asyncio.wait_for(fn(), timeout) if timeout else fn())
+                except asyncio.TimeoutError:
+                    self._on_timeout(started)
+                    raise
+                except Exception as e:
+                    if not is_rate_limit_error(e):
+                        raise
+                    self._on_rate_limited(started, e)
+                    if attempt == self.max_rate_limit_retries:
+                        if attempt:
+                            e.rate_limit_retried = True
+                        raise
+                    continue
+                self._on_success(started, time.monotonic() - started)
+                return result
+            finally:
+                self._release()
+
+    def call(self, fn: Callable[[], T], tokens: int = 0, on_start: Optional[Callable[[], None]] = None) -> T:
+        """
+        Run a synchronous LLM call under the limiter.
+
+        Args:
+            fn: Function making the call
+            tokens: Estimated tokens the call consumes (prompt and completion)
+            on_start: Optional callback invoked each time the call leaves the queue and starts
+
+        Returns:
+            Result of the call
+        """
+        for attempt in range(self.max_rate_limit_retries + 1):
+            self._acquire_sync()
+            try:
+                delay = self._reserve(tokens)
+                if delay:
+                    time.sleep(delay)
+                started = time.monotonic()
+                if on_start:
+                    on_start()
+                try:
+                    result = fn()
+                except Exception as e:
+                    if not is_rate_limit_error(e):
+                        raise
+                    self._on_rate_limited(started, e)
+                    if attempt == self.max_rate_limit_retries:
+                        if attempt:
+                            e.rate_limit_retried = True
+                        raise
+                    continue
+                self._on_success(started, time.monotonic() - started)
+                return result
+            finally:
+                self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limits and counters."""
+        with self._lock:
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "calls": self.calls,
+                "rate_limited": self.rate_limited,
+                "slow_calls": self.slow_calls,
+                "timeouts": self.timeouts,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+            }
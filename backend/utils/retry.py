@@ -0,0 +1,269 @@
+"""
+Retry and hedging for LLM calls in the PDF chunking system.
+This module retries failed calls with jittered exponential backoff and can
+hedge slow calls with a duplicate request once they pass a latency percentile.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from backend.utils.rate_limiter import AdaptiveRateLimiter, error_status_code, rate_limit_retried
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Client exception types for transient failures that carry no status code
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "InternalServerError", "RateLimitError"}
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Check whether a failed LLM call is worth retrying.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True for timeouts, connection errors and retryable HTTP statuses, except
+        rate-limit errors the rate limiter already re-queued
+    """
+    if rate_limit_retried(error):
+        return False
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return error_status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def _count(stats: Optional[Dict[str, Any]], key: str) -> None:
+    """Increment a counter in an optional stats dictionary."""
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + 1
+
+
+class RetryPolicy:
+    """
+    Retry and hedging policy for LLM calls.
+
+    Provides:
+    - Retries of transient failures with full-jitter exponential backoff
+    - A per-request deadline, enforced by the rate limiter requests run under,
+      or by the caller around each attempt
+    - Optional hedging: once an async attempt runs longer than the given
+      percentile of recent latencies, a duplicate is sent and the first answer wins
+    - retries, hedges and hedge_wins counters in a caller-supplied stats dictionary
+    """
+
+    _shared: Optional["RetryPolicy"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 20.0,
+                 deadline: float = 0.0, hedge_percentile: float = 0.0, hedge_min_samples: int = 20,
+                 latency_window: int = 200):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts per call, including the first
+            base_delay: Backoff cap in seconds before the first retry, doubled per retry
+            max_delay: Upper bound of the backoff cap in seconds
+            deadline: Seconds each attempt may run before it is abandoned (0 disables)
+            hedge_percentile: Latency percentile after which a hedge is sent (0 disables hedging)
+            hedge_min_samples: Latencies observed before hedging starts
+            latency_window: Number of recent latencies kept for the percentile
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = max(1, hedge_min_samples)
+
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Create a policy configured from environment variables."""
+        return cls(
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "4")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "20")),
+            deadline=float(os.getenv("LLM_REQUEST_DEADLINE", "120")),
+            hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0")),
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        )
+
+    @classmethod
+    def shared(cls) -> "RetryPolicy":
+        """Get the process-wide policy, creating it from the environment on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+            return cls._shared
+
+    def backoff(self, retry: int) -> float:
+        """
+        Pick the delay before a retry.
+
+        Args:
+            retry: Number of retries already made
+
+        Returns:
+            Seconds to wait, uniformly drawn below the exponential cap
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Return the latency after which to hedge, or None while hedging is off."""
+        if not self.hedge_percentile:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))
+        return latencies[index]
+
+    def _record(self, latency: float) -> None:
+        """Record the latency of a successful attempt."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _start(self, fn: Callable[[], Awaitable[T]], limiter: Optional[AdaptiveRateLimiter], tokens: int,
+               on_start: Callable[[], None]) -> Awaitable[T]:
+        """Start one request, under the limiter when given, calling on_start once it is in flight."""
+        if limiter is None:
+            on_start()
+            return fn()
+        return limiter.acall(fn, tokens=tokens, timeout=self.deadline or None, on_start=on_start)
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], stats: Optional[Dict[str, Any]], allow_hedge: bool,
+                       limiter: Optional[AdaptiveRateLimiter] = None, tokens: int = 0) -> T:
+        """
+        Make one attempt, hedged with a duplicate request when it runs long.
+
+        Latency is measured from when the request leaves the limiter's queue, so
+        time spent waiting for a slot or budget neither triggers hedges nor enters
+        the latency percentile.
+        """
+        in_flight = asyncio.Event()
+        started = 0.0
+
+        def on_start():
+            nonlocal started
+            started = time.monotonic()
+            in_flight.set()
+
+        delay = self.hedge_delay() if allow_hedge else None
+        if delay is None:
+            result = await self._start(fn, limiter, tokens, on_start)
+            self._record(time.monotonic() - started)
+            return result
+
+        hedge = None
+        primary = asyncio.ensure_future(self._start(fn, limiter, tokens, on_start))
+        pending = {primary}
+        try:
+            # The hedge delay only runs while the request is in flight
+            queued = asyncio.ensure_future(in_flight.wait())
+            try:
+                await asyncio.wait({primary, queued}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                queued.cancel()
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                hedge = asyncio.ensure_future(self._start(fn, limiter, tokens, lambda: None))
+                pending.add(hedge)
+                _count(stats, "hedges")
+            while True:
+                error = None
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            _count(stats, "hedge_wins")
+                        self._record(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+                # Keep waiting while the other request may still succeed
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], stats: Optional[Dict[str, Any]] = None,
+                    hedge: bool = True, limiter: Optional[AdaptiveRateLimiter] = None, tokens: int = 0) -> T:
+        """
+        Run an async call with retries and hedging.
+
+        Args:
+            fn: Function starting one request of the call
+            stats: Optional dictionary whose retries, hedges and hedge_wins counts are updated
+            hedge: Allow hedged duplicates of slow attempts
+            limiter: Optional rate limiter each request, hedges included, is run under with
+                the policy's deadline; without one, the caller enforces the deadline
+            tokens: Estimated tokens each request consumes, for the limiter
+
+        Returns:
+            Result of the first successful attempt
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                return await self._attempt(fn, stats, hedge, limiter, tokens)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable_error(e):
+                    raise
+                delay = self.backoff(attempt)
+                _count(stats, "retries")
+                logger.warning(f"LLM call failed, retrying in {delay:.2f}s: {type(e).__name__}: {str(e)}")
+                await asyncio.sleep(delay)
+
+    def call(self, fn: Callable[[], T], stats: Optional[Dict[str, Any]] = None,
+             limiter: Optional[AdaptiveRateLimiter] = None, tokens: int = 0) -> T:
+        """
+        Run a synchronous call with retries. Hedging only applies to async calls.
+
+        Args:
+            fn: Function making one attempt of the call
+            stats: Optional dictionary whose retries count is updated
+            limiter: Optional rate limiter each attempt is run under; time queued in it
+                is not recorded as latency
+            tokens: Estimated tokens each attempt consumes, for the limiter
+
+        Returns:
+            Result of the first successful attempt
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                started = time.monotonic()
+                if limiter is None:
+                    result = fn()
+                else:
+                    def on_start():
+                        nonlocal started
+                        started = time.monotonic()
+                    result = limiter.call(fn, tokens=tokens, on_start=on_start)
+                self._record(time.monotonic() - started)
+                return result
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable_error(e):
+                    raise
+                delay = self.backoff(attempt)
+                _count(stats, "retries")
+                logger.warning(f"LLM call failed, retrying in {delay:.2f}s: {type(e).__name__}: {str(e)}")
+                time.sleep(delay)
@@ -0,0 +1,243 @@
+"""
+Summary cache for the PDF chunking system.
+This module provides a content-addressed cache for chunk summaries with an
+in-memory LRU tier and an optional SQLite tier on disk.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def prompt_version(*templates: str) -> str:
+    """
+    Identify a set of prompt templates.
+
+    Args:
+        templates: Every prompt template summaries may be produced with
+
+    Returns:
+        Short hex digest that changes whenever any template changes
+    """
+    digest = hashlib.sha256()
+    for template in templates:
+        encoded = template.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()[:16]
+
+
+def summary_cache_key(text: str, prompt_version: str, model: str, max_length: int) -> str:
+    """
+    Build the cache key for a chunk summary.
+
+    The key covers the version of the prompts rather than the prompt used for
+    the request, so a summary produced by a batched request is reused by a
+    single-chunk request for the same chunk and vice versa, while a change to
+    either prompt invalidates both.
+
+    Args:
+        text: Chunk text being summarized
+        prompt_version: Version of the prompt templates, from prompt_version()
+        model: Name of the model producing the summary
+        max_length: Maximum summary length requested
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, str(max_length), text):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so different splits never collide
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Two-tier summary cache with size-based eviction.
+
+    Provides:
+    - An in-memory LRU tier bounded by total summary size
+    - An optional SQLite tier bounded by total summary size, evicting least recently used entries
+    - Hit/miss counters for status reporting
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_path: Optional[str] = None,
+                 disk_max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize the summary cache.
+
+        Args:
+            max_bytes: Maximum size of the in-memory tier (0 disables caching in memory)
+            disk_path: Path of the SQLite database for the disk tier (optional)
+            disk_max_bytes: Maximum size of the disk tier
+        """
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+        if disk_path:
+            self._open_disk(disk_path)
+
+        logger.info(f"Summary cache initialized with max_bytes={max_bytes}, disk_path={disk_path}")
+
+    @classmethod
+    def from_env(cls) -> "SummaryCache":
+        """Create a summary cache configured from environment variables."""
+        disk_path = None
+        if os.getenv("SUMMARY_CACHE_DISK", "false").lower() in ("1", "true", "yes"):
+            output_dir = os.getenv("PDF_OUTPUT_DIR", "./data/outputs")
+            disk_path = os.getenv("SUMMARY_CACHE_PATH") or os.path.join(output_dir, "summary_cache.sqlite3")
+        return cls(
+            max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            disk_path=disk_path,
+            disk_max_bytes=int(os.getenv("SUMMARY_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))),
+        )
+
+    def _open_disk(self, path: str) -> None:
+        """Open (or create) the SQLite tier."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._disk = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self._disk.execute("PRAGMA journal_mode=WAL")
+        self._disk.execute("PRAGMA synchronous=NORMAL")
+        self._disk.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._disk.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries (last_used)")
+        self._disk.commit()
+        self._disk_bytes = self._disk.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+
+    @staticmethod
+    def _size(key: str, summary: str) -> int:
+        """Approximate storage size of an entry in bytes."""
+        return len(key) + len(summary.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a summary, promoting disk hits into memory.
+
+        Args:
+            key: Cache key from summary_cache_key()
+
+        Returns:
+            The cached summary, or None on a miss
+        """
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return summary
+
+            if self._disk is not None:
+                row = self._disk.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._disk.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._disk.commit()
+                    self._counters["disk_hits"] += 1
+                    self._put_memory(key, row[0])
+                    return row[0]
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, summary: str) -> None:
+        """
+        Store a summary in every enabled tier.
+
+        Args:
+            key: Cache key from summary_cache_key()
+            summary: Summary text to store
+        """
+        with self._lock:
+            self._put_memory(key, summary)
+            if self._disk is not None:
+                self._put_disk(key, summary)
+
+    def _put_memory(self, key: str, summary: str) -> None:
+        """Insert into the LRU tier and evict down to max_bytes. Caller holds the lock."""
+        size = self._size(key, summary)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= self._size(key, previous)
+        self._entries[key] = summary
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_bytes:
+            old_key, old_summary = self._entries.popitem(last=False)
+            self._memory_bytes -= self._size(old_key, old_summary)
+            self._counters["evictions"] += 1
+
+    def _put_disk(self, key: str, summary: str) -> None:
+        """Insert into the SQLite tier and evict down to disk_max_bytes. Caller holds the lock."""
+        size = self._size(key, summary)
+        if size > self.disk_max_bytes:
+            return
+        row = self._disk.execute("SELECT size FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._disk_bytes -= row[0]
+        self._disk.execute(
+            "INSERT OR REPLACE INTO summaries (key, summary, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, summary, size, time.time())
+        )
+        self._disk_bytes += size
+
+        while self._disk_bytes > self.disk_max_bytes:
+            oldest = self._disk.execute(
+                "SELECT key, size FROM summaries ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                self._disk_bytes = 0
+                break
+            for old_key, old_size in oldest:
+                if self._disk_bytes <= self.disk_max_bytes:
+                    break
+                self._disk.execute("DELETE FROM summaries WHERE key = ?", (old_key,))
+                self._disk_bytes -= old_size
+                self._counters["disk_evictions"] += 1
+        self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                "hits": hits,
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": self._disk is not None,
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+            }
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
@@ -0,0 +1,68 @@
+"""
+Token counting for the PDF chunking system.
+This module provides cached tokenizers for sizing chunks to a model's context,
+with a character-based estimate when tiktoken is unavailable.
+"""
+
+import math
+import logging
+import functools
+from typing import Any, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Estimate used when no tokenizer can be loaded
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Context window assumed when the LLM does not report one
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# Encoding used for models tiktoken does not know
+FALLBACK_ENCODING = "cl100k_base"
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(model: str = "") -> Optional[Any]:
+    """
+    Load the tiktoken encoding for a model, once per model.
+
+    Args:
+        model: Model name (empty for the fallback encoding)
+
+    Returns:
+        The tiktoken encoding, or None if tiktoken or its data is unavailable
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken not installed, estimating tokens from character counts")
+        return None
+
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails without network access
+        logger.warning(f"Could not load tokenizer for model '{model}', estimating tokens: {str(e)}")
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Count the tokens of a text for a model.
+
+    Args:
+        text: Text to count
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Number of tokens (estimated as characters / 4 without a tokenizer)
+    """
+    tokenizer = get_tokenizer(model)
+    if tokenizer is None:
+        return math.ceil(len(text) / DEFAULT_CHARS_PER_TOKEN)
+    return len(tokenizer.encode(text, disallowed_special=()))
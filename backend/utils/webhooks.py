@@ -0,0 +1,177 @@
+"""
+Completion webhooks for the PDF chunking system.
+This module POSTs finished job records to caller-registered callback URLs,
+retrying failed deliveries with jittered exponential backoff.
+"""
+
+import os
+import hmac
+import json
+import time
+import socket
+import random
+import asyncio
+import hashlib
+import logging
+import ipaddress
+from typing import Any, Dict, Optional, Set
+from urllib.parse import urlparse
+
+import httpx
+
+from backend.utils.retry import RETRYABLE_STATUS_CODES
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def is_public_address(address: str) -> bool:
+    """
+    Check whether an IP address is publicly routable.
+
+    Args:
+        address: IPv4 or IPv6 address, optionally with an IPv6 zone
+
+    Returns:
+        False for loopback, link-local, private, multicast, reserved and unspecified addresses
+    """
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if getattr(ip, "ipv4_mapped", None):
+        ip = ip.ipv4_mapped
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast
+                or ip.is_reserved or ip.is_unspecified)
+
+
+class WebhookDispatcher:
+    """
+    Delivers job records to callback URLs.
+
+    Provides:
+    - Validation of callback URLs, optionally against an allowlist of hosts;
+      hosts resolving to loopback, link-local, private or other non-public
+      addresses are rejected unless allowlisted
+    - Retries of connection errors, timeouts and retryable HTTP statuses with
+      full-jitter exponential backoff; other 4xx responses are not retried
+    - An optional HMAC-SHA256 signature of the body in X-Webhook-Signature
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 timeout: float = 10.0, secret: str = "", allowed_hosts: Optional[Set[str]] = None,
+                 allow_private: bool = False):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            max_attempts: Delivery attempts per webhook, including the first
+            base_delay: Backoff cap in seconds before the first retry, doubled per retry
+            max_delay: Upper bound of the backoff cap in seconds
+            timeout: Seconds each delivery attempt may take
+            secret: Key used to sign bodies (empty disables signing)
+            allowed_hosts: Hosts callback URLs may point at (None or empty allows any)
+            allow_private: Accept hosts that resolve to non-public addresses without allowlisting them
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.secret = secret
+        self.allowed_hosts = allowed_hosts or set()
+        self.allow_private = allow_private
+
+    @classmethod
+    def from_env(cls) -> "WebhookDispatcher":
+        """Create a dispatcher configured from environment variables."""
+        allowed_hosts = os.getenv("WEBHOOK_ALLOWED_HOSTS", "")
+        return cls(
+            max_attempts=int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5")),
+            base_delay=float(os.getenv("WEBHOOK_RETRY_BASE_DELAY", "1")),
+            max_delay=float(os.getenv("WEBHOOK_RETRY_MAX_DELAY", "60")),
+            timeout=float(os.getenv("WEBHOOK_TIMEOUT", "10")),
+            secret=os.getenv("WEBHOOK_SECRET", ""),
+            allowed_hosts={host.strip().lower() for host in allowed_hosts.split(",") if host.strip()},
+            allow_private=os.getenv("WEBHOOK_ALLOW_PRIVATE_HOSTS", "false").lower() in ("1", "true", "yes"),
+        )
+
+    def validate_url(self, url: str) -> Optional[str]:
+        """
+        Check a callback URL, resolving its host. Blocks on DNS; call it off the event loop.
+
+        Args:
+            url: URL given by the caller
+
+        Returns:
+            A description of the problem, or None if the URL is acceptable
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            return "Callback URL must be an absolute http or https URL"
+        host = parsed.hostname.lower()
+        if self.allowed_hosts and host not in self.allowed_hosts:
+            return f"Callback host '{parsed.hostname}' is not allowed"
+        if self.allow_private or host in self.allowed_hosts:
+            return None
+        try:
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+        except (socket.gaierror, UnicodeError, ValueError):
+            return f"Callback host '{parsed.hostname}' could not be resolved"
+        for address in addresses:
+            if not is_public_address(address):
+                return f"Callback host '{parsed.hostname}' resolves to non-public address {address}"
+        return None
+
+    def backoff(self, retry: int) -> float:
+        """Pick the delay before a retry, uniformly drawn below the exponential cap."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def sign(self, body: bytes) -> str:
+        """Return the X-Webhook-Signature value for a body."""
+        return "sha256=" + hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+    async def deliver(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON payload to a callback URL, retrying failed attempts.
+
+        Args:
+            url: Callback URL
+            payload: JSON-serializable job record
+
+        Returns:
+            Delivery record: url, status ("delivered" or "failed"), attempts,
+            last_status_code, last_error and delivered_at
+        """
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Job-Id": str(payload.get("job_id", ""))}
+        if self.secret:
+            headers["X-Webhook-Signature"] = self.sign(body)
+
+        delivery = {"url": url, "status": "failed", "attempts": 0, "last_status_code": None,
+                    "last_error": None, "delivered_at": None}
+        # The host may resolve differently than when the URL was accepted
+        url_error = await asyncio.to_thread(self.validate_url, url)
+        if url_error:
+            delivery["last_error"] = url_error
+            logger.error(f"Webhook delivery to {url} refused: {url_error}")
+            return delivery
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            for attempt in range(self.max_attempts):
+                delivery["attempts"] = attempt + 1
+                retryable = True
+                try:
+                    response = await client.post(url, content=body, headers={**headers, "X-Webhook-Attempt": str(attempt + 1)})
+                    delivery["last_status_code"] = response.status_code
+                    if response.status_code < 300:
+                        delivery.update(status="delivered", last_error=None, delivered_at=time.time())
+                        return delivery
+                    delivery["last_error"] = f"HTTP {response.status_code}"
+                    retryable = response.status_code in RETRYABLE_STATUS_CODES
+                except httpx.HTTPError as e:
+                    delivery["last_error"] = f"{type(e).__name__}: {str(e)}"
+                if not retryable or attempt + 1 >= self.max_attempts:
+                    break
+                delay = self.backoff(attempt)
+                logger.warning(f"Webhook delivery to {url} failed ({delivery['last_error']}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        logger.error(f"Webhook delivery to {url} failed after {delivery['attempts']} attempts: {delivery['last_error']}")
+        return delivery
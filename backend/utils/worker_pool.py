@@ -0,0 +1,407 @@
+"""
+Worker pool for the PDF chunking system.
+This module runs blocking pipeline stages on thread and process pools and
+provides a bounded job queue, so the API event loop only schedules work.
+"""
+
+import os
+import asyncio
+import logging
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Valid execution modes for a pipeline stage
+STAGE_MODES = ("thread", "process", "inline")
+
+# Default dispatch: CPU-bound stages go to processes, everything else to threads
+DEFAULT_STAGE_MODES = {
+    "extract": "process",
+    "render": "process",
+}
+
+
+# Marks the end of a stream produced on a worker thread
+_END_OF_STREAM = object()
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job is submitted while the job queue is at capacity."""
+
+
+def parse_stage_modes(spec: Optional[str]) -> Dict[str, str]:
+    """
+    Parse a stage dispatch specification such as "extract=process,render=thread".
+
+    Args:
+        spec: Comma-separated list of stage=mode pairs (optional)
+
+    Returns:
+        Dictionary mapping stage names to execution modes
+    """
+    modes = dict(DEFAULT_STAGE_MODES)
+    if not spec:
+        return modes
+
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        stage, _, mode = item.partition("=")
+        stage, mode = stage.strip(), mode.strip().lower()
+        if not stage or mode not in STAGE_MODES:
+            raise ValueError(f"Invalid stage mode '{item}', expected <stage>=<{'|'.join(STAGE_MODES)}>")
+        modes[stage] = mode
+    return modes
+
+
+async def iterate_in_thread(
+    gen_fn: Callable[..., Iterator[Any]],
+    *args,
+    executor: Optional[ThreadPoolExecutor] = None,
+    maxsize: int = 8
+) -> AsyncIterator[Any]:
+    """
+    Run a blocking generator on a worker thread and iterate it asynchronously.
+
+    Items pass through a bounded queue, so the producer runs at most `maxsize`
+    items ahead of the consumer.
+
+    Args:
+        gen_fn: Generator function to run
+        *args: Arguments for the generator function
+        executor: Thread pool to run on (default: the loop's default executor)
+        maxsize: Maximum number of items buffered between producer and consumer
+
+    Yields:
+        Items produced by the generator, in order
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item, error=None):
+        asyncio.run_coroutine_threadsafe(queue.put((item, error)), loop).result()
+
+    def produce():
+        try:
+            for item in gen_fn(*args):
+                if stopped.is_set():
+                    return
+                put(item)
+        except Exception as e:
+            put(_END_OF_STREAM, e)
+            return
+        put(_END_OF_STREAM)
+
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _END_OF_STREAM:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        # Stop the producer early and unblock any pending put
+        stopped.set()
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait([producer], timeout=0.05)
+
+
+class WorkerPool:
+    """
+    Executor subsystem for PDF processing jobs.
+
+    Provides:
+    - A thread pool for blocking I/O stages
+    - A process pool for CPU-bound stages (created on first use)
+    - Per-stage dispatch configured by stage name
+    - A bounded job queue drained by a fixed number of job runners
+    """
+
+    def __init__(
+        self,
+        max_threads: Optional[int] = None,
+        max_processes: Optional[int] = None,
+        queue_size: int = 100,
+        job_concurrency: int = 2,
+        stage_modes: Optional[Dict[str, str]] = None,
+        start_method: str = "spawn"
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            max_threads: Size of the thread pool (default: min(32, cpu_count + 4))
+            max_processes: Size of the process pool (default: cpu_count)
+            queue_size: Maximum number of jobs waiting in the queue
+            job_concurrency: Number of jobs processed at the same time
+            stage_modes: Mapping of stage name to "thread", "process" or "inline"
+            start_method: multiprocessing start method for the process pool
+        """
+        cpu_count = os.cpu_count() or 1
+        self.max_threads = max_threads or min(32, cpu_count + 4)
+        self.max_processes = max_processes or cpu_count
+        self.queue_size = queue_size
+        self.job_concurrency = max(1, job_concurrency)
+        self.stage_modes = dict(stage_modes or DEFAULT_STAGE_MODES)
+        self.start_method = start_method
+
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._runners: List[asyncio.Task] = []
+        self._handler: Optional[Callable[..., Awaitable[Any]]] = None
+        self._running_jobs = 0
+
+        logger.info(
+            f"Worker pool initialized with threads={self.max_threads}, processes={self.max_processes}, "
+            f"queue_size={queue_size}, job_concurrency={self.job_concurrency}"
+        )
+
+    @classmethod
+    def from_env(cls) -> "WorkerPool":
+        """Create a worker pool configured from environment variables."""
+        return cls(
+            max_threads=int(os.getenv("WORKER_THREADS", "0")) or None,
+            max_processes=int(os.getenv("WORKER_PROCESSES", "0")) or None,
+            queue_size=int(os.getenv("JOB_QUEUE_SIZE", "100")),
+            job_concurrency=int(os.getenv("JOB_CONCURRENCY", "2")),
+            stage_modes=parse_stage_modes(os.getenv("WORKER_STAGE_MODES")),
+            start_method=os.getenv("WORKER_PROCESS_START_METHOD", "spawn"),
+        )
+
+    @property
+    def threads(self) -> ThreadPoolExecutor:
+        """Lazy-create the thread pool when a thread stage first runs"""
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="pdf-worker")
+        return self._threads
+
+    @property
+    def processes(self) -> ProcessPoolExecutor:
+        """Lazy-create the process pool when a process stage first runs"""
+        if self._processes is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._processes = ProcessPoolExecutor(max_workers=self.max_processes, mp_context=context)
+            logger.info(f"Process pool started with {self.max_processes} workers")
+        return self._processes
+
+    async def run(self, stage: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking pipeline stage on the executor configured for it.
+
+        Args:
+            stage: Stage name used to look up the dispatch mode
+            fn: Callable to run (must be picklable for process stages)
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        mode = self.stage_modes.get(stage, "thread")
+        if mode == "inline":
+            return fn(*args, **kwargs)
+
+        executor = self.processes if mode == "process" else self.threads
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    async def stream(self, stage: str, gen_fn: Callable[..., Iterator[Any]], *args,
+                     maxsize: int = 8) -> AsyncIterator[Any]:
+        """
+        Iterate a blocking generator stage without blocking the event loop.
+
+        Thread and process stages run the generator on the thread pool, since a
+        generator cannot be streamed back from another process.
+
+        Args:
+            stage: Stage name used to look up the dispatch mode
+            gen_fn: Generator function to run
+            *args: Arguments for the generator function
+            maxsize: Maximum number of items buffered ahead of the consumer
+
+        Yields:
+            Items produced by the generator, in order
+        """
+        if self.stage_modes.get(stage, "thread") == "inline":
+            for item in gen_fn(*args):
+                yield item
+            return
+        async for item in iterate_in_thread(gen_fn, *args, executor=self.threads, maxsize=maxsize):
+            yield item
+
+    def start(self, handler: Callable[..., Awaitable[Any]]) -> None:
+        """
+        Start the job runners on the running event loop.
+
+        Args:
+            handler: Coroutine function called with the arguments of each submitted job
+        """
+        self._handler = handler
+        if self._runners:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._runners = [
+            asyncio.create_task(self._run_jobs(), name=f"job-runner-{i}")
+            for i in range(self.job_concurrency)
+        ]
+        logger.info(f"Started {len(self._runners)} job runners")
+
+    def submit(self, *args) -> int:
+        """
+        Queue a job for processing without waiting.
+
+        Args:
+            *args: Arguments passed to the job handler
+
+        Returns:
+            Number of jobs waiting in the queue
+
+        Raises:
+            JobQueueFull: If the queue is at capacity
+        """
+        if self._handler is None:
+            raise RuntimeError("Worker pool has not been started")
+        if not self._runners:
+            self.start(self._handler)
+        try:
+            self._queue.put_nowait(args)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self.queue_size} jobs waiting)")
+        return self._queue.qsize()
+
+    async def _run_jobs(self) -> None:
+        """Drain the job queue, processing one job at a time."""
+        while True:
+            args = await self._queue.get()
+            self._running_jobs += 1
+            try:
+                await self._handler(*args)
+            except Exception as e:
+                logger.error(f"Unhandled error in job runner: {str(e)}")
+            finally:
+                self._running_jobs -= 1
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue and executor usage."""
+        return {
+            "queued": self._queue.qsize(),
+            "running": self._running_jobs,
+            "queue_size": self.queue_size,
+            "job_concurrency": self.job_concurrency,
+            "threads": self.max_threads,
+            "processes": self.max_processes,
+            "stage_modes": self.stage_modes,
+        }
+
+    async def shutdown(self) -> None:
+        """Cancel the job runners and shut down the executors."""
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+        logger.info("Worker pool shut down")
+
+
+class WorkerSupervisor:
+    """
+    Keeps a fixed number of worker processes running.
+
+    Worker processes are restarted when they exit unexpectedly, after an optional
+    callback has had the chance to recover the work they held.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[], Any],
+        count: int,
+        name: str = "processing-worker",
+        on_exit: Optional[Callable[[int], None]] = None,
+        check_interval: float = 1.0,
+        start_method: str = "spawn"
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            target: Picklable callable run in each worker process
+            count: Number of worker processes to keep running
+            name: Name prefix for the worker processes
+            on_exit: Optional callback invoked with the pid of a worker that exited unexpectedly
+            check_interval: Seconds between liveness checks
+            start_method: multiprocessing start method for the workers
+        """
+        self.target = target
+        self.count = count
+        self.name = name
+        self.on_exit = on_exit
+        self.check_interval = check_interval
+        self._context = multiprocessing.get_context(start_method)
+        self._workers: List[multiprocessing.process.BaseProcess] = []
+        self._stopping = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+
+    def _spawn(self, index: int) -> multiprocessing.process.BaseProcess:
+        process = self._context.Process(target=self.target, name=f"{self.name}-{index}")
+        process.start()
+        logger.info(f"Started {process.name} with pid {process.pid}")
+        return process
+
+    def start(self) -> None:
+        """Start the worker processes and the monitor thread."""
+        self._stopping.clear()
+        self._workers = [self._spawn(i) for i in range(self.count)]
+        self._monitor_thread = threading.Thread(target=self._monitor, name=f"{self.name}-monitor", daemon=True)
+        self._monitor_thread.start()
+
+    def _monitor(self) -> None:
+        """Restart worker processes that exit while the supervisor is running."""
+        while not self._stopping.wait(self.check_interval):
+            for i, process in enumerate(self._workers):
+                if process.is_alive() or self._stopping.is_set():
+                    continue
+                logger.warning(f"{process.name} (pid {process.pid}) exited with code {process.exitcode}, restarting")
+                if self.on_exit:
+                    try:
+                        self.on_exit(process.pid)
+                    except Exception as e:
+                        logger.error(f"Error recovering work from {process.name}: {str(e)}")
+                self._workers[i] = self._spawn(i)
+
+    def pids(self) -> List[int]:
+        """Return the pids of the current worker processes."""
+        return [process.pid for process in self._workers]
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Terminate the worker processes and wait for them to exit."""
+        self._stopping.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join()
+            self._monitor_thread = None
+        for process in self._workers:
+            if process.is_alive():
+                process.terminate()
+        for process in self._workers:
+            process.join(timeout)
+        logger.info(f"Stopped {len(self._workers)} {self.name} processes")
+        self._workers = []
@@ -4,11 +4,12 @@ Provides a web interface and proxies requests to the MCP HTTP Server.
 """
 
 import uvicorn
-from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, Request, UploadFile, File, Form, Header, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse, RedirectResponse
 import os
 import json
+import asyncio
 import logging
 import httpx
 import tempfile
@@ -40,6 +41,13 @@ app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 # Create HTTP client
 http_client = httpx.AsyncClient(timeout=60.0)  # Extended timeout for PDF processing
 
+# Separate client for relayed event streams: they stay open for a whole job, so they get
+# their own unbounded pool and no read timeout instead of holding connections of http_client
+event_stream_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(60.0, read=None),
+    limits=httpx.Limits(max_connections=None, max_keepalive_connections=20)
+)
+
 # Add route for the root path
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -54,7 +62,8 @@ async def read_root():
 
 # Proxy route for PDF upload
 @app.post("/pdf/upload")
-async def proxy_pdf_upload(file: UploadFile = File(...)):
+async def proxy_pdf_upload(file: UploadFile = File(...), engine: Optional[str] = Form(None),
+                           callback_url: Optional[str] = Form(None)):
     """Proxy PDF upload requests to the MCP server."""
     try:
         logger.info(f"Proxying PDF upload: {file.filename}")
@@ -62,16 +71,18 @@ async def proxy_pdf_upload(file: UploadFile = File(...)):
         # Create temporary file to store the upload
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
         try:
-            # Write uploaded file to temporary file
+            # Write uploaded file to temporary file, off the event loop
             with temp_file:
-                shutil.copyfileobj(file.file, temp_file)
+                await asyncio.to_thread(shutil.copyfileobj, file.file, temp_file)
             
             # Create form data for proxied request
             with open(temp_file.name, "rb") as f:
                 files = {"file": (file.filename, f, "application/pdf")}
+                data = {key: value for key, value in (("engine", engine), ("callback_url", callback_url)) if value}
                 response = await http_client.post(
                     f"{mcp_server_url}/pdf/upload",
-                    files=files
+                    files=files,
+                    data=data
                 )
             
             # Check response
@@ -104,12 +115,19 @@ async def proxy_pdf_upload(file: UploadFile = File(...)):
 
 # Proxy route for checking PDF processing status
 @app.get("/pdf/status/{job_id}")
-async def proxy_pdf_status(job_id: str):
-    """Proxy status check requests to the MCP server."""
+async def proxy_pdf_status(job_id: str, wait: Optional[float] = None, if_none_match: Optional[str] = Header(None)):
+    """Proxy status check requests, including conditional and long-poll ones, to the MCP server."""
     try:
         logger.info(f"Proxying status check for job: {job_id}")
         
-        response = await http_client.get(f"{mcp_server_url}/pdf/status/{job_id}")
+        params = {"wait": wait} if wait else None
+        headers = {"If-None-Match": if_none_match} if if_none_match else None
+        response = await http_client.get(f"{mcp_server_url}/pdf/status/{job_id}", params=params, headers=headers)
+        etag = response.headers.get("ETag")
+        etag_header = {"ETag": etag} if etag else None
+        
+        if response.status_code == 304:
+            return Response(status_code=304, headers=etag_header)
         
         if response.status_code != 200:
             logger.error(f"MCP server returned error: {response.status_code} - {response.text}")
@@ -118,7 +136,12 @@ async def proxy_pdf_status(job_id: str):
                 content={"error": f"MCP server error: {response.text}"}
             )
         
-        return response.json()
+        # Relay the body as is, with the ETag clients send back in If-None-Match
+        return Response(
+            content=response.content,
+            media_type="application/json",
+            headers=etag_header
+        )
         
     except Exception as e:
         logger.error(f"Error proxying status check: {str(e)}")
@@ -127,6 +150,48 @@ async def proxy_pdf_status(job_id: str):
             content={"error": f"Status check error: {str(e)}"}
         )
 
+# Proxy route for job event streams, so browsers are pushed status changes instead of polling
+@app.get("/pdf/events/{job_id}")
+async def proxy_pdf_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Relay a job's Server-Sent Events stream from the MCP server."""
+    try:
+        logger.info(f"Proxying event stream for job: {job_id}")
+        
+        # Reconnecting browsers resume after the last event they received
+        headers = {"Last-Event-ID": last_event_id} if last_event_id else None
+        request = event_stream_client.build_request("GET", f"{mcp_server_url}/pdf/events/{job_id}", headers=headers)
+        response = await event_stream_client.send(request, stream=True)
+        
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+            logger.error(f"MCP server returned error: {response.status_code} - {response.text}")
+            return JSONResponse(
+                status_code=response.status_code,
+                content={"error": f"MCP server error: {response.text}"}
+            )
+        
+        async def relay():
+            # Closing the upstream stream when the browser disconnects ends it on the MCP server too
+            try:
+                async for block in response.aiter_raw():
+                    yield block
+            finally:
+                await response.aclose()
+        
+        return StreamingResponse(
+            relay(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+        
+    except Exception as e:
+        logger.error(f"Error proxying event stream: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Event stream error: {str(e)}"}
+        )
+
 # Proxy route for PDF download
 @app.get("/pdf/download/{job_id}")
 async def proxy_pdf_download(job_id: str):
@@ -226,6 +291,7 @@ async def system_status():
 async def shutdown_event():
     """Clean up resources on shutdown."""
     await http_client.aclose()
+    await event_stream_client.aclose()
 
 # Run the app
 def main():
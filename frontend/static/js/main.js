@@ -21,7 +21,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const retryBtn = document.getElementById('retry-btn');
     
     let currentJobId = null;
-    let statusCheckInterval = null;
+    let statusSource = null;
     
     // Handle form submission
     uploadForm.addEventListener('submit', async (e) => {
@@ -54,6 +54,7 @@ document.addEventListener('DOMContentLoaded', () => {
             // Upload file
             const formData = new FormData();
             formData.append('file', file);
+            formData.append('engine', document.getElementById('summary-engine').value);
             
             const response = await fetch('/pdf/upload', {
                 method: 'POST',
@@ -71,8 +72,8 @@ document.addEventListener('DOMContentLoaded', () => {
             updateStatus('processing', 'Processing PDF...');
             progressBar.style.width = '40%';
             
-            // Start status polling
-            startStatusPolling(currentJobId);
+            // Subscribe to status updates
+            subscribeToStatus(currentJobId);
             
         } catch (error) {
             console.error('Upload error:', error);
@@ -80,46 +81,71 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
     
-    // Function to start polling for status updates
-    function startStatusPolling(jobId) {
-        // Clear any existing interval
-        if (statusCheckInterval) {
-            clearInterval(statusCheckInterval);
-        }
+    // Function to subscribe to pushed status updates for a job
+    function subscribeToStatus(jobId) {
+        // Close any existing stream
+        closeStatusStream();
+        
+        // The server pushes a "status" event on every change, then "complete" or "error"
+        statusSource = new EventSource(`/pdf/events/${jobId}`);
+        
+        statusSource.addEventListener('status', (event) => {
+            const data = JSON.parse(event.data);
+            updateStatus('processing', `Processing PDF... (${data.progress || data.status})`);
+            progressBar.style.width = data.status === 'uploaded' ? '50%' : '70%';
+        });
         
-        // Poll every 2 seconds
-        statusCheckInterval = setInterval(async () => {
-            try {
-                const response = await fetch(`/pdf/status/${jobId}`);
-                
-                if (!response.ok) {
-                    throw new Error(`Status check failed: ${response.statusText}`);
-                }
-                
-                const data = await response.json();
-                const status = data.status;
-                
-                if (status === 'uploaded' || status === 'processing') {
-                    // Still processing
-                    updateStatus('processing', `Processing PDF... (${status})`);
-                    progressBar.style.width = status === 'uploaded' ? '50%' : '70%';
-                } else if (status === 'complete') {
-                    // Processing complete
-                    clearInterval(statusCheckInterval);
-                    progressBar.style.width = '100%';
-                    showResults(data);
-                } else if (status === 'error') {
-                    // Error occurred
-                    clearInterval(statusCheckInterval);
-                    showError(data.error || 'An unknown error occurred during processing.');
-                }
-                
-            } catch (error) {
-                console.error('Status check error:', error);
-                clearInterval(statusCheckInterval);
-                showError('Failed to check processing status: ' + error.message);
+        statusSource.addEventListener('complete', (event) => {
+            // Processing complete
+            closeStatusStream();
+            progressBar.style.width = '100%';
+            showResults(JSON.parse(event.data));
+        });
+        
+        statusSource.addEventListener('error', (event) => {
+            if (event.data) {
+                // Processing failed
+                closeStatusStream();
+                const data = JSON.parse(event.data);
+                showError(data.error || 'An unknown error occurred during processing.');
+            } else if (statusSource.readyState === EventSource.CLOSED) {
+                // The stream was refused; dropped connections are retried by the browser
+                closeStatusStream();
+                checkStatusOnce(jobId);
+            }
+        });
+    }
+    
+    // Function to close the status stream
+    function closeStatusStream() {
+        if (statusSource) {
+            statusSource.close();
+            statusSource = null;
+        }
+    }
+    
+    // Function to fetch the status once when no stream is available
+    async function checkStatusOnce(jobId) {
+        try {
+            const response = await fetch(`/pdf/status/${jobId}`);
+            
+            if (!response.ok) {
+                throw new Error(`Status check failed: ${response.statusText}`);
+            }
+            
+            const data = await response.json();
+            if (data.status === 'complete') {
+                progressBar.style.width = '100%';
+                showResults(data);
+            } else if (data.status === 'error') {
+                showError(data.error || 'An unknown error occurred during processing.');
+            } else {
+                throw new Error('Lost connection to the status stream');
             }
-        }, 2000);
+        } catch (error) {
+            console.error('Status check error:', error);
+            showError('Failed to check processing status: ' + error.message);
+        }
     }
     
     // Function to update status display
@@ -152,7 +178,17 @@ document.addEventListener('DOMContentLoaded', () => {
             </div>
         `;
         
+        // Small documents skip pipeline stages; an empty one has nothing to download
+        if (result.fast_path === 'empty_text') {
+            detailsHTML += `
+            <div class="result-item">
+                No text could be extracted from this PDF, so there is no summary to download.
+            </div>
+        `;
+        }
+        
         resultDetails.innerHTML = detailsHTML;
+        downloadLink.classList.toggle('hidden', !result.output_pdf);
         
         // Set download link
         downloadLink.href = `/pdf/download/${currentJobId}`;
@@ -191,11 +227,8 @@ document.addEventListener('DOMContentLoaded', () => {
         // Clear the file input
         uploadForm.reset();
         
-        // Clear any polling interval
-        if (statusCheckInterval) {
-            clearInterval(statusCheckInterval);
-            statusCheckInterval = null;
-        }
+        // Close any status stream
+        closeStatusStream();
         
         // Reset progress bar
         progressBar.style.width = '0%';
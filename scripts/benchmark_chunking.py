@@ -0,0 +1,95 @@
+"""
+Chunking benchmark for PDF Chunking System.
+This script times the window-scanning and boundary-indexed chunkers on large
+generated texts and checks that both produce the same chunks.
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.utils.chunking import (
+    SENTENCE_BOUNDARIES, LINE_BOUNDARIES, chunk_text, prefers_boundary_index
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+
+# (chunk_size, overlap) pairs to benchmark
+CHUNK_SETTINGS = [(1000, 200), (200, 50), (1000, 900), (4000, 3000)]
+
+
+def generate_prose(size: int, rng: random.Random) -> str:
+    """Generate text with frequent sentence, line and paragraph breaks."""
+    parts, length = [], 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20)))
+        sentence += rng.choice([". ", ". ", "\n", "\n\n", " "])
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def generate_sparse(size: int, rng: random.Random) -> str:
+    """Generate text whose only break points are line breaks a few thousand characters apart."""
+    parts, length = [], 0
+    while length < size:
+        line = "x" * rng.randint(1500, 2500) + "\n"
+        parts.append(line)
+        length += len(line)
+    return "".join(parts)[:size]
+
+
+def best_time(fn, repeat: int) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """Run the chunking benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the text chunkers")
+    parser.add_argument("--size-mb", type=float, default=10.0, help="Size of each generated text in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    size = int(args.size_mb * 1024 * 1024)
+    texts = {"prose": generate_prose(size, rng), "sparse": generate_sparse(size, rng)}
+
+    # Per-call chunk counts would drown out the results
+    logging.getLogger("backend.utils.chunking").setLevel(logging.WARNING)
+
+    print(f"{'text':<8}{'boundaries':<12}{'chunk':>7}{'overlap':>9}{'scan s':>10}{'index s':>10}{'speedup':>9}  auto")
+    for name, text in texts.items():
+        for boundary_name, boundaries in (("sentence", SENTENCE_BOUNDARIES), ("line", LINE_BOUNDARIES)):
+            for chunk_size, overlap in CHUNK_SETTINGS:
+                scanned = chunk_text(text, chunk_size, overlap, boundaries, indexed=False)
+                indexed = chunk_text(text, chunk_size, overlap, boundaries, indexed=True)
+                if scanned != indexed:
+                    logger.error(f"Chunkers disagree on {name} text with {boundary_name} boundaries")
+                    sys.exit(1)
+
+                scan_time = best_time(lambda: chunk_text(text, chunk_size, overlap, boundaries, indexed=False), args.repeat)
+                index_time = best_time(lambda: chunk_text(text, chunk_size, overlap, boundaries, indexed=True), args.repeat)
+                auto = "index" if prefers_boundary_index(text, chunk_size, boundaries) else "scan"
+                print(f"{name:<8}{boundary_name:<12}{chunk_size:>7}{overlap:>9}"
+                      f"{scan_time:>10.3f}{index_time:>10.3f}{scan_time / index_time:>8.2f}x  {auto}")
+
+
+if __name__ == "__main__":
+    main()
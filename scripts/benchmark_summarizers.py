@@ -0,0 +1,97 @@
+"""
+Summarizer benchmark for PDF Chunking System.
+This script measures the throughput of the local extractive engine and of the
+LLM engine on the same generated chunks. The LLM path is only timed when an
+OpenAI API key is configured.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=str(PROJECT_ROOT / "config" / ".env"))
+
+from backend.clients.shared_llama_client import SharedLlamaClient
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TOPICS = [
+    "quarterly revenue growth in the retail segment",
+    "supply chain delays affecting component deliveries",
+    "regulatory review of the proposed merger",
+    "energy costs at the manufacturing plants",
+    "hiring plans for the engineering organization",
+    "customer churn in the subscription business",
+]
+FILLER = ["analysts", "noted", "that", "the", "report", "shows", "significant", "changes", "across",
+          "regions", "while", "management", "expects", "further", "pressure", "next", "year"]
+
+
+def generate_chunk(size: int, rng: random.Random) -> str:
+    """Generate a chunk of prose about a few recurring topics."""
+    topics = rng.sample(TOPICS, 2)
+    sentences, length = [], 0
+    while length < size:
+        words = [rng.choice(FILLER) for _ in range(rng.randint(6, 16))]
+        words.insert(rng.randint(0, len(words)), rng.choice(topics))
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)[:size]
+
+
+async def time_engine(client: SharedLlamaClient, chunks, engine: str, max_length: int):
+    """Summarize chunks with one engine, returning the elapsed seconds."""
+    start = time.perf_counter()
+    await client.asummarize_chunks(chunks, max_length, engine=engine)
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the summarizer benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the summarization engines")
+    parser.add_argument("--chunks", type=int, default=500, help="Chunks summarized by the extractive engine")
+    parser.add_argument("--llm-chunks", type=int, default=20, help="Chunks summarized by the LLM engine")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Characters per chunk")
+    parser.add_argument("--max-length", type=int, default=500, help="Maximum summary length")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Distinct chunks, so deduplication and caching do not flatter either engine
+    chunks = [f"Section {i}. " + generate_chunk(args.chunk_size, rng) for i in range(max(args.chunks, args.llm_chunks))]
+
+    # Per-chunk log lines would drown out the results
+    logging.getLogger("backend").setLevel(logging.WARNING)
+    client = SharedLlamaClient()
+    client.summary_cache = None
+
+    print(f"{'engine':<12}{'chunks':>8}{'seconds':>10}{'chunks/s':>11}{'ms/chunk':>10}")
+    results = {}
+    runs = [("extractive", args.chunks)]
+    if client.llm:
+        runs.append(("llm", args.llm_chunks))
+    for engine, count in runs:
+        seconds = asyncio.run(time_engine(client, chunks[:count], engine, args.max_length))
+        results[engine] = count / seconds
+        print(f"{engine:<12}{count:>8}{seconds:>10.3f}{count / seconds:>11.1f}{seconds / count * 1000:>10.2f}")
+
+    if "llm" in results:
+        print(f"\nextractive throughput: {results['extractive'] / results['llm']:.0f}x the LLM engine")
+    else:
+        print("\nllm: skipped, OPENAI_API_KEY is not configured")
+
+
+if __name__ == "__main__":
+    main()
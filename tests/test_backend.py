@@ -5,6 +5,11 @@ import unittest
 import sys
 import os
 import json
+import re
+import asyncio
+import threading
+import tempfile
+import time
 from unittest.mock import patch, MagicMock
 
 # Add project root to path
@@ -66,5 +71,1698 @@ class TestMCPServer(unittest.TestCase):
             # Check that the index was not initialized
             mock_index.assert_not_called()
 
+class TestWorkerPool(unittest.TestCase):
+    """Tests for the worker pool executor subsystem"""
+    
+    def test_parse_stage_modes(self):
+        """Test stage dispatch overrides and validation"""
+        from backend.utils.worker_pool import parse_stage_modes, DEFAULT_STAGE_MODES
+        
+        modes = parse_stage_modes("extract=thread")
+        self.assertEqual(modes["extract"], "thread")
+        self.assertEqual(modes["render"], DEFAULT_STAGE_MODES["render"])
+        self.assertEqual(parse_stage_modes("render=inline")["render"], "inline")
+        
+        with self.assertRaises(ValueError):
+            parse_stage_modes("extract=gpu")
+    
+    def test_stage_dispatch(self):
+        """Test that stages run on the executor configured for them"""
+        from backend.utils.worker_pool import WorkerPool
+        
+        pool = WorkerPool(max_threads=2, max_processes=1, stage_modes={
+            "extract": "process", "chunk": "thread", "render": "inline"
+        })
+        
+        async def run_stages():
+            try:
+                pid = await pool.run("extract", os.getpid)
+                thread_name = await pool.run("chunk", lambda: threading.current_thread().name)
+                inline_name = await pool.run("render", lambda: threading.current_thread().name)
+                return pid, thread_name, inline_name
+            finally:
+                await pool.shutdown()
+        
+        pid, thread_name, inline_name = asyncio.run(run_stages())
+        self.assertNotEqual(pid, os.getpid())
+        self.assertTrue(thread_name.startswith("pdf-worker"))
+        self.assertEqual(inline_name, threading.current_thread().name)
+    
+    def test_bounded_job_queue(self):
+        """Test that jobs are processed and a full queue rejects new jobs"""
+        from backend.utils.worker_pool import WorkerPool, JobQueueFull
+        
+        pool = WorkerPool(max_threads=1, queue_size=2, job_concurrency=1)
+        processed = []
+        
+        async def run_jobs():
+            release = asyncio.Event()
+            
+            async def handler(job_id):
+                await release.wait()
+                processed.append(job_id)
+            
+            pool.start(handler)
+            pool.submit("a")
+            await asyncio.sleep(0)  # let the runner pick up job "a"
+            pool.submit("b")
+            pool.submit("c")
+            with self.assertRaises(JobQueueFull):
+                pool.submit("d")
+            
+            release.set()
+            await pool._queue.join()
+            await pool.shutdown()
+        
+        asyncio.run(run_jobs())
+        self.assertEqual(processed, ["a", "b", "c"])
+    
+    def test_iterate_in_thread_backpressure(self):
+        """Test a streamed generator stays at most maxsize items ahead and stops early"""
+        from backend.utils.worker_pool import iterate_in_thread
+        
+        produced = []
+        
+        def generate():
+            for i in range(100):
+                produced.append(i)
+                yield i
+        
+        async def consume():
+            received = []
+            async for item in iterate_in_thread(generate, maxsize=2):
+                await asyncio.sleep(0.01)
+                # Queue holds at most 2 items, plus one blocked in put
+                self.assertLessEqual(len(produced) - len(received), 4)
+                received.append(item)
+                if len(received) == 10:
+                    break
+            return received
+        
+        self.assertEqual(asyncio.run(consume()), list(range(10)))
+        self.assertLess(len(produced), 100)
+    
+    def test_iterate_in_thread_propagates_errors(self):
+        """Test an exception in the generator is raised in the consumer"""
+        from backend.utils.worker_pool import iterate_in_thread
+        
+        def generate():
+            yield "page"
+            raise ValueError("bad page")
+        
+        async def consume():
+            return [item async for item in iterate_in_thread(generate)]
+        
+        with self.assertRaises(ValueError):
+            asyncio.run(consume())
+    
+    def test_supervisor_restarts_exited_workers(self):
+        """Test worker processes that exit are reported and restarted"""
+        from backend.utils.worker_pool import WorkerSupervisor
+        
+        exited = []
+        supervisor = WorkerSupervisor(sys.exit, 1, on_exit=exited.append, check_interval=0.05)
+        supervisor.start()
+        try:
+            first_pid = supervisor.pids()[0]
+            deadline = time.monotonic() + 20
+            while first_pid not in exited and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            supervisor.stop()
+        self.assertIn(first_pid, exited)
+
+
+class FakeLLM:
+    """Stand-in for the OpenAI LLM that records concurrent async completions"""
+    
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.prompts = []
+        self.model = "fake-model"
+    
+    def complete(self, prompt):
+        self.prompts.append(prompt)
+        return MagicMock(text="SUMMARY OF " + prompt.split("TEXT:")[1].split("SUMMARY:")[0].strip())
+    
+    async def acomplete(self, prompt):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            # Later chunks finish first to exercise result ordering
+            await asyncio.sleep(self.delay / (len(self.prompts) + 1))
+            return self.complete(prompt)
+        finally:
+            self.active -= 1
+
+
+
+class FakeBatchLLM(FakeLLM):
+    """Fake LLM that also answers batched prompts, optionally with a malformed reply"""
+    
+    def __init__(self, malformed=False, **kwargs):
+        super().__init__(**kwargs)
+        self.malformed = malformed
+    
+    def complete(self, prompt):
+        sections = re.findall(r'<section id="(\d+)">\n(.*?)\n</section>', prompt, re.DOTALL)
+        if not sections:
+            return super().complete(prompt)
+        self.prompts.append(prompt)
+        if self.malformed:
+            sections = sections[:-1]
+        return MagicMock(text="\n".join(f'<summary id="{i}">SUMMARY OF {text}</summary>' for i, text in sections))
+
+class FakeStreamingLLM(FakeLLM):
+    """Fake LLM that streams its completions word by word"""
+    
+    async def astream_complete(self, prompt):
+        text = self.complete(prompt).text
+        
+        async def deltas():
+            for word in text.split(" "):
+                await asyncio.sleep(self.delay)
+                yield MagicMock(delta=word + " ")
+        return deltas()
+
+
+class TestSharedLlamaClient(unittest.TestCase):
+    """Tests for the shared LlamaCloud client summarization"""
+    
+    def setUp(self):
+        """Create a client with a fake LLM"""
+        from backend.clients.shared_llama_client import SharedLlamaClient
+        
+        with patch.dict(os.environ, {"SUMMARY_CONCURRENCY": "3"}):
+            self.client = SharedLlamaClient()
+        self.fake_llm = FakeLLM()
+        self.client._llm = self.fake_llm
+    
+    def test_asummarize_chunks_ordered_and_bounded(self):
+        """Test chunk summaries keep chunk order under bounded concurrency"""
+        chunks = [f"chunk number {i}" for i in range(10)]
+        progress = []
+        
+        summaries = asyncio.run(self.client.asummarize_chunks(
+            chunks, on_progress=lambda done, total: progress.append((done, total))
+        ))
+        
+        self.assertEqual(summaries, [f"SUMMARY OF chunk number {i}" for i in range(10)])
+        self.assertLessEqual(self.fake_llm.max_active, 3)
+        self.assertGreater(self.fake_llm.max_active, 1)
+        self.assertEqual(progress, [(i, 10) for i in range(1, 11)])
+    
+    def test_asummarize_chunks_from_async_source(self):
+        """Test chunks from an async source are summarized as they arrive"""
+        pulled = []
+        
+        async def source():
+            for i in range(6):
+                pulled.append(i)
+                yield f"streamed chunk {i}"
+        
+        progress = []
+        summaries = asyncio.run(self.client.asummarize_chunks(
+            source(), concurrency=2, on_progress=lambda done, total: progress.append((done, total))
+        ))
+        
+        self.assertEqual(summaries, [f"SUMMARY OF streamed chunk {i}" for i in range(6)])
+        self.assertLessEqual(self.fake_llm.max_active, 2)
+        # The total is only known once the source is exhausted
+        self.assertIsNone(progress[0][1])
+        self.assertEqual(progress[-1], (6, 6))
+    
+    def test_identical_chunks_summarized_once(self):
+        """Test duplicate chunks share one LLM request and fan back out"""
+        chunks = ["appendix table", "unique text", "appendix table", "appendix table", "more text"]
+        progress = []
+        stats = {}
+        
+        summaries = asyncio.run(self.client.asummarize_chunks(
+            chunks, on_progress=lambda done, total: progress.append((done, total)), stats=stats
+        ))
+        
+        self.assertEqual(summaries, [f"SUMMARY OF {chunk}" for chunk in chunks])
+        self.assertEqual(len(self.fake_llm.prompts), 3)
+        self.assertEqual(stats["deduplicated_chunks"], 2)
+        self.assertEqual(progress[-1], (5, 5))
+    
+    def test_batched_chunks_respect_budget(self):
+        """Test small chunks are packed up to the token budget and chunk limit"""
+        self.client._llm = self.fake_llm = FakeBatchLLM()
+        # Count characters as tokens so the packing does not depend on the tokenizer
+        self.client.count_tokens = len
+        self.client.batch_tokens = 120
+        self.client.batch_max_chunks = 3
+        # Three 40-character chunks fill a batch, the seventh is sent alone and the last exceeds the budget
+        chunks = [f"chunk {i:02d} ".ljust(40, "x") for i in range(7)] + ["y" * 200]
+        stats = {}
+        
+        summaries = asyncio.run(self.client.asummarize_chunks(chunks, batch=True, stats=stats))
+        
+        self.assertEqual(summaries, [f"SUMMARY OF {chunk}" for chunk in chunks])
+        batch_sizes = [prompt.count("<section id=") for prompt in self.fake_llm.prompts]
+        self.assertEqual(sorted(batch_sizes), [0, 0, 3, 3])
+        self.assertEqual(stats["batched_chunks"], 7)
+        self.assertEqual(stats["batch_requests"], 2)
+        self.assertEqual(stats["batch_fallbacks"], 0)
+    
+    def test_batch_parse_failure_falls_back(self):
+        """Test a batched reply that cannot be split is retried chunk by chunk"""
+        self.client._llm = self.fake_llm = FakeBatchLLM(malformed=True)
+        chunks = ["first chunk", "second chunk", "third chunk"]
+        stats = {}
+        
+        summaries = asyncio.run(self.client.asummarize_chunks(chunks, batch=True, stats=stats))
+        
+        self.assertEqual(summaries, [f"SUMMARY OF {chunk}" for chunk in chunks])
+        self.assertEqual(len(self.fake_llm.prompts), 4)
+        self.assertEqual(stats["batch_fallbacks"], 1)
+    
+    def test_batched_and_single_summaries_share_cache(self):
+        """Test batched summaries serve single requests and cached chunks skip batching"""
+        self.client._llm = self.fake_llm = FakeBatchLLM()
+        chunks = ["first chunk", "second chunk", "third chunk"]
+        
+        asyncio.run(self.client.asummarize_chunks(chunks, batch=True))
+        self.assertEqual(self.client.summarize_text("second chunk"), "SUMMARY OF second chunk")
+        self.assertEqual(len(self.fake_llm.prompts), 1)
+        
+        # Only the uncached chunks are packed into the next batch
+        stats = {}
+        summaries = asyncio.run(self.client.asummarize_chunks(chunks + ["fourth chunk", "fifth chunk"], batch=True, stats=stats))
+        self.assertEqual(summaries, [f"SUMMARY OF {chunk}" for chunk in chunks + ["fourth chunk", "fifth chunk"]])
+        self.assertEqual(self.fake_llm.prompts[-1].count("<section id="), 2)
+        self.assertEqual(stats["batched_chunks"], 2)
+    
+    def test_batched_chunks_looked_up_once(self):
+        """Test each chunk is looked up in the cache once, including oversized and fallback chunks"""
+        self.client.count_tokens = len
+        self.client.batch_tokens = 100
+        
+        def lookups():
+            stats = self.client.summary_cache.stats()
+            return stats["hits"] + stats["misses"]
+        
+        for llm in (FakeBatchLLM(), FakeBatchLLM(malformed=True)):
+            with self.subTest(malformed=llm.malformed):
+                self.client._llm = llm
+                chunks = [f"{name} chunk {llm.malformed}" for name in ("first", "second", "third")] + ["x" * 200]
+                before = lookups()
+                asyncio.run(self.client.asummarize_chunks(chunks, batch=True))
+                self.assertEqual(lookups() - before, len(chunks))
+    
+    def test_parse_batch_response(self):
+        """Test batched replies are split by section id and rejected when incomplete"""
+        from backend.clients.shared_llama_client import parse_batch_response
+        
+        reply = 'Sure!\n<summary id="2">two\nlines</summary>\n<summary id="1"> one </summary>'
+        self.assertEqual(parse_batch_response(reply, 2), ["one", "two\nlines"])
+        self.assertIsNone(parse_batch_response(reply, 3))
+        self.assertIsNone(parse_batch_response(reply + '<summary id="1">again</summary>', 2))
+        self.assertIsNone(parse_batch_response('<summary id="1"></summary>', 1))
+    
+    def test_tree_reduce_summaries(self):
+        """Test summaries are reduced level by level with concurrent groups"""
+        summaries = [f"part {i}" for i in range(20)]
+        levels_started = []
+        
+        final, levels = asyncio.run(self.client.areduce_summaries(
+            summaries, fan_in=4, target_length=10, on_level=lambda level, groups: levels_started.append((level, groups))
+        ))
+        
+        # 20 summaries -> 5 groups -> 2 groups -> 1 summary
+        self.assertEqual(levels, 3)
+        self.assertEqual(levels_started, [(1, 5), (2, 2), (3, 1)])
+        self.assertEqual(len(self.fake_llm.prompts), 8)
+        self.assertGreater(self.fake_llm.max_active, 1)
+        self.assertTrue(final.startswith("SUMMARY OF SUMMARY OF SUMMARY OF part 0"))
+        
+        # Summaries that already fit are joined unchanged
+        self.assertEqual(asyncio.run(self.client.areduce_summaries(["a", "b"], target_length=100)), ("a\n\nb", 0))
+    
+    def test_process_pdf_inside_running_loop(self):
+        """Test the sync process_pdf API works when called from async code"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = make_test_pdf(os.path.join(temp_dir, "in.pdf"), ["Some text. More text."])
+            
+            async def call_sync_api():
+                return self.client.process_pdf(pdf_path, temp_dir)
+            
+            result = asyncio.run(call_sync_api())
+            self.assertEqual(result["num_chunks"], 1)
+            self.assertTrue(os.path.exists(result["output_pdf"]))
+
+    def test_summary_and_token_callbacks(self):
+        """Test each chunk reports its summary, and streamed tokens add up to it"""
+        self.client._llm = FakeStreamingLLM(delay=0)
+        summaries, tokens = {}, {}
+        
+        def on_token(index, text):
+            tokens[index] = "" if text is None else tokens.get(index, "") + text
+        
+        result = asyncio.run(self.client.asummarize_chunks(
+            ["alpha chunk", "beta chunk", "alpha chunk"],
+            on_summary=summaries.__setitem__, on_token=on_token
+        ))
+        
+        self.assertEqual(summaries, dict(enumerate(result)))
+        self.assertEqual(result[0], "SUMMARY OF alpha chunk")
+        # The duplicate chunk reuses its summary without a second request
+        self.assertEqual({i: text.strip() for i, text in tokens.items()}, {0: result[0], 1: result[1]})
+    
+    def test_small_document_fast_paths(self):
+        """Test empty, short and single-chunk documents skip the stages they do not need"""
+        def summarize(pages, **kwargs):
+            async def source():
+                for page in pages:
+                    yield page
+            return asyncio.run(self.client.asummarize_pdf("unused.pdf", pages=source(), **kwargs))
+        
+        empty = summarize(["", "  \n"])
+        self.assertEqual((empty["fast_path"], empty["summaries"], empty["num_chunks"]), ("empty_text", [], 0))
+        
+        short = summarize(["A short memo."], max_length=100)
+        self.assertEqual((short["fast_path"], short["summaries"]), ("short_text", ["A short memo."]))
+        self.assertEqual(self.fake_llm.prompts, [])
+        
+        single = summarize(["One page of text. " * 20], chunk_size=1000, max_length=100)
+        self.assertEqual((single["fast_path"], single["num_chunks"]), ("single_chunk", 1))
+        self.assertEqual(len(self.fake_llm.prompts), 1)
+        
+        chunked = summarize(["Many pages of text. " * 40] * 3, chunk_size=1000, max_length=100)
+        self.assertIsNone(chunked["fast_path"])
+        self.assertGreater(chunked["num_chunks"], 1)
+        self.assertEqual(chunked["extracted_text_length"], 3 * (800 + 2))
+    
+    def test_chunk_token_budget_fills_context(self):
+        """Test the chunk token budget leaves room for the prompt and summary"""
+        from backend.utils.tokens import count_tokens
+        
+        self.assertGreater(count_tokens("some text to count"), 0)
+        self.fake_llm.metadata = MagicMock(context_window=16384)
+        budget = self.client.chunk_token_budget(max_length=500)
+        self.assertGreater(budget, 10000)
+        self.assertLess(budget, 16384 - 125)
+        
+        chunks = self.client.chunk_text_by_tokens("A sentence. " * 20000, max_tokens=budget, overlap_tokens=0)
+        self.assertTrue(all(self.client.count_tokens(chunk) <= budget for chunk in chunks))
+        
+        with patch.object(self.client, "chunk_token_budget_override", 2000):
+            self.assertEqual(self.client.chunk_token_budget(), 2000)
+    
+    def test_summaries_are_cached(self):
+        """Test repeated chunks are served from the summary cache"""
+        first = asyncio.run(self.client.asummarize_text("Repeated boilerplate text."))
+        second = self.client.summarize_text("Repeated boilerplate text.")
+        
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.fake_llm.prompts), 1)
+        stats = self.client.summary_cache.stats()
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        
+        # A different max_length is a different request
+        self.client.summarize_text("Repeated boilerplate text.", max_length=100)
+        self.assertEqual(len(self.fake_llm.prompts), 2)
+    
+    def test_prompt_change_invalidates_cache(self):
+        """Test summaries made with an earlier version of either prompt are not reused"""
+        from backend.clients import shared_llama_client
+        
+        self.client.summarize_text("Prompt versioned text.")
+        for template in ("SUMMARY_PROMPT_TEMPLATE", "BATCH_PROMPT_TEMPLATE"):
+            with self.subTest(template=template), \
+                    patch.object(shared_llama_client, template, getattr(shared_llama_client, template) + "\nBe brief."):
+                client = shared_llama_client.SharedLlamaClient()
+                client._llm = self.fake_llm
+                client.summary_cache = self.client.summary_cache
+                misses = client.summary_cache.stats()["misses"]
+                client.summarize_text("Prompt versioned text.")
+                self.assertEqual(client.summary_cache.stats()["misses"], misses + 1)
+        self.assertEqual(len(self.fake_llm.prompts), 3)
+
+
+class FakeRateLimitError(Exception):
+    """Provider 429 error carrying a Retry-After header"""
+    
+    def __init__(self, retry_after="0"):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = MagicMock(status_code=429, headers={"retry-after": retry_after})
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests for the adaptive LLM rate limiter"""
+    
+    def test_token_bucket_paces_reservations(self):
+        """Test reservations beyond the burst wait for the refill"""
+        from backend.utils.rate_limiter import TokenBucket
+        
+        bucket = TokenBucket(60, burst_seconds=2)
+        now = bucket.updated
+        self.assertEqual(bucket.reserve(1, now), 0.0)
+        self.assertEqual(bucket.reserve(1, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 1.0)
+        self.assertAlmostEqual(bucket.reserve(1, now + 0.5), 1.5)
+    
+    def test_concurrency_limit_across_threads_and_loops(self):
+        """Test the limit holds for async calls on several loops and sync calls together"""
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        
+        limiter = AdaptiveRateLimiter(initial_concurrency=2, max_concurrency=2)
+        lock = threading.Lock()
+        state = {"active": 0, "max_active": 0}
+        
+        def enter():
+            with lock:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+        
+        def leave():
+            with lock:
+                state["active"] -= 1
+        
+        async def call():
+            enter()
+            await asyncio.sleep(0.02)
+            leave()
+            return "ok"
+        
+        def sync_call():
+            enter()
+            time.sleep(0.02)
+            leave()
+            return "ok"
+        
+        async def run_async():
+            return await asyncio.gather(*(limiter.acall(call) for _ in range(4)))
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.extend(asyncio.run(run_async()))) for _ in range(2)]
+        threads.append(threading.Thread(target=lambda: results.extend(limiter.call(sync_call) for _ in range(3))))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, ["ok"] * 11)
+        self.assertEqual(state["max_active"], 2)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+    
+    def test_rate_limit_backs_off_and_requeues(self):
+        """Test a burst of 429s halves the limit once and the calls still succeed"""
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        
+        limiter = AdaptiveRateLimiter(initial_concurrency=8, max_concurrency=8)
+        failures = {"left": 4}
+        
+        async def call():
+            await asyncio.sleep(0.01)
+            if failures["left"] > 0:
+                failures["left"] -= 1
+                raise FakeRateLimitError()
+            return "ok"
+        
+        async def run():
+            return await asyncio.gather(*(limiter.acall(call) for _ in range(4)))
+        
+        self.assertEqual(asyncio.run(run()), ["ok"] * 4)
+        stats = limiter.stats()
+        self.assertEqual(stats["rate_limited"], 4)
+        self.assertEqual(stats["concurrency_limit"], 4)
+    
+    def test_rate_limit_error_raised_after_retries(self):
+        """Test a call that keeps hitting the rate limit eventually fails"""
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        
+        limiter = AdaptiveRateLimiter(max_rate_limit_retries=2)
+        calls = []
+        
+        def call():
+            calls.append(1)
+            raise FakeRateLimitError()
+        
+        with self.assertRaises(FakeRateLimitError):
+            limiter.call(call)
+        self.assertEqual(len(calls), 3)
+    
+    def test_rate_limit_retries_have_one_owner(self):
+        """Test 429s re-queued by the limiter are not retried again by the retry policy"""
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        from backend.utils.retry import RetryPolicy
+        
+        policy = RetryPolicy(max_attempts=4, base_delay=0.001)
+        calls = []
+        
+        def call():
+            calls.append(1)
+            raise FakeRateLimitError()
+        
+        async def acall():
+            return call()
+        
+        limiter = AdaptiveRateLimiter(max_rate_limit_retries=2)
+        with self.assertRaises(FakeRateLimitError):
+            policy.call(lambda: limiter.call(call))
+        self.assertEqual(len(calls), 3)
+        
+        # Without limiter re-queues, the retry policy owns 429 retries
+        calls.clear()
+        limiter = AdaptiveRateLimiter(max_rate_limit_retries=0)
+        with self.assertRaises(FakeRateLimitError):
+            asyncio.run(policy.acall(lambda: limiter.acall(acall)))
+        self.assertEqual(len(calls), 4)
+    
+    def test_slow_calls_reduce_and_fast_calls_grow_concurrency(self):
+        """Test latency above the target shrinks the limit and fast successes grow it back"""
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        
+        limiter = AdaptiveRateLimiter(initial_concurrency=4, latency_target=0.01)
+        limiter.call(lambda: time.sleep(0.02))
+        self.assertEqual(limiter.stats()["concurrency_limit"], 2)
+        for _ in range(6):
+            limiter.call(lambda: None)
+        self.assertEqual(limiter.stats()["concurrency_limit"], 4)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Tests for LLM retries, deadlines and hedging"""
+    
+    def test_retries_transient_errors_only(self):
+        """Test retryable errors are retried with backoff and others raised at once"""
+        from backend.utils.retry import RetryPolicy
+        
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+        attempts = []
+        
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("reset")
+            return "ok"
+        
+        stats = {}
+        self.assertEqual(asyncio.run(policy.acall(flaky, stats=stats)), "ok")
+        self.assertEqual(stats["retries"], 2)
+        
+        async def invalid():
+            attempts.append(1)
+            raise ValueError("bad request")
+        
+        attempts.clear()
+        with self.assertRaises(ValueError):
+            asyncio.run(policy.acall(invalid))
+        self.assertEqual(len(attempts), 1)
+    
+    def test_hedged_request_wins_over_slow_one(self):
+        """Test a duplicate is sent past the latency percentile and the first answer wins"""
+        from backend.utils.retry import RetryPolicy
+        
+        policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy._record(0.01)
+        started = []
+        cancelled = []
+        
+        async def call():
+            started.append(1)
+            try:
+                await asyncio.sleep(5 if len(started) == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return f"answer {len(started)}"
+        
+        stats = {}
+        begin = time.monotonic()
+        self.assertEqual(asyncio.run(policy.acall(call, stats=stats)), "answer 2")
+        self.assertLess(time.monotonic() - begin, 1)
+        self.assertEqual(stats, {"hedges": 1, "hedge_wins": 1})
+        self.assertEqual(cancelled, [1])
+    
+    def test_hedge_timer_excludes_limiter_queue(self):
+        """Test time queued in the rate limiter neither triggers a hedge nor counts as latency"""
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        from backend.utils.retry import RetryPolicy
+        
+        policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy._record(0.05)
+        limiter = AdaptiveRateLimiter(initial_concurrency=1, max_concurrency=1)
+        
+        async def fast():
+            await asyncio.sleep(0.01)
+            return "ok"
+        
+        async def run():
+            # Another request holds the only slot well past the hedge threshold
+            holder = asyncio.ensure_future(limiter.acall(lambda: asyncio.sleep(0.3)))
+            await asyncio.sleep(0.01)
+            result = await policy.acall(fast, stats=stats, limiter=limiter)
+            await holder
+            return result
+        
+        stats = {}
+        self.assertEqual(asyncio.run(run()), "ok")
+        self.assertEqual(stats, {})
+        self.assertLess(max(policy._latencies), 0.2)
+    
+    def test_deadline_retries_hung_request(self):
+        """Test a request past its deadline is abandoned and retried, and counted in job stats"""
+        from backend.clients.shared_llama_client import SharedLlamaClient
+        from backend.utils.rate_limiter import AdaptiveRateLimiter
+        from backend.utils.retry import RetryPolicy
+        
+        class HangingLLM(FakeLLM):
+            async def acomplete(self, prompt):
+                if not self.prompts:
+                    self.prompts.append(None)
+                    await asyncio.sleep(5)
+                return self.complete(prompt)
+        
+        client = SharedLlamaClient()
+        client._llm = HangingLLM()
+        client.rate_limiter = AdaptiveRateLimiter()
+        client.retry_policy = RetryPolicy(base_delay=0.001, deadline=0.05)
+        stats = {}
+        
+        summaries = asyncio.run(client.asummarize_chunks(["only chunk"], stats=stats))
+        
+        self.assertEqual(summaries, ["SUMMARY OF only chunk"])
+        self.assertEqual(stats["llm_calls"], {"retries": 1, "hedges": 0, "hedge_wins": 0})
+        self.assertEqual(client.rate_limiter.stats()["timeouts"], 1)
+    
+    def test_failed_chunk_fails_job_or_keeps_marked_excerpt(self):
+        """Test exhausted retries fail the job unless excerpts are enabled and counted"""
+        from backend.clients.shared_llama_client import SharedLlamaClient
+        from backend.utils.retry import RetryPolicy
+        
+        class FailingLLM(FakeLLM):
+            def complete(self, prompt):
+                if "broken" in prompt:
+                    raise ConnectionError("unreachable")
+                return super().complete(prompt)
+        
+        client = SharedLlamaClient()
+        client._llm = FailingLLM()
+        client.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.001)
+        
+        with self.assertRaises(RuntimeError):
+            asyncio.run(client.asummarize_chunks(["fine chunk", "broken chunk"]))
+        
+        client.summary_on_error = "excerpt"
+        stats = {}
+        summaries = asyncio.run(client.asummarize_chunks(["fine chunk", "broken chunk"], stats=stats))
+        self.assertEqual(summaries, ["SUMMARY OF fine chunk", "broken chunk...(truncated)"])
+        self.assertEqual(stats["failed_chunks"], 1)
+        self.assertEqual(stats["llm_calls"]["retries"], 1)
+        
+        # The synchronous path applies the same policy instead of returning error text
+        self.assertEqual(client.summarize_text("broken text"), "broken text...(truncated)")
+        client.summary_on_error = "fail"
+        with self.assertRaises(RuntimeError):
+            client.summarize_text("broken text")
+
+
+class TestJobEventHub(unittest.TestCase):
+    """Tests for the job event hub behind the SSE endpoint"""
+    
+    def test_replay_and_final_event(self):
+        """Test late subscribers get replayable history after their last event id"""
+        from backend.utils.job_events import JobEventHub, format_sse
+        
+        async def scenario():
+            hub = JobEventHub()
+            hub.publish("job", "summary", {"chunk": 0})
+            hub.publish("job", "token", {"chunk": 1, "text": "x"}, replay=False)
+            hub.publish("job", "summary", {"chunk": 1})
+            
+            late = hub.subscribe("job")
+            resumed = hub.subscribe("job", last_event_id=1)
+            hub.publish("job", "complete", {"status": "complete"})
+            hub.close("job")
+            
+            async def drain(subscription):
+                events = []
+                while (item := await subscription.get(timeout=1)) is not None:
+                    events.append(item[:2])
+                return events
+            return await drain(late), await drain(resumed), hub.stats()
+        
+        late, resumed, stats = asyncio.run(scenario())
+        self.assertEqual(late, [(1, "summary"), (3, "summary"), (4, "complete")])
+        self.assertEqual(resumed, [(3, "summary"), (4, "complete")])
+        self.assertEqual(stats, {"jobs": 0, "subscribers": 0})
+        self.assertEqual(format_sse("summary", {"chunk": 0}, 7), 'id: 7\nevent: summary\ndata: {"chunk": 0}\n\n')
+    
+    def test_slow_subscriber_overflows(self):
+        """Test a subscriber that falls behind is closed instead of buffering forever"""
+        from backend.utils.job_events import JobEventHub
+        
+        async def scenario():
+            hub = JobEventHub(max_pending=2)
+            subscription = hub.subscribe("job")
+            for i in range(5):
+                hub.publish("job", "token", {"chunk": i}, replay=False)
+            received = [await subscription.get(timeout=1) for _ in range(3)]
+            return subscription, received
+        
+        subscription, received = asyncio.run(scenario())
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual([item and item[0] for item in received], [1, 2, None])
+
+
+class TestSummaryCache(unittest.TestCase):
+    """Tests for the two-tier summary cache"""
+    
+    def test_cache_key_covers_request_parameters(self):
+        """Test the key changes with text, template, model and max_length"""
+        from backend.utils.summary_cache import summary_cache_key
+        
+        base = summary_cache_key("text", "v1", "model", 500)
+        self.assertEqual(base, summary_cache_key("text", "v1", "model", 500))
+        self.assertNotEqual(base, summary_cache_key("text2", "v1", "model", 500))
+        self.assertNotEqual(base, summary_cache_key("text", "v2", "model", 500))
+        self.assertNotEqual(base, summary_cache_key("text", "v1", "model2", 500))
+        self.assertNotEqual(base, summary_cache_key("text", "v1", "model", 100))
+    
+    def test_memory_lru_eviction(self):
+        """Test the memory tier evicts least recently used entries by size"""
+        from backend.utils.summary_cache import SummaryCache
+        
+        cache = SummaryCache(max_bytes=25)
+        cache.put("a", "x" * 9)
+        cache.put("b", "x" * 9)
+        cache.get("a")
+        cache.put("c", "x" * 9)
+        
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["memory_bytes"], 20)
+    
+    def test_disk_tier_persists_and_evicts(self):
+        """Test the SQLite tier survives a restart and stays within its size limit"""
+        from backend.utils.summary_cache import SummaryCache
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache.sqlite3")
+            cache = SummaryCache(max_bytes=0, disk_path=path, disk_max_bytes=25)
+            cache.put("a", "x" * 9)
+            cache.put("b", "x" * 9)
+            cache.put("c", "x" * 9)
+            cache.close()
+            
+            reopened = SummaryCache(max_bytes=1024, disk_path=path, disk_max_bytes=25)
+            self.assertIsNone(reopened.get("a"))
+            self.assertEqual(reopened.get("c"), "x" * 9)
+            self.assertEqual(reopened.get("c"), "x" * 9)
+            stats = reopened.stats()
+            self.assertEqual((stats["disk_hits"], stats["memory_hits"], stats["misses"]), (1, 1, 1))
+            self.assertLessEqual(stats["disk_bytes"], 25)
+            reopened.close()
+
+
+
+class TestJobStore(unittest.TestCase):
+    """Tests for the in-memory and SQLite job stores"""
+    
+    def setUp(self):
+        """Create one store of each backend"""
+        from backend.utils.job_store import InMemoryJobStore, SQLiteJobStore
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "jobs.sqlite3")
+        self.stores = [InMemoryJobStore(ttl_seconds=60), SQLiteJobStore(self.db_path, ttl_seconds=60)]
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        for store in self.stores:
+            store.close()
+        self.temp_dir.cleanup()
+    
+    def test_indexed_lookups_and_counters(self):
+        """Test lookups by id, status and content key with incremental counters"""
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                store.create({"job_id": "a", "status": "uploaded", "content_key": "k1"})
+                store.create({"job_id": "b", "status": "uploaded", "content_key": "k1"})
+                store.create({"job_id": "c", "status": "uploaded"})
+                store.update("a", status="complete", result={"num_chunks": 2})
+                store.update("b", progress="Summarized chunk 1/2")
+                
+                self.assertEqual(store.get("a")["result"], {"num_chunks": 2})
+                self.assertEqual(store.get("b")["progress"], "Summarized chunk 1/2")
+                self.assertIsNone(store.get("missing"))
+                self.assertEqual(store.counts(), {"uploaded": 2, "complete": 1})
+                self.assertEqual(store.total(), 3)
+                self.assertEqual([job["job_id"] for job in store.find_by_status("uploaded")], ["b", "c"])
+                self.assertEqual([job["job_id"] for job in store.find_by_status("uploaded", limit=1)], ["b"])
+                self.assertEqual([job["job_id"] for job in store.find_by_status("uploaded", limit=None)], ["b", "c"])
+                self.assertEqual(store.find_by_content_key("k1")["job_id"], "a")
+                self.assertIsNone(store.find_by_content_key("k2"))
+                
+                self.assertTrue(store.delete("c"))
+                self.assertEqual(store.counts(), {"uploaded": 1, "complete": 1})
+    
+    def test_versions(self):
+        """Test every update bumps the version reported without loading the record"""
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                store.create({"job_id": "v", "status": "uploaded"})
+                self.assertEqual(store.get_version("v"), (1, "uploaded"))
+                
+                store.update("v", status="processing")
+                store.update("v", progress="Summarized chunk 1/2")
+                self.assertEqual(store.get_version("v"), (3, "processing"))
+                self.assertEqual(store.get("v")["version"], 3)
+                self.assertIsNone(store.get_version("missing"))
+    
+    def test_ttl_expiry(self):
+        """Test jobs expire once their TTL has passed since the last update"""
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                store.create({"job_id": "old", "status": "complete"})
+                store.create({"job_id": "new", "status": "complete"})
+                now = time.time()
+                
+                self.assertEqual(store.expire(now + 30), 0)
+                store.update("new", status="error")
+                self.assertEqual(store.expire(store.get("old")["updated_at"] + 60), 1)
+                self.assertIsNone(store.get("old"))
+                self.assertEqual(store.counts(), {"error": 1})
+    
+    def test_expiry_deletes_unreferenced_files(self):
+        """Test expired jobs leave no files behind, except files a remaining job shares"""
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                paths = {}
+                for name in ("upload", "output", "other_upload"):
+                    paths[name] = os.path.join(self.temp_dir.name, f"{type(store).__name__}_{name}.pdf")
+                    with open(paths[name], "wb") as f:
+                        f.write(b"%PDF-1.4")
+                store.create({"job_id": "old", "status": "complete",
+                              "file_path": paths["upload"], "output_pdf": paths["output"]})
+                # A deduplicated upload reuses the finished job's output
+                store.create({"job_id": "dup", "status": "complete",
+                              "file_path": paths["other_upload"], "output_pdf": paths["output"]})
+                store.update("dup", progress="done")
+                
+                self.assertEqual(store.expire(store.get("old")["updated_at"] + 60), 1)
+                self.assertFalse(os.path.exists(paths["upload"]))
+                self.assertTrue(os.path.exists(paths["output"]))
+                
+                self.assertEqual(store.expire(time.time() + 120), 1)
+                self.assertEqual([name for name, path in paths.items() if os.path.exists(path)], [])
+    
+    def test_sqlite_store_shared_between_connections(self):
+        """Test a second connection (e.g. another worker) sees the same jobs"""
+        from backend.utils.job_store import SQLiteJobStore
+        
+        self.stores[1].create({"job_id": "shared", "status": "uploaded"})
+        other = SQLiteJobStore(self.db_path)
+        try:
+            other.update("shared", status="complete")
+            self.assertEqual(self.stores[1].get("shared")["status"], "complete")
+            self.assertEqual(self.stores[1].counts(), {"complete": 1})
+        finally:
+            other.close()
+
+
+def reference_chunk_text(text, chunk_size, overlap, boundaries, max_steps=10000):
+    """Original whole-string chunking loop, or None if it does not terminate"""
+    chunks = []
+    start = 0
+    while start < len(text):
+        if len(chunks) > max_steps:
+            return None
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            for separator, keep in boundaries:
+                position = text.rfind(separator, start, end)
+                if position > start:
+                    end = position + keep
+                    break
+        chunks.append(text[start:end])
+        start = end - overlap if end < len(text) else len(text)
+        if start >= end:
+            break
+    return chunks
+
+
+class TestChunking(unittest.TestCase):
+    """Tests for the incremental text chunker"""
+    
+    def test_matches_whole_text_chunking(self):
+        """Test incremental chunking matches the original algorithm however text is fed"""
+        import random
+        from backend.utils.chunking import IncrementalChunker, SENTENCE_BOUNDARIES, LINE_BOUNDARIES, chunk_text
+        
+        rng = random.Random(7)
+        compared = 0
+        for _ in range(300):
+            text = "".join(rng.choice(["word ", "end. ", "\n", "\n\n", "x"]) for _ in range(rng.randint(0, 400)))
+            chunk_size = rng.randint(5, 120)
+            overlap = rng.randint(1, chunk_size - 1) if chunk_size > 1 else 0
+            boundaries = rng.choice([SENTENCE_BOUNDARIES, LINE_BOUNDARIES])
+            expected = reference_chunk_text(text, chunk_size, overlap, boundaries)
+            if expected is None:
+                continue
+            
+            chunker = IncrementalChunker(chunk_size, overlap, boundaries)
+            chunks = []
+            position = 0
+            while position < len(text):
+                step = rng.randint(1, 50)
+                chunks += chunker.feed(text[position:position + step])
+                position += step
+            chunks += chunker.finish()
+            
+            self.assertEqual(chunks, expected)
+            self.assertEqual(chunk_text(text, chunk_size, overlap, boundaries, indexed=True), expected)
+            self.assertEqual(chunker.num_chunks, len(expected))
+            self.assertEqual(chunker.length, len(text))
+            compared += 1
+        self.assertGreater(compared, 100)
+    
+    def test_boundary_index_finds_overlapping_separators(self):
+        """Test the boundary index sees every occurrence str.rfind can return"""
+        from backend.utils.chunking import find_all, prefers_boundary_index
+        
+        self.assertEqual(find_all("a\n\n\n\nb\n\nc", "\n\n"), [1, 2, 3, 6])
+        self.assertEqual(find_all("x. y. ", ". "), [1, 4])
+        self.assertEqual(find_all("", ". "), [])
+        
+        self.assertTrue(prefers_boundary_index("x" * 5000 + "\n", 1000))
+        self.assertFalse(prefers_boundary_index("Short sentence. " * 500, 1000))
+    
+    def test_chunk_spans_materialize_on_access(self):
+        """Test chunk spans hold offsets only and map each span to its pages"""
+        import tracemalloc
+        from backend.utils.pdf_text import PageBuffer
+        from backend.utils.chunking import chunk_spans, chunk_text
+        
+        buffer = PageBuffer([f"Page {i} sentence. " * 40 for i in range(20)])
+        spans = chunk_spans(buffer, chunk_size=300, overlap=100)
+        
+        self.assertEqual(list(spans), chunk_text(str(buffer), chunk_size=300, overlap=100))
+        self.assertEqual(spans[1:3], list(spans)[1:3])
+        start, end = spans.span(5)
+        self.assertEqual(spans[5], str(buffer)[start:end])
+        self.assertEqual(spans.pages(0), (0, 0))
+        first, last = spans.pages(len(spans) - 1)
+        self.assertEqual(last, 19)
+        self.assertIsNone(chunk_spans("plain text", 5, 1).pages(0))
+        
+        # Spans cost a fraction of the materialized chunks
+        text = "Some sentence here. " * 50000
+        tracemalloc.start()
+        spans = chunk_spans(text, chunk_size=1000, overlap=200)
+        span_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        tracemalloc.start()
+        chunks = chunk_text(text, chunk_size=1000, overlap=200)
+        chunk_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertEqual(len(spans), len(chunks))
+        self.assertLess(span_bytes * 4, chunk_bytes)
+    
+    def test_token_budget_chunking(self):
+        """Test token chunks stay within budget and still break at sentences"""
+        from backend.utils.chunking import chunk_text_by_tokens
+        
+        def count_words(text):
+            return len(text.split())
+        
+        sentences = [f"Sentence {i} has a few more words in it. " for i in range(200)]
+        text = "".join(sentences)
+        chunks = chunk_text_by_tokens(text, max_tokens=50, overlap_tokens=0, count_tokens=count_words)
+        
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(count_words(chunk) <= 50 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith(".") for chunk in chunks[:-1]))
+        # Chunks are filled close to the budget rather than split small
+        self.assertLessEqual(len(chunks), 2 * 200 * 10 // 50)
+        
+        # A denser second half than the calibration sample is split again to fit
+        dense = "word " * 100 + "x x x x x x x x. " * 100
+        self.assertTrue(all(count_words(chunk) <= 30 for chunk in
+                            chunk_text_by_tokens(dense, max_tokens=30, count_tokens=count_words)))
+    
+    def test_always_moves_forward(self):
+        """Test inputs that stalled the original loop now terminate and cover the text"""
+        from backend.utils.chunking import chunk_text
+        
+        text = "ab. " * 300
+        chunks = chunk_text(text, chunk_size=50, overlap=45)
+        self.assertTrue(chunks)
+        self.assertTrue(text.endswith(chunks[-1]))
+        
+        # Without overlap the chunks partition the text
+        self.assertEqual("".join(chunk_text(text, chunk_size=50, overlap=0)), text)
+
+
+class TestPDFExtraction(unittest.TestCase):
+    """Tests for page-level PDF text extraction"""
+    
+    def test_parallel_extraction_matches_single_process(self):
+        """Test page ranges extracted across processes are reassembled in page order"""
+        from backend.utils.pdf_text import page_ranges
+        from backend.utils.pdf_processor import PDFProcessor
+        from backend.clients.shared_llama_client import SharedLlamaClient
+        
+        self.assertEqual(page_ranges(5, 2), [(0, 2), (2, 4), (4, 5)])
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = make_test_pdf(os.path.join(temp_dir, "in.pdf"), [f"Page {i} text." for i in range(7)])
+            for client_class in (SharedLlamaClient, PDFProcessor):
+                with self.subTest(client=client_class.__name__):
+                    with patch.dict(os.environ, {"PDF_EXTRACT_PROCESSES": "1"}):
+                        sequential = str(client_class().extract_text_from_pdf(pdf_path))
+                    with patch.dict(os.environ, {"PDF_EXTRACT_PROCESSES": "2",
+                                                 "PDF_PARALLEL_EXTRACT_MIN_PAGES": "3"}):
+                        parallel = str(client_class().extract_text_from_pdf(pdf_path))
+                    self.assertEqual(parallel, sequential)
+                    self.assertLess(parallel.index("Page 1"), parallel.index("Page 6"))
+
+    
+    def test_page_buffer_offsets_and_chunking(self):
+        """Test a page buffer maps offsets to pages and chunks without joining"""
+        from backend.utils.pdf_text import PageBuffer
+        from backend.utils.chunking import chunk_text
+        
+        pages = ["First page. Some text.", "", "Third page here.\nNew line."]
+        buffer = PageBuffer(pages)
+        text = "".join(page + "\n\n" for page in pages)
+        
+        self.assertEqual(len(buffer), len(text))
+        self.assertEqual(list(buffer.offsets), [0, 24, 26, len(text)])
+        self.assertEqual(buffer.page_at(0), 0)
+        self.assertEqual(buffer.page_at(23), 0)
+        self.assertEqual(buffer.page_at(24), 1)
+        self.assertEqual(buffer.page_at(30), 2)
+        self.assertEqual(buffer.slice(18, 34), text[18:34])
+        self.assertEqual(chunk_text(buffer, chunk_size=20, overlap=5), chunk_text(text, chunk_size=20, overlap=5))
+        self.assertIsNone(buffer._text)
+        self.assertEqual(str(buffer), text)
+
+class TestExtractiveSummarizer(unittest.TestCase):
+    """Tests for the local extractive summarizer"""
+    
+    TEXT = (
+        "The river flooded the valley farms after the storm. "
+        "Farmers in the valley lost crops when the river flooded. "
+        "A local bakery introduced a new kind of sourdough bread. "
+        "The storm damage to valley farms will take months to repair. "
+        "Officials said the flooded river should recede by next week."
+    )
+    
+    def test_extractive_default_requires_numpy(self):
+        """Test configuring the extractive engine without NumPy fails at startup"""
+        from backend.clients.shared_llama_client import SharedLlamaClient
+        
+        with patch.dict(os.environ, {"SUMMARY_ENGINE": "extractive"}), \
+                patch("backend.utils.extractive.np", None):
+            with self.assertRaises(RuntimeError):
+                SharedLlamaClient()
+        with patch.dict(os.environ, {"SUMMARY_ENGINE": "extractive"}):
+            self.assertEqual(SharedLlamaClient().summary_engine, "extractive")
+    
+    def test_keeps_central_sentences_in_text_order(self):
+        """Test the summary favours sentences sharing the text's main terms"""
+        from backend.utils.extractive import extractive_summary, split_sentences
+        
+        summary = extractive_summary(self.TEXT, max_length=120)
+        
+        self.assertLessEqual(len(summary), 120)
+        self.assertNotIn("sourdough", summary)
+        kept = [sentence for sentence in split_sentences(self.TEXT) if sentence in summary]
+        self.assertGreaterEqual(len(kept), 2)
+        self.assertEqual(summary, " ".join(kept))
+    
+    def test_short_and_empty_text(self):
+        """Test text with no full sentences is returned whole or truncated"""
+        from backend.utils.extractive import extractive_summary
+        
+        self.assertEqual(extractive_summary("Page 3", 100), "Page 3")
+        self.assertEqual(extractive_summary("", 100), "")
+        self.assertEqual(len(extractive_summary("x" * 500, 50)), 50)
+    
+    def test_engine_skips_llm(self):
+        """Test the extractive engine summarizes chunks without LLM calls"""
+        from backend.clients.shared_llama_client import SharedLlamaClient
+        
+        client = SharedLlamaClient()
+        client._llm = fake_llm = FakeLLM()
+        
+        summaries = asyncio.run(client.asummarize_chunks([self.TEXT, self.TEXT + " More."], 120, engine="extractive"))
+        
+        self.assertEqual(fake_llm.prompts, [])
+        self.assertTrue(all(0 < len(summary) <= 120 for summary in summaries))
+
+
+class TestBoilerplate(unittest.TestCase):
+    """Tests for repeated header and footer removal"""
+    
+    def make_pages(self, count):
+        """Pages with a running header, page number footer and unique body"""
+        return [f"ACME Corp Annual Report\nBody text {'abcdefghij'[i % 10]} on this page.\nPage {i + 1} of {count}"
+                for i in range(count)]
+    
+    def test_repeated_lines_are_removed(self):
+        """Test headers and numbered footers are stripped and the savings reported"""
+        from backend.utils.boilerplate import BoilerplateFilter
+        
+        pages = self.make_pages(6)
+        boilerplate = BoilerplateFilter(min_pages=3, min_fraction=0.5, count_tokens=lambda text: len(text.split()))
+        self.assertEqual(boilerplate.learn(pages), 2)
+        
+        stripped = [boilerplate.strip(page) for page in pages]
+        self.assertEqual(stripped[0], "Body text a on this page.")
+        stats = boilerplate.stats()
+        self.assertEqual(stats["lines_removed"], 12)
+        self.assertEqual(stats["chars_removed"], sum(map(len, pages)) - sum(map(len, stripped)))
+        self.assertEqual(stats["tokens_saved"], 6 * (4 + 4))
+        
+        # Too few pages to tell boilerplate from content
+        short = BoilerplateFilter(min_pages=3)
+        self.assertEqual(short.learn(self.make_pages(2)), 0)
+    
+    def test_streamed_pages_learn_from_sample(self):
+        """Test streamed pages are stripped using boilerplate learned from the first pages"""
+        from backend.utils.boilerplate import BoilerplateFilter
+        
+        pages = self.make_pages(10)
+        
+        async def source():
+            for page in pages:
+                yield page
+        
+        async def collect():
+            boilerplate = BoilerplateFilter()
+            return [page async for page in boilerplate.astrip_stream(source(), sample_pages=4)], boilerplate
+        
+        stripped, boilerplate = asyncio.run(collect())
+        self.assertEqual(len(stripped), 10)
+        self.assertEqual(boilerplate.pages_learned, 4)
+        self.assertTrue(all(page.startswith("Body text") and "Page" not in page for page in stripped))
+    
+    def test_numeric_table_survives(self):
+        """Test a numeric table spanning pages is kept while the header and page number go"""
+        from backend.utils.boilerplate import BoilerplateFilter
+        
+        tables = [[f"{region} {100 + i * 7 + n} {200 + i * 11 + n} {300 + i * 13 + n}"
+                   for n, region in enumerate(["North", "South", "East", "West", "Total"])]
+                  for i in range(6)]
+        pages = ["\n".join(["ACME Corp Annual Report", *rows, f"- {i + 1} -"]) for i, rows in enumerate(tables)]
+        
+        boilerplate = BoilerplateFilter(min_pages=3, min_fraction=0.5)
+        self.assertEqual(boilerplate.learn(pages), 2)
+        self.assertEqual([boilerplate.strip(page).split("\n") for page in pages], tables)
+        
+        # Lines between the header and footer zones are never boilerplate, however often they repeat
+        pages = ["Top\nof\npage\nSame body line\nbottom\nof\npage"] * 6
+        body_filter = BoilerplateFilter(zone_lines=3)
+        body_filter.learn(pages)
+        self.assertEqual(body_filter.strip(pages[0]), "Same body line")
+
+
+class TestWebhookDispatcher(unittest.TestCase):
+    """Tests for callback URL validation"""
+    
+    def test_non_public_hosts_rejected(self):
+        """Test callback hosts resolving to loopback, link-local or private addresses are refused"""
+        from backend.utils.webhooks import WebhookDispatcher
+        
+        webhooks = WebhookDispatcher()
+        rejected = [
+            "http://127.0.0.1/hook", "http://localhost:8080/hook", "http://[::1]/hook",
+            "http://169.254.169.254/latest/meta-data", "http://[fe80::1]/hook",
+            "http://10.0.0.5/hook", "http://172.16.3.4/hook", "https://192.168.1.1/hook",
+            "http://[fd00::1]/hook", "http://[::ffff:127.0.0.1]/hook", "http://0.0.0.0/hook",
+        ]
+        for url in rejected:
+            with self.subTest(url=url):
+                self.assertIsNotNone(webhooks.validate_url(url))
+        self.assertIsNone(webhooks.validate_url("https://93.184.216.34/hook"))
+        self.assertIsNotNone(webhooks.validate_url("ftp://93.184.216.34/hook"))
+        
+        # Allowlisted hosts and an explicit opt-in accept private addresses
+        self.assertIsNone(WebhookDispatcher(allowed_hosts={"10.0.0.5"}).validate_url("http://10.0.0.5/hook"))
+        self.assertIsNotNone(WebhookDispatcher(allowed_hosts={"10.0.0.5"}).validate_url("http://10.0.0.6/hook"))
+        self.assertIsNone(WebhookDispatcher(allow_private=True).validate_url("http://127.0.0.1/hook"))
+    
+    def test_delivery_refused_to_non_public_host(self):
+        """Test a delivery re-checks the host and makes no request to a private address"""
+        from backend.utils.webhooks import WebhookDispatcher
+        
+        receiver = WebhookReceiver()
+        self.addCleanup(receiver.close)
+        delivery = asyncio.run(WebhookDispatcher().deliver(receiver.url, {"job_id": "job-1"}))
+        
+        self.assertEqual((delivery["status"], delivery["attempts"]), ("failed", 0))
+        self.assertIn("non-public", delivery["last_error"])
+        self.assertEqual(receiver.requests, [])
+
+
+def make_test_pdf(path, pages):
+    """Write a PDF with one page per text block, for use in tests"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
+    pdf = canvas.Canvas(path, pagesize=letter)
+    for page_text in pages:
+        y = 720
+        for line in page_text.split("\n"):
+            pdf.drawString(72, y, line)
+            y -= 14
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+class WebhookReceiver:
+    """Local HTTP stand-in for a webhook endpoint that fails its first requests"""
+    
+    def __init__(self, failures=0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        receiver = self
+        self.failures = failures
+        self.requests = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((dict(self.headers), body))
+                self.send_response(503 if len(receiver.requests) <= receiver.failures else 204)
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestPDFHTTPServer(unittest.TestCase):
+    """Tests for the PDF processing endpoints of the HTTP server"""
+    
+    def setUp(self):
+        """Set up a test client with stages running on threads"""
+        from fastapi.testclient import TestClient
+        from backend.api import mcp_http_server
+        
+        self.server = mcp_http_server
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.stage_patcher = patch.dict(self.server.worker_pool.stage_modes, {
+            "extract": "thread", "render": "thread"
+        })
+        self.stage_patcher.start()
+        self.client_context = TestClient(self.server.app)
+        self.client = self.client_context.__enter__()
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        self.client_context.__exit__(None, None, None)
+        self.stage_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def upload(self, pages, filename="test.pdf"):
+        """Upload a generated PDF and return the response"""
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, filename), pages)
+        return self.upload_file(pdf_path)
+    
+    def upload_file(self, pdf_path, **kwargs):
+        """Upload an existing file and return the response"""
+        with open(pdf_path, "rb") as f:
+            return self.client.post(
+                "/pdf/upload", files={"file": (os.path.basename(pdf_path), f, "application/pdf")}, **kwargs
+            )
+    
+    def wait_for_job(self, job_id, timeout=10.0):
+        """Poll the status endpoint until the job finishes"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.client.get(f"/pdf/status/{job_id}").json()
+            if job["status"] in ("complete", "error"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish in {timeout} seconds")
+    
+    def test_upload_process_and_download(self):
+        """Test a PDF job runs on the worker pool through to download"""
+        response = self.upload(["First page text. It has sentences.", "Second page text."])
+        self.assertEqual(response.status_code, 200)
+        
+        job = self.wait_for_job(response.json()["job_id"])
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertGreaterEqual(job["result"]["num_chunks"], 1)
+        self.assertEqual(job["result"]["deduplicated_chunks"], 0)
+        
+        download = self.client.get(f"/pdf/download/{job['job_id']}")
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(download.content.startswith(b"%PDF"))
+        
+        status = self.client.get("/status").json()
+        self.assertIn("workers", status)
+    
+    def test_boilerplate_removed_before_summarization(self):
+        """Test running headers are stripped from job text and reported"""
+        topics = ["revenue", "staffing", "outlook", "risks"]
+        pages = [f"Confidential - Example Inc.\nThis section discusses {topic}.\n{i + 1}" for i, topic in enumerate(topics)]
+        with patch.object(self.server.llama_client, "strip_boilerplate", True):
+            response = self.upload(pages, filename="report.pdf")
+            job = self.wait_for_job(response.json()["job_id"])
+        
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        stats = job["result"]["boilerplate"]
+        self.assertGreater(stats["chars_removed"], 0)
+        self.assertGreater(stats["tokens_saved"], 0)
+    
+    def test_tree_reduce_mode(self):
+        """Test tree mode records its reduce levels and parameters"""
+        client = self.server.llama_client
+        with patch.object(client, "summary_mode", "tree"), patch.object(client, "summary_target_length", 5):
+            response = self.upload([f"Page {name} has its own text. " * 30 for name in "abcdef"], filename="tree.pdf")
+            job = self.wait_for_job(response.json()["job_id"])
+        
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertEqual(job["params"]["summary_mode"], "tree")
+        self.assertGreaterEqual(job["result"]["reduce_levels"], 1)
+    
+    def test_extractive_engine_per_request(self):
+        """Test an upload can pick the extractive engine, and unknown engines are rejected"""
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, "engine.pdf"), ["Triage memo about budgets. " * 20])
+        job_id = self.upload_file(pdf_path, data={"engine": "extractive"}).json()["job_id"]
+        job = self.wait_for_job(job_id)
+        
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertEqual(job["params"]["summary_engine"], "extractive")
+        self.assertEqual(job["result"]["summary_engine"], "extractive")
+        self.assertEqual(self.upload_file(pdf_path, data={"engine": "oracle"}).status_code, 400)
+    
+    def test_empty_pdf_completes_without_output(self):
+        """Test a PDF with no text finishes at once, recording the fast path"""
+        job_id = self.upload([""], filename="blank.pdf").json()["job_id"]
+        job = self.wait_for_job(job_id)
+        
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertEqual(job["result"]["fast_path"], "empty_text")
+        self.assertIsNone(job["result"]["output_pdf"])
+        self.assertEqual(self.client.get(f"/pdf/download/{job_id}").status_code, 404)
+    
+    def test_job_event_stream(self):
+        """Test a running job streams status changes, chunk summaries and tokens, then its record"""
+        self.assertEqual(self.client.get("/pdf/events/missing").status_code, 404)
+        
+        with patch.object(self.server.llama_client, "_llm", FakeStreamingLLM(delay=0.005)):
+            job_id = self.upload(["Streaming page text.\n" * 40], filename="stream.pdf").json()["job_id"]
+            events = []
+            with self.client.stream("GET", f"/pdf/events/{job_id}") as response:
+                self.assertEqual(response.headers["content-type"].split(";")[0], "text/event-stream")
+                for line in response.iter_lines():
+                    if line.startswith("event: "):
+                        events.append([line[len("event: "):]])
+                    elif line.startswith("data: "):
+                        events[-1].append(json.loads(line[len("data: "):]))
+        
+        names = [name for name, _ in events]
+        self.assertEqual(names[0], "status")
+        self.assertIn("Summarized chunk 1/1", [data["progress"] for name, data in events if name == "status"])
+        self.assertEqual(names[-1], "complete", events[-1])
+        self.assertEqual(events[-1][1]["result"]["num_chunks"], 1)
+        self.assertIn("token", names)
+        summary = next(data for name, data in events if name == "summary")
+        self.assertTrue(summary["summary"].startswith("SUMMARY OF Streaming page text."))
+        
+        # A finished job's stream carries only its final event
+        with self.client.stream("GET", f"/pdf/events/{job_id}") as response:
+            self.assertEqual(list(response.iter_lines())[0], "event: complete")
+    
+    def test_unwatched_job_hedges_instead_of_streaming(self):
+        """Test a job nobody is subscribed to skips token streaming, so its requests are hedged"""
+        from backend.utils.retry import RetryPolicy
+        
+        policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy._record(0.0)
+        with patch.object(self.server.llama_client, "_llm", FakeStreamingLLM(delay=0.005)), \
+                patch.object(self.server.llama_client, "retry_policy", policy):
+            job_id = self.upload(["Unwatched page text.\n" * 40], filename="unwatched.pdf").json()["job_id"]
+            job = self.wait_for_job(job_id)
+        
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertGreater(job["result"]["llm_calls"]["hedges"], 0)
+    
+    def test_event_stream_polls_jobs_of_other_processes(self):
+        """Test a stream sees a job finished by another process well before the next keepalive"""
+        store = self.server.job_store
+        store.create({"job_id": "remote-job", "status": "processing"})
+        self.addCleanup(store.delete, "remote-job")
+        
+        # Changes made in the store, as by a processing worker, publish no events here
+        timer = threading.Timer(0.3, store.update, args=("remote-job",), kwargs={"status": "complete", "result": {}})
+        with patch.object(self.server, "processing_workers", 1), patch.object(self.server, "job_poll_interval", 0.05), \
+                patch.object(self.server, "sse_heartbeat_seconds", 30):
+            started = time.monotonic()
+            timer.start()
+            with self.client.stream("GET", "/pdf/events/remote-job") as response:
+                lines = [line for line in response.iter_lines() if line.startswith("event: ")]
+            timer.join()
+        
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(lines, ["event: status", "event: complete"])
+    
+    def test_long_poll_does_not_turn_on_token_streaming(self):
+        """Test a held long-poll is not an event subscriber, so the job keeps hedging instead of streaming"""
+        from backend.utils.retry import RetryPolicy
+        
+        store = self.server.job_store
+        store.create({"job_id": "held-job", "status": "processing"})
+        self.addCleanup(store.delete, "held-job")
+        etag = self.client.get("/pdf/status/held-job").headers["ETag"]
+        poll = threading.Thread(target=self.client.get, args=("/pdf/status/held-job",),
+                                kwargs={"params": {"wait": 1}, "headers": {"If-None-Match": etag}})
+        poll.start()
+        deadline = time.monotonic() + 5
+        while "held-job" not in self.server.job_waiters:
+            self.assertLess(time.monotonic(), deadline, "Long-poll was not held")
+            time.sleep(0.01)
+        self.assertFalse(self.server.job_events.has_subscribers("held-job"))
+        poll.join()
+        
+        # A whole job polled throughout still hedges and publishes no tokens
+        policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy._record(0.0)
+        published = []
+        publish = self.server.job_events.publish
+        
+        def record_publish(job_id, event, data, replay=True):
+            published.append(event)
+            return publish(job_id, event, data, replay)
+        
+        with patch.object(self.server.llama_client, "_llm", FakeStreamingLLM(delay=0.005)), \
+                patch.object(self.server.llama_client, "retry_policy", policy), \
+                patch.object(self.server.job_events, "publish", record_publish):
+            job_id = self.upload(["Polled page text.\n" * 40], filename="polled.pdf").json()["job_id"]
+            response = self.client.get(f"/pdf/status/{job_id}")
+            while response.json()["status"] not in ("complete", "error"):
+                response = self.client.get(f"/pdf/status/{job_id}", params={"wait": 5},
+                                           headers={"If-None-Match": response.headers["ETag"]})
+                if response.status_code == 304:
+                    response = self.client.get(f"/pdf/status/{job_id}")
+        
+        job = response.json()
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertGreater(job["result"]["llm_calls"]["hedges"], 0)
+        self.assertNotIn("token", published)
+    
+    def test_conditional_and_long_poll_status(self):
+        """Test status ETags, 304s for unchanged jobs, and waits that end on a change"""
+        store = self.server.job_store
+        store.create({"job_id": "poll-job", "status": "processing"})
+        self.addCleanup(store.delete, "poll-job")
+        
+        first = self.client.get("/pdf/status/poll-job")
+        etag = first.headers["ETag"]
+        self.assertEqual(first.json()["version"], 1)
+        self.assertEqual(self.client.get("/pdf/status/poll-job", headers={"If-None-Match": etag}).status_code, 304)
+        
+        started = time.monotonic()
+        unchanged = self.client.get("/pdf/status/poll-job", params={"wait": 0.3}, headers={"If-None-Match": etag})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        
+        # A change made elsewhere, as by a processing worker, ends the wait
+        timer = threading.Timer(0.2, store.update, args=("poll-job",), kwargs={"progress": "Summarized chunk 1/2"})
+        timer.start()
+        started = time.monotonic()
+        changed = self.client.get("/pdf/status/poll-job", params={"wait": 10}, headers={"If-None-Match": etag})
+        timer.join()
+        self.assertEqual(changed.status_code, 200)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(changed.json()["progress"], "Summarized chunk 1/2")
+        self.assertNotEqual(changed.headers["ETag"], etag)
+        self.assertEqual(self.client.get("/pdf/status/missing", params={"wait": 1}).status_code, 404)
+    
+    def test_completion_webhook_retried_and_recorded(self):
+        """Test a finished job is POSTed to its callback URL, retrying a failed delivery"""
+        import hmac
+        import hashlib
+        
+        receiver = WebhookReceiver(failures=1)
+        self.addCleanup(receiver.close)
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, "hook.pdf"), ["Webhook document text."])
+        self.assertEqual(self.upload_file(pdf_path, data={"callback_url": "ftp://example.com/hook"}).status_code, 400)
+        # Loopback callbacks are refused unless their host is allowlisted
+        self.assertEqual(self.upload_file(pdf_path, data={"callback_url": receiver.url}).status_code, 400)
+        
+        with patch.object(self.server.webhooks, "base_delay", 0.01), patch.object(self.server.webhooks, "secret", "s3cret"), \
+                patch.object(self.server.webhooks, "allowed_hosts", {"127.0.0.1"}):
+            job_id = self.upload_file(pdf_path, data={"callback_url": receiver.url}).json()["job_id"]
+            self.assertEqual(self.wait_for_job(job_id)["status"], "complete")
+            deadline = time.monotonic() + 10
+            while (self.client.get(f"/pdf/status/{job_id}").json().get("webhook") or {}).get("status") in (None, "pending"):
+                self.assertLess(time.monotonic(), deadline, "Webhook was not delivered")
+                time.sleep(0.05)
+        
+        webhook = self.client.get(f"/pdf/status/{job_id}").json()["webhook"]
+        self.assertEqual((webhook["status"], webhook["attempts"], webhook["last_status_code"]), ("delivered", 2, 204))
+        headers, body = receiver.requests[-1]
+        payload = json.loads(body)
+        self.assertEqual((payload["job_id"], payload["status"]), (job_id, "complete"))
+        self.assertIn("num_chunks", payload["result"])
+        expected = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+        self.assertEqual(headers["X-Webhook-Signature"], expected)
+    
+    def test_upload_rejects_non_pdf_and_oversized_content(self):
+        """Test uploads are checked for PDF content and size as they stream to disk"""
+        def post(content, filename="upload.pdf"):
+            return self.client.post("/pdf/upload", files={"file": (filename, content, "application/pdf")})
+        
+        uploads_before = set(os.listdir(self.server.upload_dir))
+        self.assertEqual(post(b"<html>not a pdf</html>").status_code, 400)
+        self.assertEqual(post(b"%P").status_code, 400)
+        
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, "sized.pdf"), ["Sized document text."])
+        with open(pdf_path, "rb") as f:
+            content = f.read()
+        # Caught while streaming, and from the declared length before the body is read
+        with patch.object(self.server, "max_upload_bytes", len(content) - 1):
+            self.assertEqual(post(content).status_code, 413)
+            self.assertEqual(post(content + b"0" * 2 * self.server.UPLOAD_FORM_OVERHEAD).status_code, 413)
+        self.assertEqual(set(os.listdir(self.server.upload_dir)), uploads_before)
+        
+        with patch.object(self.server, "max_upload_bytes", len(content)):
+            response = post(content)
+        self.assertEqual(response.status_code, 200)
+        self.wait_for_job(response.json()["job_id"])
+        
+        # The size check is plain ASGI, so streaming responses are not wrapped by an HTTP middleware
+        from starlette.middleware.base import BaseHTTPMiddleware
+        self.assertNotIn(BaseHTTPMiddleware, [middleware.cls for middleware in self.server.app.user_middleware])
+    
+    def test_identical_upload_reuses_output(self):
+        """Test a byte-identical upload points at the finished job's output"""
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, "same.pdf"), ["Duplicate document text."])
+        first = self.upload_file(pdf_path).json()
+        first_job = self.wait_for_job(first["job_id"])
+        self.assertEqual(first_job["status"], "complete", first_job.get("error"))
+        
+        second = self.upload_file(pdf_path).json()
+        self.assertEqual(second["status"], "complete")
+        self.assertEqual(second["deduplicated_from"], first["job_id"])
+        
+        second_job = self.client.get(f"/pdf/status/{second['job_id']}").json()
+        self.assertEqual(second_job["output_pdf"], first_job["output_pdf"])
+        self.assertEqual(self.client.get(f"/pdf/download/{second['job_id']}").status_code, 200)
+        
+        # A later match on the copy still points at the job that processed the file
+        self.server.job_store.update(second["job_id"], output_pdf=first_job["output_pdf"])
+        third = self.upload_file(pdf_path).json()
+        self.assertEqual(third["deduplicated_from"], first["job_id"])
+        self.assertEqual(self.client.get(f"/pdf/status/{third['job_id']}").json()["deduplicated_from"], first["job_id"])
+    
+    def test_shared_queue_dispatch(self):
+        """Test jobs wait in the store for a processing worker to claim them"""
+        with patch.object(self.server, "processing_workers", 1):
+            job_id = self.upload(["Queued for a processing worker."]).json()["job_id"]
+            time.sleep(0.2)
+            self.assertEqual(self.client.get(f"/pdf/status/{job_id}").json()["status"], "uploaded")
+            
+            async def claim_and_run():
+                running = set()
+                claimed = await self.server.claim_queued_jobs(running)
+                await asyncio.gather(*running)
+                return claimed
+            
+            self.assertEqual(asyncio.run(claim_and_run()), 1)
+        
+        job = self.client.get(f"/pdf/status/{job_id}").json()
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertEqual(job["worker_pid"], os.getpid())
+    
+    def test_stream_pages_in_process_batches(self):
+        """Test page batches extracted in worker processes arrive in page order"""
+        from backend.utils.pdf_text import iter_pdf_pages
+        
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, "pages.pdf"), [f"Page {i}." for i in range(5)])
+        
+        async def collect():
+            return [page async for page in self.server.stream_pdf_pages(pdf_path)]
+        
+        with patch.dict(self.server.worker_pool.stage_modes, {"extract": "process"}), \
+                patch.object(self.server, "pipeline_page_batch", 2), \
+                patch.object(self.server.llama_client, "parallel_extract_min_pages", 5):
+            pages = asyncio.run(collect())
+        self.assertEqual(pages, list(iter_pdf_pages(pdf_path)))
+        self.assertEqual(len(pages), 5)
+    
+    def test_small_pdf_in_process_mode(self):
+        """Test the default process mode extracts a small PDF in one worker call, through to download"""
+        pdf_path = make_test_pdf(os.path.join(self.temp_dir.name, "small.pdf"), ["First page text.", "Second page text."])
+        
+        run = self.server.worker_pool.run
+        calls = []
+        
+        async def record_run(stage, fn, *args, **kwargs):
+            calls.append((stage, fn.__name__))
+            return await run(stage, fn, *args, **kwargs)
+        
+        with patch.dict(self.server.worker_pool.stage_modes, {"extract": "process", "render": "process"}), \
+                patch.object(self.server.worker_pool, "run", record_run):
+            job = self.wait_for_job(self.upload_file(pdf_path).json()["job_id"], timeout=60)
+        
+        self.assertEqual(job["status"], "complete", job.get("error"))
+        self.assertEqual(calls, [("extract", "extract_small_pdf"), ("render", "generate_pdf")])
+        self.assertEqual(self.client.get(f"/pdf/download/{job['job_id']}").status_code, 200)
+    
+    def test_requeue_jobs_of_exited_worker(self):
+        """Test unfinished jobs of a dead processing worker return to the queue"""
+        store = self.server.job_store
+        store.create({"job_id": "orphan", "status": "text_chunked", "worker_pid": -1})
+        store.create({"job_id": "other", "status": "processing", "worker_pid": -2})
+        # More jobs than any page size, all belonging to the dead worker
+        many = [f"orphan-{i}" for i in range(150)]
+        for job_id in many:
+            store.create({"job_id": job_id, "status": "summarized", "worker_pid": -1})
+        try:
+            self.assertEqual(self.server.requeue_worker_jobs(-1), 1 + len(many))
+            self.assertEqual(store.get("orphan")["status"], "uploaded")
+            self.assertEqual(store.get("other")["status"], "processing")
+            self.assertEqual({store.get(job_id)["status"] for job_id in many}, {"uploaded"})
+        finally:
+            for job_id in ["orphan", "other"] + many:
+                store.delete(job_id)
+
+
 if __name__ == '__main__':
     unittest.main()
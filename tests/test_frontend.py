@@ -98,6 +98,43 @@ class TestFrontendServer(unittest.TestCase):
         self.assertTrue("error" in response.json())
         self.assertTrue("Test error" in response.json()["error"])
     
+    def test_proxy_pdf_status_conditional(self):
+        """Test wait and If-None-Match are forwarded, and 304s and ETags relayed"""
+        from frontend.server import frontend_server
+        
+        upstream = MagicMock(status_code=304, headers={"ETag": '"v3"'})
+        with patch.object(frontend_server.http_client, "get", AsyncMock(return_value=upstream)) as get:
+            response = self.client.get("/pdf/status/job-1?wait=20", headers={"If-None-Match": '"v3"'})
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], '"v3"')
+        self.assertEqual(get.call_args.kwargs["params"], {"wait": 20.0})
+        self.assertEqual(get.call_args.kwargs["headers"], {"If-None-Match": '"v3"'})
+    
+    def test_proxy_pdf_events(self):
+        """Test job event streams are relayed from the MCP server"""
+        from frontend.server import frontend_server
+        
+        async def blocks():
+            yield b"event: status\ndata: {}\n\n"
+            yield b"event: complete\ndata: {}\n\n"
+        
+        upstream = MagicMock(status_code=200, aiter_raw=blocks, aclose=AsyncMock())
+        with patch.object(frontend_server.event_stream_client, "send", AsyncMock(return_value=upstream)) as send, \
+                patch.object(frontend_server.http_client, "send", AsyncMock()) as shared_send:
+            response = self.client.get("/pdf/events/job-1", headers={"Last-Event-ID": "3"})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual(response.text, "event: status\ndata: {}\n\nevent: complete\ndata: {}\n\n")
+        request = send.call_args.args[0]
+        self.assertEqual(str(request.url), "http://localhost:8000/pdf/events/job-1")
+        self.assertEqual(request.headers["Last-Event-ID"], "3")
+        upstream.aclose.assert_awaited()
+        # Streams never occupy the shared client's pool, and are not cut off between events
+        shared_send.assert_not_called()
+        self.assertIsNone(frontend_server.event_stream_client.timeout.read)
+    
     @patch("frontend.server.frontend_server.httpx.AsyncClient")
     async def test_check_status_success(self, mock_client):
         """Test the status endpoint with successful response"""